@@ -1,15 +1,47 @@
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, g, jsonify, request, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from pathlib import Path
-from collections import Counter
-from datetime import datetime, timezone, timedelta
-from typing import Dict, Any, List
-import json
+from datetime import datetime, timezone
+from typing import List
+import bisect
+import hmac
 import os
+import threading
 
 # storage만은 모듈 로드시 바로 써도 안전
+import profiling
+import serializer
 from storage import load_summoners, MATCHES_JSONL
+from match_index import get_match_index
+from summaries import REQUEST_SYNC_LIMIT, get_summary_store, load_name_map
+from hot_cache import get_hot_cache
+from feed import get_feed
+from players import get_player_stats
+from league_history import RESOLUTIONS, get_league_history
+from rollups import RESOLUTIONS as ROLLUP_RESOLUTIONS, get_match_rollups
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify/request.json을 serializer(orjson 우선, 없으면 표준 json)로 처리"""
+
+    def dumps(self, obj, **kwargs):
+        return serializer.dumps(obj, sort_keys=kwargs.get("sort_keys", self.sort_keys),
+                                indent=bool(kwargs.get("indent")),
+                                default=kwargs.get("default", self.default)).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return serializer.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        with profiling.phase("serialize"):
+            data = serializer.dumps(obj, sort_keys=self.sort_keys, indent=indent, default=self.default)
+        return self._app.response_class(data + b"\n", mimetype=self.mimetype)
+
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 
 # --- 스케줄러 중복 기동 방지 (지연 임포트) ---
 def _maybe_start_scheduler_once():
@@ -35,6 +67,31 @@ def _maybe_start_scheduler_once():
     else:
         app.logger.info("[scheduler] not started (COLLECT_INTERVAL_SEC not set)")
 
+# --- 요청 프로파일링 (PROFILE_SAMPLE_RATE > 0 일 때만) ---
+# 끝없이 열려 있는 SSE와 프로파일 조회 자체는 표본에서 제외
+_PROFILE_SKIP = ("/api/stream", "/api/admin/profile")
+
+@app.before_request
+def _profile_start():
+    if profiling.sample_rate <= 0 or request.path.startswith(_PROFILE_SKIP):
+        return
+    rule = request.url_rule.rule if request.url_rule is not None else request.path
+    g._profile = profiling.start("request", f"{request.method} {rule}")
+
+@app.after_request
+def _profile_status(response):
+    tr = g.get("_profile")
+    if tr is not None:
+        tr.meta["status"] = response.status_code
+        tr.meta["path"] = request.full_path.rstrip("?")
+    return response
+
+@app.teardown_request
+def _profile_finish(exc):
+    tr = g.pop("_profile", None)
+    if tr is not None:
+        profiling.finish(tr, **({"error": repr(exc)} if exc is not None else {}))
+
 # --- 정적/루트 ---
 @app.route("/")
 def root():
@@ -84,33 +141,95 @@ def health():
         "has_api_key": has_api_key,
         "data_dir": str(data_dir),
         "matches_file_exists": MATCHES_JSONL.exists(),
-        "summoners_count": len(load_summoners())
+        "summoners_count": len(load_summoners()),
+        "hot_cache": get_hot_cache().stats(),
+        "stream": get_feed().stats(),
     })
 
 # --- 원시 데이터 제공 ---
+_RAW_FLUSH_BYTES = 256 * 1024
+
+def _raw_matches_response(idx, ords: List[int], **extra):
+    """
+    {"matches": [...], "total": N, ...extra}
+    색인된 원본 줄을 디코드/재인코드 없이 이어 붙여 스트리밍한다.
+    """
+    tail = serializer.dumps({"total": len(ords), **extra})
+
+    def generate():
+        buf = [b'{"matches":[']
+        size = 0
+        for k, raw in enumerate(idx.iter_raw(ords)):
+            if k:
+                buf.append(b",")
+            buf.append(raw)
+            size += len(raw)
+            if size >= _RAW_FLUSH_BYTES:
+                yield b"".join(buf)
+                buf, size = [], 0
+        buf.append(b"]," + tail[1:] + b"\n")
+        yield b"".join(buf)
+
+    return app.response_class(generate(), mimetype="application/json")
+
+_SPLICE_SLOT = f"\x00{os.urandom(8).hex()}\x00"  # 데이터에 나올 수 없는 자리 표시
+
+def _spliced_response(obj: dict, key: str, parts: List[bytes]):
+    """
+    obj[key] 자리에 이미 인코딩된 JSON 조각들(parts)을 배열로 끼워 넣은 응답.
+    나머지 필드는 jsonify와 같은 키 정렬로 인코딩하고, 조각은 디코드/재인코드하지 않는다.
+    """
+    with profiling.phase("serialize"):
+        body = serializer.dumps({**obj, key: _SPLICE_SLOT}, sort_keys=app.json.sort_keys)
+        body = body.replace(serializer.dumps(_SPLICE_SLOT), b"[" + b",".join(parts) + b"]", 1)
+    return app.response_class(body + b"\n", mimetype="application/json")
+
 @app.route("/api/matches")
 def get_matches():
     """수집된 매치 데이터를 반환"""
     if not MATCHES_JSONL.exists():
         return jsonify({"matches": [], "total": 0})
 
-    matches: List[Dict[str, Any]] = []
+    idx = get_match_index()
     try:
-        with MATCHES_JSONL.open("r", encoding="utf-8") as f:
-            for line in f:
-                if line.strip():
-                    try:
-                        matches.append(json.loads(line))
-                    except Exception:
-                        continue
+        idx.refresh()
+        ords = idx.select()
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-    return jsonify({"matches": matches, "total": len(matches)})
+    return _raw_matches_response(idx, ords)
+
+# /api/stats 누적값: 색인에서 지난번 이후 새로 붙은 매치만 head 디코드해 더한다
+_stats_tally = {"generation": None, "upto": 0, "total": 0, "by_tier": {}, "last": None}
+_stats_lock = threading.Lock()
+
+def _tally_matches(idx) -> dict:
+    with _stats_lock:
+        t = _stats_tally
+        if t["generation"] != idx.generation or t["upto"] > len(idx):
+            t.update(generation=idx.generation, upto=0, total=0, by_tier={}, last=None)
+        end = len(idx)
+        with profiling.phase("scan"):
+            for raw in idx.iter_raw(range(t["upto"], end)):
+                # gameCreation / 참가자 tier만 디코드
+                head = serializer.match_head(raw)
+                if head is None:
+                    continue
+                _, game_time, parts = head
+                t["total"] += 1
+                # 티어 집계 (participants에 주입한 tier 사용)
+                for _, p_tier in parts:
+                    tier = (p_tier or "UNRANKED").upper()
+                    t["by_tier"][tier] = t["by_tier"].get(tier, 0) + 1
+                # 최근 업데이트 시간 (ms)
+                if isinstance(game_time, int) and (not t["last"] or game_time > t["last"]):
+                    t["last"] = game_time
+        t["upto"] = end
+        return {"total_matches": t["total"], "matches_by_tier": dict(t["by_tier"]), "last_updated": t["last"]}
 
 @app.route("/api/stats")
 def get_stats():
-    """수집된 데이터의 통계 정보를 반환"""
+    """수집된 데이터의 통계 정보를 반환 (매 요청 전체 재스캔 없이 색인 기준 누적값)"""
     stats = {
         "total_matches": 0,
         "total_summoners": 0,
@@ -126,33 +245,61 @@ def get_stats():
     # 매치 수 및 티어별 분석
     if MATCHES_JSONL.exists():
         try:
-            with MATCHES_JSONL.open("r", encoding="utf-8") as f:
-                for line in f:
-                    if not line.strip():
-                        continue
-                    try:
-                        match = json.loads(line)
-                    except Exception:
-                        continue
-                    stats["total_matches"] += 1
-
-                    # 티어 집계 (participants에 주입한 tier 사용)
-                    info = match.get("info", {}) or {}
-                    parts = info.get("participants", []) or []
-                    for p in parts:
-                        tier = (p.get("tier") or "UNRANKED").upper()
-                        stats["matches_by_tier"][tier] = stats["matches_by_tier"].get(tier, 0) + 1
-
-                    # 최근 업데이트 시간 (ms)
-                    game_time = info.get("gameCreation")
-                    if isinstance(game_time, int):
-                        if not stats["last_updated"] or game_time > stats["last_updated"]:
-                            stats["last_updated"] = game_time
+            idx = get_match_index()
+            idx.refresh()
+            stats.update(_tally_matches(idx))
         except Exception as e:
             stats["error"] = str(e)
 
     return jsonify(stats)
 
+def _ms_arg(name: str, default_ms: int) -> int:
+    """쿼리의 ms 타임스탬프 (없거나 잘못되면 기본값)"""
+    try:
+        return int(request.args.get(name, default_ms))
+    except ValueError:
+        return default_ms
+
+@app.route("/api/stats/timeseries")
+def get_stats_timeseries():
+    """
+    gameCreation 기준 시간대별 매치 수 / 티어별 매치 수 (미리 집계한 롤업에서, 원본 미접근)
+    쿼리:
+      - resolution (선택): hour | day(KST 자정 기준), 기본 hour
+      - step (선택): 버킷 몇 개씩 묶을지, 기본 1 (예: hour + step=6 → 6시간 단위)
+      - from / to (선택): ms 타임스탬프, 기본 최근 7일
+    """
+    resolution = (request.args.get("resolution") or "hour").lower()
+    if resolution not in ROLLUP_RESOLUTIONS:
+        return jsonify({"error": f"unknown resolution: {resolution}"}), 400
+    try:
+        step = max(1, int(request.args.get("step", "1")))
+    except ValueError:
+        step = 1
+    now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    end = _ms_arg("to", now_ms)
+    start = _ms_arg("from", end - 7 * 86400 * 1000)
+
+    rollups = get_match_rollups()
+    try:
+        idx = get_match_index()
+        idx.refresh()
+        rollups.sync(idx)
+        buckets = rollups.series(start // 1000, end // 1000, resolution, step)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify({
+        "resolution": resolution,
+        "step": step,
+        "from": start,
+        "to": end,
+        "total": rollups.window(start // 1000, end // 1000),
+        "buckets": buckets,
+    })
+
 @app.route("/api/matches/by-tier/<tier>")
 def get_matches_by_tier(tier: str):
     """특정 티어의 매치 데이터를 반환"""
@@ -160,120 +307,22 @@ def get_matches_by_tier(tier: str):
         return jsonify({"matches": [], "total": 0, "tier": tier})
 
     want = tier.upper()
-    matches: List[Dict[str, Any]] = []
+    idx = get_match_index()
     try:
-        with MATCHES_JSONL.open("r", encoding="utf-8") as f:
-            for line in f:
-                if not line.strip():
-                    continue
-                try:
-                    match = json.loads(line)
-                except Exception:
-                    continue
-                info = match.get("info", {}) or {}
-                parts = info.get("participants", []) or []
-                if any((p.get("tier") or "").upper() == want for p in parts):
-                    matches.append(match)
+        idx.refresh()
+        ords = idx.select(tier=want)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-    return jsonify({"matches": matches, "total": len(matches), "tier": want})
+    return _raw_matches_response(idx, ords, tier=want)
 
 # =========================
 #   요약 엔드포인트 (신규)
 # =========================
 
-def _load_summoner_name_map() -> Dict[str, str]:
-    """puuid -> 표시용 이름 맵 (없으면 puuid 축약)"""
-    name_map: Dict[str, str] = {}
-    try:
-        for s in load_summoners():
-            if not isinstance(s, dict):
-                continue
-            p = s.get("puuid")
-            nm = s.get("name")
-            if not nm:
-                g = s.get("gameName")
-                t = s.get("tagLine")
-                if g and t:
-                    nm = f"{g}#{t}"
-            if p:
-                name_map[p] = nm or (str(p)[:8] + "…")
-    except Exception:
-        pass
-    return name_map
-
-def _summarize_match(match: dict, name_map: dict) -> dict:
-    meta = match.get("metadata", {}) or {}
-    info = match.get("info", {}) or {}
-    mids = meta.get("match_id")
-    t_ms = info.get("gameCreation") or 0
-    parts = info.get("participants", []) or []
-
-    # ★ 수집 원본(누구의 매치인지)
-    collected = info.get("_collected_for") or {}
-    src_puuid = collected.get("puuid")
-    src_tier = (collected.get("tier") or "UNRANKED") if src_puuid else None
-    src_name = name_map.get(src_puuid, (src_puuid[:8] + "…") if src_puuid else None)
-
-    # 티어 집계
-    tiers = [(p.get("tier") or "UNRANKED").upper() for p in parts]
-    from collections import Counter
-    c = Counter(t for t in tiers if t != "UNRANKED")
-    tier_summary = ", ".join(f"{k}×{v}" for k, v in c.most_common()) or "티어 정보 없음"
-
-    # 참가자 요약(전체 traits/units 포함)
-    players = []
-    for p in parts:
-        puuid = p.get("puuid", "")
-        name = name_map.get(puuid, puuid[:8] + "…") if puuid else "알 수 없음"
-
-        all_traits = [
-            {"name": tr.get("name"), "tier_current": tr.get("tier_current"), "num_units": tr.get("num_units"), "style": tr.get("style")}
-            for tr in (p.get("traits") or [])
-        ]
-        all_units = [
-            {"name": u.get("character_id"), "star": u.get("tier"), "items": u.get("itemNames") or []}
-            for u in (p.get("units") or [])
-        ]
-        players.append({
-            "name": name,
-            "tier": (p.get("tier") or "UNRANKED").upper(),
-            "placement": p.get("placement"),
-            "augments": p.get("augments") or [],
-            "is_source": bool(p.get("is_source")),  # ← 수집원 참가자 표시
-            "top_traits": sorted(all_traits, key=lambda tr: (tr.get("tier_current") or 0, tr.get("num_units") or 0), reverse=True)[:3],
-            "core_units": sorted(all_units, key=lambda u: (u.get("star") or 0), reverse=True)[:3],
-            "traits": all_traits,
-            "units": all_units,
-        })
-
-    # 시간 문자열 (KST + 깔끔형)
-    from datetime import datetime, timezone, timedelta
-    kst = timezone(timedelta(hours=9))
-    if isinstance(t_ms, int) and t_ms > 0:
-        dt = datetime.fromtimestamp(t_ms / 1000, tz=kst)
-        iso_kst = dt.isoformat(timespec="seconds")
-        plain_kst = dt.strftime("%Y-%m-%d %H:%M:%S")
-    else:
-        iso_kst = "알 수 없음"
-        plain_kst = "알 수 없음"
-
-    return {
-        "match_id": mids,
-        "gameCreation": t_ms,
-        "gameTimeKST": iso_kst,
-        "gameTimeKSTPlain": plain_kst,
-        "tier_summary": tier_summary,
-        # ★ 프론트에서 바로 쓰기 쉽게 수집 원본 정보 포함
-        "collected_for": {
-            "puuid": src_puuid,
-            "name": src_name,
-            "tier": (src_tier or "UNRANKED") if src_puuid else None,
-        },
-        "players": players,
-    }
-
+def _summarized(ords: List[int], store) -> List[int]:
+    """store.sync 이후 collector가 색인을 더 늘렸을 수 있으므로 요약이 있는 번호만 (ords는 파일 순서)"""
+    return ords[:bisect.bisect_left(ords, len(store))]
 
 @app.route("/api/matches/summary")
 def get_matches_summary():
@@ -295,34 +344,207 @@ def get_matches_summary():
     if not MATCHES_JSONL.exists():
         return jsonify({"matches": [], "total": 0})
 
-    name_map = _load_summoner_name_map()
+    name_map = load_name_map()
 
-    matches: List[Dict[str, Any]] = []
+    # 색인으로 티어 필터 + 최신순 상위 limit개만 골라 미리 만든 요약을 읽음
+    # (최근 것은 이름까지 입혀 인코딩해 둔 바이트를 메모리에서 그대로 씀)
+    idx = get_match_index()
     try:
-        with MATCHES_JSONL.open("r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    m = json.loads(line)
-                except Exception:
-                    continue
-                if want_tier:
-                    parts = (m.get("info", {}) or {}).get("participants", []) or []
-                    if not any((p.get("tier") or "").upper() == want_tier for p in parts):
-                        continue
-                matches.append(m)
+        idx.refresh()
+        store = get_summary_store()
+        store.sync(idx, limit=REQUEST_SYNC_LIMIT)
+        cache = get_hot_cache()
+        cache.sync(store, name_map)
+        ords = _summarized(idx.select(tier=want_tier or None), store)
+        with profiling.phase("summarize"):
+            top = cache.get_many(idx.newest(ords, limit), store, name_map)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-    # 최신순 정렬
-    matches.sort(key=lambda m: (m.get("info", {}) or {}).get("gameCreation", 0), reverse=True)
+    return _spliced_response({"total": len(ords)}, "matches", top)
 
-    # 요약 변환 + limit
-    out = [_summarize_match(m, name_map) for m in matches[:limit]]
+@app.route("/api/stream")
+def stream_matches():
+    """
+    새 매치 SSE 피드 (폴링 대신 EventSource로 구독)
+      - event: match  → /api/matches/summary 항목 하나 (id로 이어받기)
+      - event: stats  → 이번에 추가된 매치 수 / 티어별 증가분 / 최신 시각
+      - event: hello / reset → 현재 위치 (reset이면 전체를 다시 불러와야 함)
+    재접속 시 브라우저가 보내는 Last-Event-ID(또는 ?lastEventId=)부터 이어서 보낸다.
+    첫 접속은 ?since=<요약 응답의 total>로 처음 불러온 뒤에 생긴 매치부터 받는다.
+    스트림 하나가 서버 스레드 하나를 잡으므로 FEED_MAX_STREAMS개를 넘으면 503.
+    """
+    feed = get_feed()
+    if feed.full():
+        resp = jsonify({"error": "too many streams", "max_streams": feed.max_streams})
+        resp.status_code = 503
+        resp.headers["Retry-After"] = "30"
+        return resp
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("lastEventId")
+    since = request.args.get("since", type=int)
+    return app.response_class(
+        feed.stream(last_id, since if since is None or since >= 0 else None),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.route("/api/players")
+def search_players():
+    """
+    소환사 캐시에서 이름으로 플레이어 찾기
+    쿼리:
+      - name (필수): name / gameName / gameName#tagLine (대소문자 무시, 접두어 허용)
+      - limit (선택): 기본 20, 최대 100
+    """
+    name = request.args.get("name") or ""
+    try:
+        limit = max(1, min(100, int(request.args.get("limit", "20"))))
+    except ValueError:
+        limit = 20
+    stats = get_player_stats()
+    out = []
+    for p in stats.find(name, limit):
+        s = stats.summoner(p) or {}
+        out.append({
+            "puuid": p,
+            "name": load_name_map().get(p),
+            "tier": s.get("tier"),
+            "leaguePoints": s.get("leaguePoints"),
+        })
+    return jsonify({"players": out, "total": len(out), "query": name})
+
+@app.route("/api/players/<puuid>")
+def get_player(puuid: str):
+    """
+    플레이어 프로필: 리그 정보 + 평균 등수 / top4 비율 / 선호 특성·유닛 + 최근 매치 요약
+    (전체 매치를 훑지 않고 플레이어 집계 + posting list로만 응답)
+    쿼리:
+      - limit (선택): 최근 매치 수, 기본 10, 최대 50
+    """
+    try:
+        limit = max(1, min(50, int(request.args.get("limit", "10"))))
+    except ValueError:
+        limit = 10
+
+    idx = get_match_index()
+    stats = get_player_stats()
+    try:
+        idx.refresh()
+        store = get_summary_store()
+        store.sync(idx, limit=REQUEST_SYNC_LIMIT)
+        stats.sync(idx, store)
+        agg = stats.get(puuid, idx, store)
+        name_map = load_name_map()
+        cache = get_hot_cache()
+        cache.sync(store, name_map)
+        with profiling.phase("summarize"):
+            recent = cache.get_many(idx.newest(_summarized(idx.select(puuid=puuid), store), limit),
+                                    store, name_map)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-    return jsonify({"matches": out, "total": len(matches)})
+    summoner = stats.summoner(puuid)
+    if summoner is None and not agg.games:
+        return jsonify({"error": "player not found", "puuid": puuid}), 404
+
+    summoner = summoner or {}
+    return _spliced_response({
+        "puuid": puuid,
+        "name": name_map.get(puuid, puuid[:8] + "…"),
+        "tracked": puuid in stats.tracked,
+        "tier": summoner.get("tier") or agg.tier,
+        "leaguePoints": summoner.get("leaguePoints"),
+        "wins": summoner.get("wins"),
+        "losses": summoner.get("losses"),
+        **agg.summary(),
+    }, "recent_matches", recent)
+
+@app.route("/api/players/<puuid>/history")
+def get_player_history(puuid: str):
+    """
+    플레이어 LP/티어 이력
+    쿼리:
+      - from / to (선택): ms 타임스탬프, 기본 최근 7일
+      - resolution (선택): raw(변경 시점) | hour | day, 기본 raw
+    """
+    resolution = (request.args.get("resolution") or "raw").lower()
+    if resolution != "raw" and resolution not in RESOLUTIONS:
+        return jsonify({"error": f"unknown resolution: {resolution}"}), 400
+    now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    end = _ms_arg("to", now_ms)
+    start = _ms_arg("from", end - 7 * 86400 * 1000)
+
+    data = get_league_history().series(puuid, start // 1000, end // 1000, resolution)
+    if data is None:
+        return jsonify({"error": "no history", "puuid": puuid}), 404
+    return jsonify({"puuid": puuid, "resolution": resolution, "from": start, "to": end, **data})
+
+@app.route("/api/ladder")
+def get_ladder():
+    """
+    특정 시점의 LP 래더 (기록된 리그 엔트리 기준, 티어 → LP 내림차순)
+    쿼리:
+      - at (선택): ms 타임스탬프, 기본 현재
+      - tier (선택): 해당 티어만
+      - limit (선택): 기본 100, 최대 1000
+    """
+    at = _ms_arg("at", int(datetime.now(timezone.utc).timestamp() * 1000))
+    tier = (request.args.get("tier") or "").strip() or None
+    try:
+        limit = max(1, min(1000, int(request.args.get("limit", "100"))))
+    except ValueError:
+        limit = 100
+    rows = get_league_history().ladder(at // 1000, tier, limit)
+    name_map = load_name_map()
+    for r in rows:
+        r["name"] = name_map.get(r["puuid"], r["puuid"][:8] + "…")
+    return jsonify({"at": at, "tier": tier.upper() if tier else None, "players": rows, "total": len(rows)})
+
+@app.route("/api/scheduler")
+def get_scheduler_state():
+    """적응형 수집 스케줄러 상태 + 최근 결정 내역 (간격/players/per_player를 왜 바꿨는지)"""
+    t = app.config.get("_SCHEDULER_OBJ")
+    if not t:
+        return jsonify({"running": False})
+    data = {
+        "running": t.is_alive(),
+        "region": t.region,
+        "tiers": t.tiers,
+        "players": t.players,
+        "per_player": t.per_player,
+        "interval_sec": t.interval_seconds,
+        "adaptive": None,
+    }
+    if t.adaptive:
+        data["adaptive"] = t.adaptive.snapshot()
+    return jsonify(data)
+
+@app.route("/api/matches/by-player/<puuid>")
+def get_matches_by_player(puuid: str):
+    """
+    특정 플레이어(puuid)가 참가한 매치 (최신순)
+    쿼리:
+      - tier (선택): 해당 티어 참가자가 있는 매치만
+      - limit (선택): 기본 20, 최대 200
+    """
+    want_tier = (request.args.get("tier") or "").upper().strip()
+    try:
+        limit = max(1, min(200, int(request.args.get("limit", "20"))))
+    except ValueError:
+        limit = 20
+
+    if not MATCHES_JSONL.exists():
+        return jsonify({"matches": [], "total": 0, "puuid": puuid})
+
+    idx = get_match_index()
+    try:
+        idx.refresh()
+        ords = idx.select(tier=want_tier or None, puuid=puuid)
+        matches = idx.read_many(idx.newest(ords, limit))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify({"matches": matches, "total": len(ords), "puuid": puuid})
 
 @app.route("/api/admin/backfill-names", methods=["POST"])
 def admin_backfill_names():
@@ -380,6 +602,71 @@ def admin_backfill_names():
 
     return jsonify({"ok": True, "attempted": attempted, "fetched": fetched, "errors": errors})
 
+# --- 프로파일링 조회 / 토글 (ADMIN_TOKEN 필요) ---
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+def _admin_denied():
+    """ADMIN_TOKEN이 설정돼 있고 X-Admin-Token 헤더가 일치할 때만 None (쿼리로는 받지 않음: 로그에 남음)"""
+    if not ADMIN_TOKEN:
+        return jsonify({"error": "ADMIN_TOKEN not configured"}), 403
+    given = request.headers.get("X-Admin-Token") or ""
+    if not hmac.compare_digest(given.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        return jsonify({"error": "forbidden"}), 403
+    return None
+
+@app.route("/api/admin/profile", methods=["GET", "POST"])
+def admin_profile():
+    """
+    GET: 현재 설정 + 구간별 누적 시간 + 가장 느린 trace 목록
+    POST: 실행 중 켜고 끄기. JSON 또는 쿼리
+      - sample_rate (0~1, 0이면 끔)
+      - cprofile / stacks (true/false)
+      - reset (true면 모은 trace / 스택 비움)
+    """
+    denied = _admin_denied()
+    if denied:
+        return denied
+    if request.method == "GET":
+        return jsonify(profiling.report())
+
+    body = request.get_json(silent=True) or {}
+    opts = {**request.args.to_dict(), **body}
+
+    def flag(name):
+        v = opts.get(name)
+        return None if v is None else str(v).strip().lower() in ("1", "true", "yes", "on")
+
+    try:
+        rate = float(opts["sample_rate"]) if opts.get("sample_rate") is not None else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "sample_rate must be a number"}), 400
+    if flag("reset"):
+        profiling.reset()
+    return jsonify(profiling.configure(rate=rate, cprofile=flag("cprofile"), stacks=flag("stacks")))
+
+@app.route("/api/admin/profile/cprofile")
+def admin_profile_cprofile():
+    """느린 trace의 cProfile(pstats) 텍스트. 쿼리: id (선택, 기본 가장 느린 것)"""
+    denied = _admin_denied()
+    if denied:
+        return denied
+    try:
+        trace_id = int(request.args["id"]) if request.args.get("id") else None
+    except ValueError:
+        return jsonify({"error": "id must be an integer"}), 400
+    text = profiling.cprofile_text(trace_id)
+    if text is None:
+        return jsonify({"error": "no cProfile data (PROFILE_CPROFILE off or trace evicted)"}), 404
+    return app.response_class(text, mimetype="text/plain")
+
+@app.route("/api/admin/profile/collapsed")
+def admin_profile_collapsed():
+    """표본 스택 누적 (flamegraph.pl / speedscope에 바로 넣을 수 있는 collapsed 형식)"""
+    denied = _admin_denied()
+    if denied:
+        return denied
+    return app.response_class(profiling.collapsed_text(), mimetype="text/plain")
+
 
 # --- 엔트리포인트 ---
 if __name__ == "__main__":
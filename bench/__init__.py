@@ -0,0 +1,10 @@
+"""
+성능 측정용 하네스.
+
+- synthetic.py : 재현 가능한 합성 TFT 매치/소환사 데이터 생성기
+- riot_stub.py : Riot API 흉내 로컬 스텁 서버 (rate-limit 헤더/429/지연)
+- run.py       : 엔드포인트 지연/피크 메모리 + collector 벤치마크 실행기
+- limiter.py   : rate limiter 경합(스레드 다수) 마이크로벤치마크
+
+사용법은 `python -m bench.run --help` 참고.
+"""
@@ -0,0 +1,59 @@
+"""
+rate limiter 경합 마이크로벤치마크.
+
+workers개 스레드가 각자 calls번 acquire 할 때의 벽시계/CPU 시간과 wakeup 수를 잰다.
+CPU 시간이 벽시계에 비해 작고 wakeups가 (granted 수) 수준이면 대기 비용이 거의 없는 것.
+
+    python -m bench.limiter --workers 48 --calls 20 --limits 40:1,400:120
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from typing import List, Optional
+
+from bench.riot_stub import parse_limits
+from rate_limiter import BucketedRateLimiter
+
+
+def run(workers: int, calls: int, limits) -> dict:
+    lim = BucketedRateLimiter([(n, float(s)) for n, s in limits])
+    barrier = threading.Barrier(workers + 1)
+
+    def worker():
+        barrier.wait()
+        for _ in range(calls):
+            lim.acquire()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    barrier.wait()
+    for t in threads:
+        t.join()
+    wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+    st = lim.stats()
+    return {
+        "workers": workers,
+        "calls": workers * calls,
+        "wall_sec": round(wall, 3),
+        "cpu_sec": round(cpu, 4),
+        "cpu_per_call_us": round(cpu / (workers * calls) * 1e6, 1),
+        "wakeups": st["wakeups"],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="rate limiter 경합 벤치마크")
+    ap.add_argument("--workers", type=int, default=48)
+    ap.add_argument("--calls", type=int, default=20)
+    ap.add_argument("--limits", default="100:1,1000:120")
+    args = ap.parse_args(argv)
+    print(json.dumps(run(args.workers, args.calls, parse_limits(args.limits))))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+Riot API 로컬 스텁 서버.
+
+riot_client는 RIOT_API_BASE_URL이 설정되면 실제 호스트 대신 이 서버로 요청을 보낸다.
+실제 API처럼
+  - X-App-Rate-Limit / X-App-Rate-Limit-Count 헤더
+  - 고정 윈도우 한도 초과 시 429 + Retry-After (+ X-Rate-Limit-Type)
+  - 응답 지연(평균 + 지터), 임의 429(서비스 레벨) 주입
+을 흉내낸다. 모든 응답은 SyntheticWorld에서 결정적으로 생성된다.
+
+    python -m bench.riot_stub --port 8089
+    RIOT_API_BASE_URL=http://127.0.0.1:8089 RIOT_API_KEY=stub python app.py
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from bench.synthetic import SyntheticWorld
+
+DEFAULT_APP_LIMITS: List[Tuple[int, int]] = [(20, 1), (100, 120)]
+
+
+def parse_limits(text: str) -> List[Tuple[int, int]]:
+    """'20:1,100:120' → [(20, 1), (100, 120)] (Riot 헤더 형식)"""
+    out: List[Tuple[int, int]] = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        n, secs = part.split(":", 1)
+        out.append((int(n), int(secs)))
+    return out
+
+
+class _FixedWindows:
+    """Riot식 고정 윈도우: 윈도우는 그 윈도우의 첫 요청 시각에 시작한다."""
+
+    def __init__(self, limits: List[Tuple[int, int]]) -> None:
+        self.limits = limits
+        self._start = [0.0] * len(limits)
+        self._count = [0] * len(limits)
+        self._lock = threading.Lock()
+
+    def hit(self, now: float) -> Tuple[bool, int, str]:
+        """(허용 여부, Retry-After 초, count 헤더)"""
+        with self._lock:
+            for i, (_, secs) in enumerate(self.limits):
+                if self._count[i] == 0 or now - self._start[i] >= secs:
+                    self._start[i] = now
+                    self._count[i] = 0
+            retry_after = 0
+            for i, (n, secs) in enumerate(self.limits):
+                if self._count[i] >= n:
+                    retry_after = max(retry_after, int(secs - (now - self._start[i])) + 1)
+            if retry_after == 0:
+                for i in range(len(self.limits)):
+                    self._count[i] += 1
+            header = ",".join(f"{self._count[i]}:{secs}" for i, (_, secs) in enumerate(self.limits))
+            return retry_after == 0, retry_after, header
+
+
+class RiotStub:
+    """
+    스레드에서 도는 스텁 서버.
+
+        with RiotStub(world) as stub:
+            os.environ["RIOT_API_BASE_URL"] = stub.base_url
+    """
+
+    def __init__(self, world: SyntheticWorld, host: str = "127.0.0.1", port: int = 0,
+                 app_limits: Optional[List[Tuple[int, int]]] = None,
+                 latency_ms: float = 30.0, jitter_ms: float = 20.0,
+                 random_429_rate: float = 0.0, seed: int = 7) -> None:
+        self.world = world
+        self.app_limits = app_limits if app_limits is not None else list(DEFAULT_APP_LIMITS)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.random_429_rate = random_429_rate
+        self._windows = _FixedWindows(self.app_limits)
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, Any] = {"requests": 0, "ok": 0, "rate_limited": 0,
+                                      "injected_429": 0, "not_found": 0, "by_route": {}}
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    # --- 수명 ---
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "RiotStub":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "RiotStub":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # --- 내부 ---
+    def _count(self, key: str, route: str) -> None:
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            self.stats[key] += 1
+            self.stats["by_route"][route] = self.stats["by_route"].get(route, 0) + 1
+
+    def _delay(self) -> Tuple[float, bool]:
+        with self._rng_lock:
+            d = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms))
+            inject = self._rng.random() < self.random_429_rate
+        return d / 1000.0, inject
+
+    def route(self, path: str, query: Dict[str, List[str]]) -> Tuple[str, int, Any]:
+        """(route 이름, status, body)"""
+        w = self.world
+        parts = [p for p in path.split("/") if p]
+        if parts[:3] == ["tft", "league", "v1"] and len(parts) == 4:
+            tier = parts[3].upper()
+            return "league", 200, {"tier": tier, "queue": "RANKED_TFT", "entries": w.league_entries(tier)}
+        if parts[:4] == ["tft", "summoner", "v1", "summoners"]:
+            if len(parts) == 6 and parts[4] == "by-puuid":
+                p = w.tracked_by_puuid.get(parts[5])
+                if not p:
+                    return "summoner", 404, {"status": {"status_code": 404, "message": "Data not found"}}
+                return "summoner", 200, {"puuid": p["puuid"], "profileIconId": 29,
+                                         "revisionDate": 0, "summonerLevel": 300}
+            return "summoner", 404, {"status": {"status_code": 404, "message": "Data not found"}}
+        if parts[:5] == ["riot", "account", "v1", "accounts", "by-puuid"] and len(parts) == 6:
+            p = w.tracked_by_puuid.get(parts[5])
+            if not p:
+                return "account", 404, {"status": {"status_code": 404, "message": "Data not found"}}
+            return "account", 200, {"puuid": p["puuid"], "gameName": p["gameName"], "tagLine": p["tagLine"]}
+        if parts[:4] == ["tft", "match", "v1", "matches"]:
+            if len(parts) == 7 and parts[4] == "by-puuid" and parts[6] == "ids":
+                count = int((query.get("count") or ["20"])[0])
+                return "match_ids", 200, w.match_ids_for(parts[5], count)
+            if len(parts) == 5:
+                i = w.match_index(parts[4])
+                if i is None:
+                    return "match", 404, {"status": {"status_code": 404, "message": "Data not found"}}
+                return "match", 200, w.make_match(i, annotate=False)
+        return "unknown", 404, {"status": {"status_code": 404, "message": "Not found"}}
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, fmt, *args):  # 조용히
+                pass
+
+            def _send(self, status: int, body: Any, headers: Dict[str, str]) -> None:
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json;charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/__stats":
+                    with stub._stats_lock:
+                        return self._send(200, stub.stats, {})
+                if not self.headers.get("X-Riot-Token"):
+                    return self._send(401, {"status": {"status_code": 401, "message": "Unauthorized"}}, {})
+                delay, inject = stub._delay()
+                if delay:
+                    time.sleep(delay)
+                u = urlparse(self.path)
+                limit_header = ",".join(f"{n}:{s}" for n, s in stub.app_limits)
+                ok, retry_after, count_header = stub._windows.hit(time.monotonic())
+                headers = {"X-App-Rate-Limit": limit_header, "X-App-Rate-Limit-Count": count_header}
+                if not ok:
+                    stub._count("rate_limited", "429")
+                    headers.update({"Retry-After": str(retry_after), "X-Rate-Limit-Type": "application"})
+                    return self._send(429, {"status": {"status_code": 429, "message": "Rate limit exceeded"}}, headers)
+                if inject:
+                    # 서비스 레벨 429: Retry-After/X-Rate-Limit-Type 없음
+                    stub._count("injected_429", "429")
+                    return self._send(429, {"status": {"status_code": 429, "message": "Rate limit exceeded"}}, headers)
+                route, status, body = stub.route(u.path, parse_qs(u.query))
+                stub._count("ok" if status == 200 else "not_found", route)
+                self._send(status, body, headers)
+
+        return Handler
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Riot API 스텁 서버")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8089)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--matches", type=int, default=10000, help="스텁 월드의 매치 수")
+    ap.add_argument("--tracked", type=int, default=1000)
+    ap.add_argument("--limits", default="20:1,100:120", help="앱 rate limit (Riot 헤더 형식)")
+    ap.add_argument("--latency-ms", type=float, default=30.0)
+    ap.add_argument("--jitter-ms", type=float, default=20.0)
+    ap.add_argument("--random-429", type=float, default=0.0, help="임의 429 주입 확률")
+    args = ap.parse_args(argv)
+
+    world = SyntheticWorld(args.seed, args.tracked, n_matches=args.matches)
+    stub = RiotStub(world, args.host, args.port, parse_limits(args.limits),
+                    args.latency_ms, args.jitter_ms, args.random_429)
+    print(f"[riot-stub] listening on {stub.base_url}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(stub.stats))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,407 @@
+"""
+벤치마크 실행기.
+
+    # 10k/100k 데이터셋으로 엔드포인트 + collector 측정, 결과 저장
+    python -m bench.run --sizes 10k,100k --out bench/results/$(git rev-parse --short HEAD).json
+
+    # 이전 결과와 비교 (median/peak가 threshold 이상 나빠지면 REGRESSION 표시)
+    python -m bench.run --sizes 10k --compare bench/results/prev.json --fail-on-regression
+
+측정 항목
+  - 엔드포인트(app.url_map의 GET 라우트 전부 + EXTRA_CASES):
+      cold_ms(첫 호출), min/median/p95_ms(반복), peak_kib(tracemalloc), bytes
+  - 핫 캐시: 최신 200개 요약 본문을 store에서 만들 때 vs 캐시 바이트를 꺼낼 때 (min/median/p95_ms)
+  - collector: 로컬 Riot 스텁(bench.riot_stub)을 상대로 collect_top_matches 2회
+      (첫 회=신규 매치 수집, 두 번째=전부 중복) 소요 시간/호출 수/429 수
+
+데이터셋은 seed 고정이라 같은 커밋/같은 머신에서 결과가 재현된다.
+각 크기는 별도 프로세스(DATA_DIR 격리, 하드링크)에서 측정한다.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from bench.synthetic import generate_dataset, parse_size
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DATA_DIR = ROOT / "bench" / ".data"
+
+# 라우트 기본 호출 외에 추가로 재는 쿼리 조합
+EXTRA_CASES: List[str] = [
+    "/api/matches/summary?limit=50",
+    "/api/matches/summary?tier=CHALLENGER&limit=50",
+    "/api/matches/summary?tier=MASTER&limit=200",
+    "/api/matches/summary?limit=200",
+]
+# 측정하지 않는 엔드포인트 (부작용/외부 호출)
+SKIP_ENDPOINTS = {"static", "collect", "admin_backfill_names", "stream_matches"}  # stream은 끝나지 않음
+# 전체 원본을 그대로 내려주는 엔드포인트는 큰 데이터셋에서 생략
+MAX_MATCHES = {"get_matches": 100_000, "get_matches_by_tier": 100_000}
+# URL 파라미터 샘플 값
+PARAM_SAMPLES = {"tier": "CHALLENGER", "filename": "index.html"}
+
+
+# =========================
+#   엔드포인트 (자식 프로세스)
+# =========================
+
+def _build_cases(app, n_matches: int, samples: Dict[str, str]) -> List[Tuple[str, str, Optional[str]]]:
+    """(case 이름, url, skip 사유)"""
+    cases: List[Tuple[str, str, Optional[str]]] = []
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if "GET" not in (rule.methods or ()) or rule.endpoint in SKIP_ENDPOINTS:
+            continue
+        url = rule.rule
+        missing = []
+        for arg in rule.arguments:
+            if arg in samples:
+                url = url.replace(f"<path:{arg}>", samples[arg]).replace(f"<{arg}>", samples[arg])
+            else:
+                missing.append(arg)
+        skip = None
+        if missing:
+            skip = f"no sample for {','.join(missing)}"
+        elif n_matches > MAX_MATCHES.get(rule.endpoint, n_matches):
+            skip = f"dataset > {MAX_MATCHES[rule.endpoint]}"
+        cases.append((f"GET {url}", url, skip))
+    for url in EXTRA_CASES:
+        cases.append((f"GET {url}", url, None))
+    return cases
+
+
+def _measure(client, url: str, repeat: int) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    resp = client.get(url)
+    body = resp.get_data()
+    cold_ms = (time.perf_counter() - t0) * 1000.0
+
+    times: List[float] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        r = client.get(url)
+        r.get_data()
+        times.append((time.perf_counter() - t0) * 1000.0)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    client.get(url).get_data()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times.sort()
+    return {
+        "status": resp.status_code,
+        "bytes": len(body),
+        "cold_ms": round(cold_ms, 3),
+        "min_ms": round(times[0], 3) if times else None,
+        "median_ms": round(statistics.median(times), 3) if times else None,
+        "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))], 3) if times else None,
+        "peak_kib": round(peak / 1024.0, 1),
+    }
+
+
+def _measure_fn(fn, repeat: int) -> Dict[str, Any]:
+    """HTTP 없이 함수 하나의 반복 시간 (_measure와 같은 필드 일부)"""
+    times: List[float] = []
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000.0)
+    times.sort()
+    return {
+        "min_ms": round(times[0], 3),
+        "median_ms": round(statistics.median(times), 3),
+        "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))], 3),
+    }
+
+
+def _hot_cache_cases(repeat: int, n: int = 200) -> Dict[str, Any]:
+    """최신 n개 요약 본문: SummaryStore 읽기+expand+인코드 vs 핫 캐시 바이트"""
+    from hot_cache import encode, get_hot_cache
+    from summaries import get_summary_store, load_name_map
+
+    store, cache, name_map = get_summary_store(), get_hot_cache(), load_name_map()
+    cache.sync(store, name_map)
+    ords = list(range(max(0, len(store) - n), len(store)))
+    if not ords:
+        return {}
+    cases = {
+        f"summary_bodies[{n}] store+encode": lambda: [encode(c, name_map) for c in store.read_many(ords)],
+        f"summary_bodies[{n}] hot_cache": lambda: cache.get_many(ords, store, name_map),
+    }
+    return {name: _measure_fn(fn, repeat * 4) for name, fn in cases.items()}
+
+
+def child_endpoints(n_matches: int, repeat: int, seed: int) -> Dict[str, Any]:
+    """DATA_DIR이 이미 설정된 자식 프로세스에서 실행"""
+    import resource
+    from app import app
+    from collector import sync_derived
+
+    # 운영에서는 collector가 수집 직후 만들어 두는 파생 데이터(색인/요약/집계)를 미리 만든다
+    sync_derived()
+
+    world_samples = dict(PARAM_SAMPLES)
+    summoners_path = Path(os.environ["DATA_DIR"]) / "summoners.json"
+    try:
+        first = json.loads(summoners_path.read_text(encoding="utf-8"))[0]
+        world_samples.setdefault("puuid", first["puuid"])
+        world_samples.setdefault("name", f"{first['gameName']}#{first['tagLine']}")
+    except Exception:
+        pass
+
+    client = app.test_client()
+    out: Dict[str, Any] = {}
+    for name, url, skip in _build_cases(app, n_matches, world_samples):
+        if skip:
+            out[name] = {"skipped": skip}
+            continue
+        out[name] = _measure(client, url, repeat)
+        print(f"  {name:<55} median={out[name]['median_ms']}ms peak={out[name]['peak_kib']}KiB",
+              file=sys.stderr)
+    for name, res in _hot_cache_cases(repeat).items():
+        out[name] = res
+        print(f"  {name:<55} median={res['median_ms']}ms", file=sys.stderr)
+    out["_process"] = {"maxrss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+    return out
+
+
+def _link_dataset(src: Path, dst: Path) -> None:
+    dst.mkdir(parents=True, exist_ok=True)
+    for fname in ("matches.jsonl", "summoners.json"):
+        target = dst / fname
+        try:
+            os.link(src / fname, target)
+        except OSError:
+            shutil.copyfile(src / fname, target)
+
+
+def run_endpoints(size: int, args) -> Dict[str, Any]:
+    ds_dir = Path(args.data_dir) / f"{size}-s{args.seed}"
+    print(f"[bench] dataset {size} matches → {ds_dir}", file=sys.stderr)
+    t0 = time.perf_counter()
+    generate_dataset(ds_dir, size, args.seed)
+    print(f"[bench] dataset ready ({time.perf_counter() - t0:.1f}s)", file=sys.stderr)
+
+    with tempfile.TemporaryDirectory(prefix="tft-bench-") as work:
+        _link_dataset(ds_dir, Path(work))
+        env = dict(os.environ, DATA_DIR=work, PYTHONHASHSEED="0")
+        env.pop("COLLECT_INTERVAL_SEC", None)
+        proc = subprocess.run(
+            [sys.executable, "-m", "bench.run", "--child", "endpoints", "--child-size", str(size),
+             "--repeat", str(args.repeat), "--seed", str(args.seed)],
+            cwd=str(ROOT), env=env, stdout=subprocess.PIPE, check=True,
+        )
+    return json.loads(proc.stdout)
+
+
+# =========================
+#   collector (스텁 서버 상대)
+# =========================
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _stub_stats(base_url: str) -> Dict[str, Any]:
+    with urllib.request.urlopen(f"{base_url}/__stats", timeout=5) as r:
+        return json.loads(r.read())
+
+
+def child_collector(players: int, per_player: int, tiers: List[str]) -> Dict[str, Any]:
+    """DATA_DIR / RIOT_API_BASE_URL이 설정된 자식 프로세스에서 실행"""
+    from collector import collect_top_matches
+
+    base = os.environ["RIOT_API_BASE_URL"]
+    rounds = []
+    for label in ("initial", "repeat"):
+        before = _stub_stats(base)
+        t0 = time.perf_counter()
+        res = collect_top_matches("kr", players, per_player, tiers)
+        wall = time.perf_counter() - t0
+        after = _stub_stats(base)
+        calls = after["requests"] - before["requests"]
+        rounds.append({
+            "round": label,
+            "wall_sec": round(wall, 3),
+            "matches_fetched": res.get("matches_fetched"),
+            "players_collected": res.get("players_collected"),
+            "api_calls": calls,
+            "rate_limited_429": after["rate_limited"] - before["rate_limited"],
+            "injected_429": after["injected_429"] - before["injected_429"],
+            "calls_per_sec": round(calls / wall, 2) if wall > 0 else None,
+        })
+        print(f"  collector[{label}] {rounds[-1]}", file=sys.stderr)
+    return {"players": players, "per_player": per_player, "tiers": tiers, "rounds": rounds}
+
+
+def run_collector(args) -> Dict[str, Any]:
+    port = _free_port()
+    stub = subprocess.Popen(
+        [sys.executable, "-m", "bench.riot_stub", "--port", str(port), "--seed", str(args.seed),
+         "--matches", "20000", "--limits", args.stub_limits, "--latency-ms", str(args.stub_latency_ms),
+         "--jitter-ms", str(args.stub_jitter_ms), "--random-429", str(args.stub_random_429)],
+        cwd=str(ROOT), stdout=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.time() + 15
+        while True:
+            try:
+                _stub_stats(base)
+                break
+            except Exception:
+                if time.time() > deadline:
+                    raise RuntimeError("riot stub did not start")
+                time.sleep(0.1)
+        with tempfile.TemporaryDirectory(prefix="tft-bench-collect-") as work:
+            env = dict(os.environ, DATA_DIR=work, RIOT_API_BASE_URL=base, RIOT_API_KEY="bench-stub",
+                       PYTHONHASHSEED="0")
+            env.pop("COLLECT_INTERVAL_SEC", None)
+            proc = subprocess.run(
+                [sys.executable, "-m", "bench.run", "--child", "collector",
+                 "--collector-players", str(args.collector_players),
+                 "--collector-per-player", str(args.collector_per_player)],
+                cwd=str(ROOT), env=env, stdout=subprocess.PIPE, check=True,
+            )
+        out = json.loads(proc.stdout)
+        out["stub"] = {"limits": args.stub_limits, "latency_ms": args.stub_latency_ms,
+                       "jitter_ms": args.stub_jitter_ms, "random_429": args.stub_random_429}
+        return out
+    finally:
+        stub.terminate()
+        stub.wait(timeout=10)
+
+
+# =========================
+#   비교/출력
+# =========================
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """threshold(비율) 이상 나빠진 항목 목록"""
+    regressions: List[str] = []
+    for size, cases in current.get("endpoints", {}).items():
+        base_cases = baseline.get("endpoints", {}).get(size, {})
+        for name, cur in cases.items():
+            old = base_cases.get(name)
+            if name.startswith("_") or not old or "skipped" in cur or "skipped" in old:
+                continue
+            for key in ("median_ms", "peak_kib"):
+                a, b = old.get(key), cur.get(key)
+                if not a or b is None:
+                    continue
+                delta = (b - a) / a
+                mark = "REGRESSION" if delta > threshold else ""
+                print(f"{size:>8} {name:<55} {key:<10} {a:>10} → {b:>10} ({delta:+.1%}) {mark}")
+                if mark:
+                    regressions.append(f"{size} {name} {key} {delta:+.1%}")
+    cur_rounds = (current.get("collector") or {}).get("rounds") or []
+    old_rounds = (baseline.get("collector") or {}).get("rounds") or []
+    for cur, old in zip(cur_rounds, old_rounds):
+        a, b = old.get("wall_sec"), cur.get("wall_sec")
+        if a and b is not None:
+            delta = (b - a) / a
+            mark = "REGRESSION" if delta > threshold else ""
+            print(f"{'collect':>8} {cur['round']:<55} {'wall_sec':<10} {a:>10} → {b:>10} ({delta:+.1%}) {mark}")
+            if mark:
+                regressions.append(f"collector {cur['round']} wall_sec {delta:+.1%}")
+    return regressions
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=str(ROOT), stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, check=True, text=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="TFT 트래커 벤치마크")
+    ap.add_argument("--sizes", default="10k", help="쉼표 구분 (예: 10k,100k,1m)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR), help="생성 데이터셋 캐시 위치")
+    ap.add_argument("--out", default=None, help="결과 JSON 경로")
+    ap.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+    ap.add_argument("--threshold", type=float, default=0.20)
+    ap.add_argument("--fail-on-regression", action="store_true")
+    ap.add_argument("--skip-endpoints", action="store_true")
+    ap.add_argument("--skip-collector", action="store_true")
+    ap.add_argument("--collector-players", type=int, default=10)
+    ap.add_argument("--collector-per-player", type=int, default=3)
+    ap.add_argument("--stub-limits", default="20:1,100:120")
+    ap.add_argument("--stub-latency-ms", type=float, default=30.0)
+    ap.add_argument("--stub-jitter-ms", type=float, default=20.0)
+    ap.add_argument("--stub-random-429", type=float, default=0.0)
+    # 내부용
+    ap.add_argument("--child", choices=["endpoints", "collector"], help=argparse.SUPPRESS)
+    ap.add_argument("--child-size", type=int, default=0, help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        # 앱/collector의 stdout 로그가 결과 JSON에 섞이지 않도록
+        with contextlib.redirect_stdout(sys.stderr):
+            if args.child == "endpoints":
+                res = child_endpoints(args.child_size, args.repeat, args.seed)
+            else:
+                from collector import DEFAULT_TIERS
+                res = child_collector(args.collector_players, args.collector_per_player, DEFAULT_TIERS)
+        print(json.dumps(res))
+        return 0
+
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    result: Dict[str, Any] = {
+        "meta": {
+            "commit": _git_commit(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "sizes": sizes,
+        },
+        "endpoints": {},
+        "collector": None,
+    }
+    if not args.skip_endpoints:
+        for size in sizes:
+            result["endpoints"][str(size)] = run_endpoints(size, args)
+    if not args.skip_collector:
+        result["collector"] = run_collector(args)
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+        print(f"[bench] wrote {args.out}", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(result, baseline, args.threshold)
+        if regressions:
+            print(f"[bench] {len(regressions)} regression(s)", file=sys.stderr)
+            if args.fail_on_regression:
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
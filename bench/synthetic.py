@@ -0,0 +1,308 @@
+"""
+합성 TFT 데이터 생성기.
+
+같은 seed / 크기로 생성하면 항상 바이트 단위로 같은 matches.jsonl / summoners.json이
+나오도록 만든다 (커밋 간 벤치마크 비교용).
+
+    python -m bench.synthetic --matches 10000 --out bench/.data/10k
+"""
+import argparse
+import base64
+import json
+import random
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# 2025-06-15 00:00:00 UTC — 고정 기준 시각 (재현성)
+BASE_GAME_CREATION_MS = 1_749_945_600_000
+# 전체 데이터셋이 퍼질 기간 (크기와 무관하게 90일)
+DEFAULT_SPAN_MS = 90 * 24 * 3600 * 1000
+
+SET_NUMBER = 14
+TRAITS = [
+    "TFT14_Armorclad", "TFT14_Bruiser", "TFT14_Cyberboss", "TFT14_Cutter", "TFT14_Divinicorp",
+    "TFT14_EdgeRunner", "TFT14_Executioner", "TFT14_Immortal", "TFT14_Marksman", "TFT14_Overlord",
+    "TFT14_Rapidfire", "TFT14_SpeedyMcGee", "TFT14_Strong", "TFT14_Supercharge", "TFT14_Swift",
+    "TFT14_Techie", "TFT14_Thirsty", "TFT14_AnimaSquad", "TFT14_BallisTek", "TFT14_Controller",
+    "TFT14_Netrunner", "TFT14_Syndicate", "TFT14_Vanguard", "TFT14_Virus", "TFT14_Mob",
+]
+UNITS = [
+    "TFT14_Alistar", "TFT14_Annie", "TFT14_Aphelios", "TFT14_Aurora", "TFT14_Brand", "TFT14_Braum",
+    "TFT14_Chogath", "TFT14_Darius", "TFT14_DrMundo", "TFT14_Draven", "TFT14_Ekko", "TFT14_Elise",
+    "TFT14_Fiddlesticks", "TFT14_Galio", "TFT14_Garen", "TFT14_Gragas", "TFT14_Graves", "TFT14_Illaoi",
+    "TFT14_Jarvan", "TFT14_Jax", "TFT14_Jhin", "TFT14_Jinx", "TFT14_KogMaw", "TFT14_Kindred",
+    "TFT14_Leblanc", "TFT14_Mordekaiser", "TFT14_Morgana", "TFT14_Naafiri", "TFT14_Neeko",
+    "TFT14_NidaleeCougar", "TFT14_Poppy", "TFT14_Renekton", "TFT14_Rengar", "TFT14_Samira",
+    "TFT14_Senna", "TFT14_Seraphine", "TFT14_Shaco", "TFT14_Shyvana", "TFT14_Skarner", "TFT14_Sylas",
+    "TFT14_TwistedFate", "TFT14_Urgot", "TFT14_Varus", "TFT14_Vayne", "TFT14_Veigar", "TFT14_Vex",
+    "TFT14_Vi", "TFT14_Viego", "TFT14_Xayah", "TFT14_Yuumi", "TFT14_Zac", "TFT14_Zed", "TFT14_Zeri",
+    "TFT14_Ziggs", "TFT14_Zyra", "TFT14_Kobuko", "TFT14_Sejuani", "TFT14_Lucian",
+]
+ITEMS = [
+    "TFT_Item_InfinityEdge", "TFT_Item_JeweledGauntlet", "TFT_Item_GuinsoosRageblade",
+    "TFT_Item_Bloodthirster", "TFT_Item_GargoyleStoneplate", "TFT_Item_DragonsClaw",
+    "TFT_Item_WarmogsArmor", "TFT_Item_Redemption", "TFT_Item_SpearOfShojin",
+    "TFT_Item_RabadonsDeathcap", "TFT_Item_HextechGunblade", "TFT_Item_LastWhisper",
+    "TFT_Item_TitansResolve", "TFT_Item_SteraksGage", "TFT_Item_Quicksilver",
+    "TFT_Item_ArchangelsStaff", "TFT_Item_RunaansHurricane", "TFT_Item_Morellonomicon",
+    "TFT_Item_SunfireCape", "TFT_Item_ThiefsGloves", "TFT_Item_GiantSlayer", "TFT_Item_Crownguard",
+]
+AUGMENTS = [
+    "TFT14_Augment_CyberbossCrest", "TFT14_Augment_StreetDemonCrown", "TFT_Augment_CyberneticImplants2",
+    "TFT_Augment_PortableForge", "TFT_Augment_ThreesCompany", "TFT_Augment_PumpingUp",
+    "TFT_Augment_RollingForDays", "TFT_Augment_HealingOrbsI", "TFT_Augment_TinyTitans",
+    "TFT_Augment_CalculatedLoss", "TFT_Augment_SpoilsOfWar2", "TFT_Augment_BlueBattery2",
+    "TFT_Augment_TrainingReward", "TFT_Augment_ItemGrabBag1", "TFT_Augment_Recombobulator",
+    "TFT_Augment_CategoryFive", "TFT_Augment_LategameSpecialist", "TFT_Augment_Shimmerscale",
+]
+TIER_SHARES = [("CHALLENGER", 0.10), ("GRANDMASTER", 0.25), ("MASTER", 0.65)]
+
+
+def _puuid(rng: random.Random) -> str:
+    # 실제 puuid와 같은 78자 base64url 문자열
+    raw = rng.getrandbits(8 * 60).to_bytes(60, "big")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")[:78]
+
+
+class SyntheticWorld:
+    """
+    결정적(seed 고정) 합성 월드:
+      - tracked: 수집 대상 상위 랭커(티어/LP/전적 보유)
+      - others : 매치에 같이 등장하는 비추적 플레이어 (UNRANKED 처리)
+    make_match(i)는 i만으로 결정되므로 스텁 서버도 같은 매치를 재생성할 수 있다.
+    """
+
+    def __init__(self, seed: int = 42, tracked_players: int = 1000, other_players: int = 20000,
+                 n_matches: int = 10000, span_ms: int = DEFAULT_SPAN_MS) -> None:
+        self.seed = seed
+        self.n_matches = max(1, n_matches)
+        self.span_ms = span_ms
+        rng = random.Random(seed)
+
+        self.tracked: List[Dict[str, Any]] = []
+        cut = 0.0
+        bounds = []
+        for tier, share in TIER_SHARES:
+            cut += share
+            bounds.append((cut, tier))
+        for i in range(tracked_players):
+            frac = i / max(1, tracked_players)
+            tier = next((t for b, t in bounds if frac < b), bounds[-1][1])
+            # 상위일수록 LP가 높게
+            lp = int(2500 * (1.0 - frac) ** 2) + rng.randint(0, 60)
+            wins = rng.randint(80, 600)
+            self.tracked.append({
+                "puuid": _puuid(rng),
+                "gameName": f"합성랭커{i:05d}",
+                "tagLine": "KR1",
+                "tier": tier,
+                "leaguePoints": lp,
+                "wins": wins,
+                "losses": wins + rng.randint(-40, 120),
+            })
+        self.others: List[str] = [_puuid(rng) for _ in range(other_players)]
+        self.tracked_by_puuid = {p["puuid"]: p for p in self.tracked}
+        self._rank_of = {p["puuid"]: k for k, p in enumerate(self.tracked)}
+
+    # --- 매치 ---
+    def match_id(self, i: int) -> str:
+        return f"KR_{7_300_000_000 + i}"
+
+    def match_index(self, match_id: str) -> Optional[int]:
+        try:
+            i = int(match_id.split("_", 1)[1]) - 7_300_000_000
+        except (IndexError, ValueError):
+            return None
+        return i if 0 <= i < self.n_matches else None
+
+    def game_creation(self, i: int) -> int:
+        step = self.span_ms // self.n_matches
+        jitter = (((i * 2654435761) ^ self.seed) % 11 - 5) * step  # ±5 step (파일 순서 ≠ 시간 순서)
+        return BASE_GAME_CREATION_MS + i * step + jitter
+
+    def source_of(self, i: int) -> Dict[str, Any]:
+        """매치 i를 수집하게 만든 추적 플레이어"""
+        return self.tracked[(i * 7919 + self.seed) % len(self.tracked)]
+
+    def match_ids_for(self, puuid: str, count: int) -> List[str]:
+        """해당 플레이어가 '수집원'인 최근 매치 ID (최신순)"""
+        k = self._rank_of.get(puuid)
+        if k is None:
+            return []
+        out: List[str] = []
+        i = self.n_matches - 1
+        while i >= 0 and len(out) < count:
+            if (i * 7919 + self.seed) % len(self.tracked) == k:
+                out.append(self.match_id(i))
+            i -= 1
+        return out
+
+    def make_match(self, i: int, annotate: bool = True) -> Dict[str, Any]:
+        """
+        Riot match-v1 형태의 매치.
+        annotate=True면 collector가 저장할 때처럼 tier/is_source/_collected_for 주석을 단다.
+        """
+        rng = random.Random(self.seed * 1_000_003 + i)
+        created = self.game_creation(i)
+        src = self.source_of(i)
+
+        puuids = [src["puuid"]]
+        seen = {src["puuid"]}
+        while len(puuids) < 8:
+            if rng.random() < 0.35:
+                cand = self.tracked[rng.randrange(len(self.tracked))]["puuid"]
+            else:
+                cand = self.others[rng.randrange(len(self.others))]
+            if cand not in seen:
+                seen.add(cand)
+                puuids.append(cand)
+        placements = list(range(1, 9))
+        rng.shuffle(placements)
+
+        participants = []
+        for puuid, placement in zip(puuids, placements):
+            level = rng.choice((7, 8, 8, 8, 9, 9, 10))
+            traits = []
+            for name in rng.sample(TRAITS, rng.randint(6, 11)):
+                num_units = rng.randint(1, 7)
+                tier_current = min(4, num_units // 2)
+                traits.append({
+                    "name": name,
+                    "num_units": num_units,
+                    "style": tier_current and rng.randint(1, 4),
+                    "tier_current": tier_current,
+                    "tier_total": rng.randint(max(1, tier_current), 4),
+                })
+            units = []
+            for cid in rng.sample(UNITS, min(level, rng.randint(7, 10))):
+                units.append({
+                    "character_id": cid,
+                    "itemNames": rng.sample(ITEMS, rng.choice((0, 0, 1, 2, 3, 3))),
+                    "name": "",
+                    "rarity": rng.randint(0, 6),
+                    "tier": rng.choice((1, 2, 2, 2, 3)),
+                })
+            p: Dict[str, Any] = {
+                "augments": rng.sample(AUGMENTS, 3),
+                "companion": {"content_ID": f"{rng.getrandbits(64):016x}", "item_ID": rng.randint(1, 60),
+                              "skin_ID": rng.randint(1, 40), "species": "PetTFTAvatar"},
+                "gold_left": rng.randint(0, 60),
+                "last_round": rng.randint(20, 38),
+                "level": level,
+                "placement": placement,
+                "players_eliminated": rng.randint(0, 3),
+                "puuid": puuid,
+                "time_eliminated": round(rng.uniform(900.0, 2300.0), 3),
+                "total_damage_to_players": rng.randint(10, 200),
+                "traits": traits,
+                "units": units,
+            }
+            if annotate:
+                tracked = self.tracked_by_puuid.get(puuid)
+                p["tier"] = tracked["tier"] if tracked else "UNRANKED"
+                if puuid == src["puuid"]:
+                    p["is_source"] = True
+            participants.append(p)
+
+        info: Dict[str, Any] = {
+            "endOfGameResult": "GameComplete",
+            "gameCreation": created,
+            "gameId": 7_300_000_000 + i,
+            "game_datetime": created + 2_100_000,
+            "game_length": round(rng.uniform(1800.0, 2400.0), 3),
+            "game_version": "Version 15.1.649.2033 (Jan 09 2025/15:12:31) [PUBLIC] ",
+            "mapId": 22,
+            "participants": participants,
+            "queueId": 1100,
+            "queue_id": 1100,
+            "tft_game_type": "standard",
+            "tft_set_core_name": f"TFTSet{SET_NUMBER}",
+            "tft_set_number": SET_NUMBER,
+        }
+        if annotate:
+            info["_collected_for"] = {"puuid": src["puuid"], "tier": src["tier"]}
+        return {
+            "metadata": {"data_version": "6", "match_id": self.match_id(i), "participants": puuids},
+            "info": info,
+        }
+
+    # --- 소환사/리그 ---
+    def summoners(self) -> List[Dict[str, Any]]:
+        """collector가 summoners.json에 남기는 형태"""
+        out = []
+        for p in self.tracked:
+            out.append({
+                "puuid": p["puuid"],
+                "gameName": p["gameName"],
+                "tagLine": p["tagLine"],
+                "profileIconId": 29,
+                "revisionDate": BASE_GAME_CREATION_MS,
+                "summonerLevel": 300,
+                "tier": p["tier"],
+            })
+        return out
+
+    def league_entries(self, tier: str) -> List[Dict[str, Any]]:
+        want = tier.upper()
+        return [
+            {"puuid": p["puuid"], "leaguePoints": p["leaguePoints"], "rank": "I",
+             "wins": p["wins"], "losses": p["losses"], "veteran": False, "inactive": False,
+             "freshBlood": False, "hotStreak": False}
+            for p in self.tracked if p["tier"] == want
+        ]
+
+
+def generate_dataset(out_dir: Path, n_matches: int, seed: int = 42,
+                     tracked_players: int = 1000, other_players: int = 20000) -> Dict[str, Any]:
+    """out_dir에 matches.jsonl / summoners.json을 쓴다. 이미 같은 스펙이면 재사용."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    spec = {"n_matches": n_matches, "seed": seed, "tracked_players": tracked_players,
+            "other_players": other_players, "version": 1}
+    spec_path = out_dir / "dataset.json"
+    matches_path = out_dir / "matches.jsonl"
+    if spec_path.exists() and matches_path.exists():
+        try:
+            if json.loads(spec_path.read_text(encoding="utf-8")) == spec:
+                return spec
+        except Exception:
+            pass
+
+    world = SyntheticWorld(seed, tracked_players, other_players, n_matches)
+    tmp = matches_path.with_suffix(".jsonl.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        for i in range(n_matches):
+            f.write(json.dumps(world.make_match(i), ensure_ascii=False) + "\n")
+    tmp.replace(matches_path)
+    with (out_dir / "summoners.json").open("w", encoding="utf-8") as f:
+        json.dump(world.summoners(), f, ensure_ascii=False, indent=2)
+    spec_path.write_text(json.dumps(spec), encoding="utf-8")
+    return spec
+
+
+def parse_size(text: str) -> int:
+    """'10k' / '1m' / '2500' → 정수"""
+    t = text.strip().lower()
+    mult = 1
+    if t.endswith("k"):
+        mult, t = 1_000, t[:-1]
+    elif t.endswith("m"):
+        mult, t = 1_000_000, t[:-1]
+    return int(float(t) * mult)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="합성 TFT 데이터셋 생성")
+    ap.add_argument("--matches", default="10k")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--tracked", type=int, default=1000)
+    ap.add_argument("--others", type=int, default=20000)
+    ap.add_argument("--out", required=True)
+    args = ap.parse_args(argv)
+    spec = generate_dataset(Path(args.out), parse_size(args.matches), args.seed, args.tracked, args.others)
+    print(json.dumps(spec))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,8 +17,19 @@ from storage import (
     MATCHES_JSONL,
     load_existing_match_ids,
 )
+import profiling
+from rate_limiter import get_global_limiter
+from match_index import get_match_index
+from summaries import get_summary_store
+from players import get_player_stats
+from league_history import get_league_history
+from rollups import get_match_rollups
+from hot_cache import get_hot_cache
+from feed import get_feed
 
 DEFAULT_TIERS: List[str] = ["challenger", "grandmaster", "master"]
+# summoners.json에 함께 보관하는 리그 엔트리 필드
+LEAGUE_FIELDS = ("tier", "leaguePoints", "wins", "losses")
 
 
 def _iter_entries(platform_region: str, tiers: Iterable[str]) -> List[Dict[str, Any]]:
@@ -66,6 +77,27 @@ def _enrich_summoner_record(platform_region: str, puuid: str) -> Dict[str, Any]:
     return sm
 
 
+def sync_derived() -> None:
+    """
+    matches.jsonl 뒤에 붙은 매치를 파생 데이터에 반영:
+    보조 색인(티어 비트마스크 / puuid posting list) + 시간 롤업 + 요약 물질화 + 플레이어 집계 + 핫 캐시 + SSE 피드
+    """
+    try:
+        idx = get_match_index()
+        with profiling.phase("index"):
+            idx.refresh()
+        get_match_rollups().sync(idx)
+        store = get_summary_store()
+        store.sync(idx)
+        idx.ensure_postings()
+        get_player_stats().sync(idx, store)
+        cache = get_hot_cache()
+        cache.sync(store)
+        get_feed().notify(store, cache)
+    except Exception as e:
+        print(f"[collector] match index refresh error: {e}", file=sys.stderr)
+
+
 def collect_top_matches(
     platform_region: str = "kr",
     max_players: int = 50,
@@ -77,15 +109,43 @@ def collect_top_matches(
     - participants에 puuid 기반 tier 주석 주입
     - info._collected_for = { puuid, tier } 주석 추가
     - 수집 대상 참가자엔 is_source=True 부여
+    (PROFILE_SAMPLE_RATE가 켜져 있으면 실행 단위로 표본 추출해 구간 시간을 남김)
     """
+    with profiling.trace("collector", "collect_top_matches") as tr:
+        result = _collect_top_matches(platform_region, max_players, max_matches_per_player, tiers)
+        if tr is not None:
+            tr.meta.update({k: result[k] for k in ("players_collected", "matches_fetched", "api_calls")})
+        return result
+
+
+def _collect_top_matches(
+    platform_region: str,
+    max_players: int,
+    max_matches_per_player: int,
+    tiers: Iterable[str],
+) -> Dict[str, Any]:
     start = time.time()
+    limiter = get_global_limiter()
+    granted_before = limiter.granted
 
     # 이미 저장된 match_id(중복 방지)
     existing_ids: Set[str] = load_existing_match_ids(MATCHES_JSONL)
 
     # 1) 상위 리그(다중 tier) 목록 → LP 정렬 → 상위 max_players
     tiers_list = [t.strip().lower() for t in tiers if t and t.strip()]
-    entries = _iter_entries(platform_region, tiers_list)
+    with profiling.phase("league"):
+        entries = _iter_entries(platform_region, tiers_list)
+
+    # 받은 리그 엔트리 전체를 LP/티어 이력으로 남김 (잘라내기 전)
+    try:
+        get_league_history().record(
+            ((e.get("puuid"), e.get("_tier"), e.get("leaguePoints"), e.get("wins"), e.get("losses"))
+             for e in entries),
+            covered_tiers={e["_tier"] for e in entries},
+        )
+    except Exception as e:
+        print(f"[collector] league history error: {e}", file=sys.stderr)
+
     entries = sorted(entries, key=lambda e: e.get("leaguePoints", 0), reverse=True)[:max_players]
 
     # 2) PUUID 수집/캐시 + puuid->tier 매핑
@@ -115,27 +175,33 @@ def collect_top_matches(
         if not puuid:
             continue
 
+        # 현재 리그 상태 (프로필 표시용)
+        league = {"tier": tier}
+        for k in LEAGUE_FIELDS[1:]:
+            if e.get(k) is not None:
+                league[k] = e[k]
+
         # 캐시 갱신 (실제 닉네임 보강)
         if puuid not in cached_by_puuid:
             sm = _enrich_summoner_record(platform_region, puuid)
             if sm:
-                sm["tier"] = tier
+                sm.update(league)
                 updated_cache[puuid] = sm
                 added_players += 1
             else:
-                updated_cache.setdefault(puuid, {"puuid": puuid, "tier": tier})
+                updated_cache.setdefault(puuid, {"puuid": puuid, **league})
         else:
             try:
-                updated_cache[puuid]["tier"] = tier
+                updated_cache[puuid] = {**updated_cache[puuid], **league}
             except Exception:
-                updated_cache[puuid] = {"puuid": puuid, "tier": tier}
+                updated_cache[puuid] = {"puuid": puuid, **league}
 
         puuids.append(puuid)
         puuid_to_tier[puuid] = tier
 
     # 캐시 변경이 있으면 저장
     if (len(updated_cache) != len(cached_by_puuid)) or any(
-        (cached_by_puuid.get(k) or {}).get("tier") != (v or {}).get("tier")
+        any((cached_by_puuid.get(k) or {}).get(f) != (v or {}).get(f) for f in LEAGUE_FIELDS)
         for k, v in updated_cache.items()
     ):
         try:
@@ -147,10 +213,13 @@ def collect_top_matches(
     all_new_match_ids: List[str] = []
     seen_this_run: Set[str] = set()
     mid_source: Dict[str, str] = {}  # match_id -> source puuid
+    ids_checked = 0  # 받아 본 match_id 수 (적응형 스케줄러의 '신선도' 계산용)
 
     for puuid in puuids:
         try:
-            ids = get_match_ids(platform_region, puuid, count=max_matches_per_player)
+            with profiling.phase("match_ids"):
+                ids = get_match_ids(platform_region, puuid, count=max_matches_per_player)
+            ids_checked += len(ids)
             for mid in ids:
                 if (mid not in existing_ids) and (mid not in seen_this_run):
                     all_new_match_ids.append(mid)
@@ -164,7 +233,8 @@ def collect_top_matches(
     matches: List[Dict[str, Any]] = []
     for mid in all_new_match_ids:
         try:
-            match = get_match(platform_region, mid)
+            with profiling.phase("match_detail"):
+                match = get_match(platform_region, mid)
             info = match.get("info", {}) or {}
             parts = info.get("participants", []) or []
 
@@ -187,9 +257,12 @@ def collect_top_matches(
 
     if matches:
         try:
-            append_jsonl(MATCHES_JSONL, matches)
+            with profiling.phase("append"):
+                append_jsonl(MATCHES_JSONL, matches)
         except Exception as e:
             print(f"[collector] append_jsonl error: {e}", file=sys.stderr)
+    # 새 매치가 없어도 실행: 밀린 요약(업그레이드 직후 등)은 요청이 아니라 수집 시점에 만든다
+    sync_derived()
 
     duration = round(time.time() - start, 2)
     print(
@@ -202,6 +275,9 @@ def collect_top_matches(
         "tiers": [t for t in tiers_list],
         "players_collected": len(puuids),
         "matches_fetched": len(matches),
+        "players_added": added_players,
+        "match_ids_checked": ids_checked,
+        "api_calls": limiter.granted - granted_before,
         "duration_sec": duration,
     }
 
@@ -0,0 +1,16 @@
+"""
+pytest 공통 설정.
+
+storage 등은 import 시점에 DATA_DIR을 읽으므로, 테스트 모듈을 import하기 전에
+DATA_DIR을 임시 디렉터리로 돌려 테스트가 저장소의 data/(운영 데이터 형태)에 쓰지 않게 한다.
+"""
+import os
+import shutil
+import tempfile
+
+_TEST_DATA_DIR = tempfile.mkdtemp(prefix="tft-test-data-")
+os.environ["DATA_DIR"] = _TEST_DATA_DIR
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_TEST_DATA_DIR, ignore_errors=True)
@@ -0,0 +1,226 @@
+"""
+새 매치 SSE 피드 (/api/stream).
+
+collector가 요약을 만들고 나면 publish()가 새 매치마다 SSE 프레임을 한 번만 인코딩해
+공유 링(최근 FEED_BACKLOG개)에 넣고 Condition으로 대기 중인 클라이언트를 깨운다.
+  - 이벤트 id = "<색인 generation 앞 8자>:<매치 수>" → Last-Event-ID로 이어받기
+    (링 범위 안이면 빠진 매치를 그대로 재전송, 벗어나면 reset 이벤트 → 클라이언트가 다시 로드)
+  - 클라이언트마다 링 안의 커서 하나만 들고 있으므로 밀린 양은 FEED_BACKLOG개로 제한
+  - 새 이벤트가 없으면 FEED_HEARTBEAT_SEC마다 주석 한 줄(ping)만 보냄
+  - 다른 프로세스가 수집한 경우에도 ping 시점에 catch_up()으로 따라잡음
+  - 첫 접속은 ?since=<처음 불러온 매치 수>로 그 뒤부터 받을 수 있음 (로드와 구독 사이에 온 매치 유실 방지)
+열린 스트림 하나가 응답 스레드 하나를 계속 잡고 있으므로(개발 서버 `python app.py`는 요청마다 스레드)
+동시 스트림 수는 FEED_MAX_STREAMS(기본 50, 0=무제한)로 제한하고 넘으면 /api/stream이 503을 준다.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import serializer
+from hot_cache import encode, get_hot_cache
+from match_index import get_match_index
+from summaries import REQUEST_SYNC_LIMIT, get_summary_store, load_name_map
+
+FEED_BACKLOG = int(os.getenv("FEED_BACKLOG", "500"))
+FEED_HEARTBEAT_SEC = float(os.getenv("FEED_HEARTBEAT_SEC", "15"))
+FEED_MAX_STREAMS = int(os.getenv("FEED_MAX_STREAMS", "50"))
+
+_PING = b": ping\n\n"
+
+
+class _Frame:
+    __slots__ = ("seq", "data", "tiers", "created")
+
+    def __init__(self, seq: int, data: bytes, tiers: Counter, created: int) -> None:
+        self.seq = seq
+        self.data = data
+        self.tiers = tiers
+        self.created = created
+
+
+def _event(event: str, payload, event_id: Optional[str] = None) -> bytes:
+    """payload가 bytes면 이미 인코딩된 JSON으로 보고 그대로 씀"""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    data = payload if isinstance(payload, bytes) else serializer.dumps(payload)
+    return f"{head}event: {event}\n".encode("utf-8") + b"data: " + data + b"\n\n"
+
+
+class MatchFeed:
+    def __init__(self, backlog: int = FEED_BACKLOG, heartbeat: float = FEED_HEARTBEAT_SEC,
+                 index=None, store=None, cache=None, max_streams: int = FEED_MAX_STREAMS) -> None:
+        # index/store/cache를 안 주면 프로세스 전역 싱글톤을 쓴다
+        self._index, self._store, self._cache = index, store, cache
+        self.backlog = max(1, backlog)
+        self.heartbeat = heartbeat
+        self.max_streams = max_streams
+        self._cond = threading.Condition()
+        self._frames: deque = deque(maxlen=self.backlog)
+        self.generation: Optional[str] = None
+        self.head = 0  # 마지막으로 발행한 매치 수 (= 마지막 이벤트 seq)
+        self.clients = 0
+        self._last_poll = 0.0
+
+    def _tag(self) -> str:
+        return (self.generation or "")[:8]
+
+    def _id(self, seq: int) -> str:
+        return f"{self._tag()}:{seq}"
+
+    # --- 발행 ---
+    def publish(self, store, cache=None) -> int:
+        """store에 새로 생긴 요약을 프레임으로 만들어 대기 중인 클라이언트에 알린다."""
+        with self._cond:
+            if store.generation != self.generation:
+                # 처음 / 색인 재구성: 링을 새로 채움 (재접속 이어받기용, 새 이벤트로는 안 봄)
+                self._frames.clear()
+                self.generation = store.generation
+                self.head = max(0, len(store) - self.backlog)
+            end = len(store)
+            if end <= self.head:
+                self._cond.notify_all()
+                return 0
+            start = max(self.head, end - self.backlog)
+            ords = list(range(start, end))
+            compacts = store.read_many(ords)
+            name_map = load_name_map()
+            # 본문은 /api/matches/summary와 같은 인코딩 (핫 캐시에 있으면 그 바이트를 그대로)
+            bodies = (cache.get_many(ords, store, name_map) if cache is not None
+                      else [encode(c, name_map) for c in compacts])
+            for i, compact, body in zip(ords, compacts, bodies):
+                seq = i + 1
+                data = _event("match", body, self._id(seq))
+                created = compact[1] if isinstance(compact[1], int) else 0
+                self._frames.append(_Frame(seq, data, Counter(p[1] for p in compact[7]), created))
+            made = end - self.head
+            self.head = end
+            self._cond.notify_all()
+            return made
+
+    def notify(self, store, cache=None) -> int:
+        """collector용: 구독자가 한 번도 없었던 프로세스에서는 아무것도 하지 않음"""
+        if self.generation is None:
+            return 0
+        return self.publish(store, cache)
+
+    def catch_up(self, force: bool = False) -> int:
+        """다른 프로세스가 추가한 매치까지 반영 (heartbeat 간격으로만 실제 수행)"""
+        now = time.monotonic()
+        if not force and now - self._last_poll < self.heartbeat:
+            return 0
+        self._last_poll = now
+        try:
+            idx = self._index if self._index is not None else get_match_index()
+            idx.refresh()
+            store = self._store if self._store is not None else get_summary_store()
+            store.sync(idx, limit=REQUEST_SYNC_LIMIT)
+            cache = self._cache if self._cache is not None else get_hot_cache()
+            cache.sync(store)
+            return self.publish(store, cache)
+        except Exception as e:
+            print(f"[feed] catch-up error: {e}", file=sys.stderr)
+            return 0
+
+    # --- 구독 ---
+    def _parse_id(self, last_event_id: Optional[str]) -> Optional[Tuple[str, int]]:
+        try:
+            gen, seq = (last_event_id or "").rsplit(":", 1)
+            return gen, int(seq)
+        except ValueError:
+            return None
+
+    def full(self) -> bool:
+        """동시 스트림 상한에 닿았는지 (새 연결을 받기 전에 확인)"""
+        with self._cond:
+            return 0 < self.max_streams <= self.clients
+
+    def _start_cursor(self, last_event_id: Optional[str],
+                      since: Optional[int] = None) -> Tuple[int, Optional[bytes]]:
+        """(커서, 먼저 보낼 프레임). 이어받을 id가 없고 since가 있으면 현재 색인의 since번째부터"""
+        parsed = self._parse_id(last_event_id)
+        if parsed is None and since is not None:
+            parsed = self._tag(), since
+        if parsed is None:
+            return self.head, _event("hello", {"total_matches": self.head}, self._id(self.head))
+        gen, seq = parsed
+        oldest = self._frames[0].seq - 1 if self._frames else self.head
+        if gen != self._tag() or not oldest <= seq <= self.head:
+            return self.head, _event("reset", {"total_matches": self.head}, self._id(self.head))
+        return seq, None
+
+    def _take(self, cursor: int) -> Optional[List[_Frame]]:
+        """cursor 다음 프레임들. 링에서 밀려났으면 None"""
+        if cursor >= self.head:
+            return []
+        if not self._frames or self._frames[0].seq > cursor + 1:
+            return None
+        skip = cursor + 1 - self._frames[0].seq
+        return [self._frames[k] for k in range(skip, len(self._frames))]
+
+    def _stats_delta(self, frames: List[_Frame]) -> bytes:
+        tiers: Counter = Counter()
+        for f in frames:
+            tiers.update(f.tiers)
+        return _event("stats", {
+            "new_matches": len(frames),
+            "total_matches": frames[-1].seq,
+            "matches_by_tier": dict(tiers),
+            "last_updated": max(f.created for f in frames) or None,
+        })
+
+    def stream(self, last_event_id: Optional[str] = None, since: Optional[int] = None) -> Iterator[bytes]:
+        """
+        SSE 바이트 스트림 (클라이언트 연결이 끊기면 GeneratorExit로 종료)
+        last_event_id(재접속)가 since(첫 로드 위치)보다 우선한다.
+        """
+        # 클라이언트가 본 위치가 아직 발행 전이면 바로 따라잡아야 reset 없이 이어진다
+        self.catch_up(force=self.generation is None or (since is not None and since > self.head))
+        with self._cond:
+            cursor, first = self._start_cursor(last_event_id, since)
+            gen = self.generation
+            self.clients += 1
+        try:
+            yield b"retry: 5000\n\n" + (first or b"")
+            while True:
+                with self._cond:
+                    if cursor >= self.head and gen == self.generation:
+                        self._cond.wait(self.heartbeat)
+                    if gen != self.generation:
+                        gen, cursor = self.generation, self.head
+                        out = _event("reset", {"total_matches": self.head}, self._id(self.head))
+                    else:
+                        frames = self._take(cursor)
+                        if frames is None:  # 너무 밀림 → 처음부터 다시 받게 함
+                            cursor = self.head
+                            out = _event("reset", {"total_matches": self.head}, self._id(self.head))
+                        elif frames:
+                            cursor = frames[-1].seq
+                            out = b"".join(f.data for f in frames) + self._stats_delta(frames)
+                        else:
+                            out = None
+                if out is None:
+                    self.catch_up()
+                    out = _PING
+                yield out
+        finally:
+            with self._cond:
+                self.clients -= 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"clients": self.clients, "head": self.head, "buffered": len(self._frames)}
+
+
+_global_feed: Optional[MatchFeed] = None
+_global_lock = threading.Lock()
+
+
+def get_feed() -> MatchFeed:
+    global _global_feed
+    if _global_feed is None:
+        with _global_lock:
+            if _global_feed is None:
+                _global_feed = MatchFeed()
+    return _global_feed
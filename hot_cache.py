@@ -0,0 +1,127 @@
+"""
+최근 매치 요약 핫 캐시 (프로세스 메모리).
+
+최신 N개(HOT_CACHE_SIZE, 기본 2000) 매치의 요약을 이름까지 입힌 JSON 바이트로 링 버퍼에 들고 있어
+/api/matches/summary 같은 최신순 화면은 디스크 읽기 / 디코드 / expand / 인코드 없이
+바이트를 이어 붙이기만 한다 (app._raw_matches_response와 같은 방식).
+  - 슬롯 하나 = (매치 번호, 인코딩된 요약) → 메모리는 capacity × 요약 크기로 고정
+  - 이름 맵(summoners.json)이 바뀌면 링을 비우고 다시 채움 (이름이 바이트 안에 박혀 있으므로)
+collector가 요약을 만든 직후 sync()로 채우고, 다른 프로세스에서 수집된 경우에도
+요청 시 sync()가 SummaryStore에서 모자란 부분만 읽어 온다.
+"""
+import os
+import threading
+from typing import Dict, List, Optional
+
+import serializer
+from summaries import SummaryStore, expand, load_name_map
+
+HOT_CACHE_SIZE = int(os.getenv("HOT_CACHE_SIZE", "2000"))
+
+
+def encode(compact: list, name_map: Dict[str, str]) -> bytes:
+    """compact 요약 → 응답에 그대로 넣을 JSON 바이트 (jsonify와 같은 키 정렬)"""
+    return serializer.dumps(expand(compact, name_map), sort_keys=True)
+
+
+class HotCache:
+    """SummaryStore 앞단의 최근 N개 링 버퍼. get_many()는 인코딩된 요약(bytes)을 돌려준다."""
+
+    def __init__(self, capacity: int = HOT_CACHE_SIZE) -> None:
+        self.capacity = max(1, capacity)
+        self._lock = threading.Lock()
+        self._reset(None, None)
+        self.hits = 0
+        self.misses = 0
+
+    def _reset(self, generation: Optional[str], names: Optional[Dict[str, str]]) -> None:
+        self.generation = generation
+        self._names = names
+        self._ords: List[int] = [-1] * self.capacity
+        self._data: List[Optional[bytes]] = [None] * self.capacity
+        self._next = 0  # 다음에 채울 매치 번호 (= 지금까지 본 개수)
+
+    def _check(self, store: SummaryStore, name_map: Dict[str, str]) -> None:
+        # 색인 재구성 또는 이름 변경 → 처음부터 (같은 객체면 비교 생략)
+        if store.generation != self.generation or (
+                name_map is not self._names and name_map != self._names):
+            self._reset(store.generation, name_map)
+        self._names = name_map
+
+    # --- 채우기 ---
+    def sync(self, store: SummaryStore, name_map: Optional[Dict[str, str]] = None) -> int:
+        """store에 새로 생긴 요약 중 최신 capacity개 안에 드는 것만 링에 넣는다."""
+        if name_map is None:
+            name_map = load_name_map()
+        with self._lock:
+            self._check(store, name_map)
+            end = len(store)
+            start = max(self._next, end - self.capacity)
+            if start >= end:
+                return 0
+            ords = list(range(start, end))
+            for i, compact in zip(ords, store.read_many(ords)):
+                self._put(i, encode(compact, name_map))
+            self._next = end
+            return end - start
+
+    def _put(self, ordinal: int, data: bytes) -> None:
+        slot = ordinal % self.capacity
+        self._ords[slot] = ordinal
+        self._data[slot] = data
+
+    # --- 읽기 ---
+    def get_many(self, ords: List[int], store: SummaryStore,
+                 name_map: Optional[Dict[str, str]] = None) -> List[bytes]:
+        """ords 순서대로 인코딩된 요약. 링에 없는 것만 store에서 읽어 만든다."""
+        if name_map is None:
+            name_map = load_name_map()
+        out: List[Optional[bytes]] = []
+        missing: List[int] = []
+        with self._lock:
+            self._check(store, name_map)
+            cached_ords, data, cap = self._ords, self._data, self.capacity
+            for i in ords:
+                if cached_ords[i % cap] == i:
+                    out.append(data[i % cap])
+                else:
+                    out.append(None)
+                    missing.append(i)
+            self.hits += len(ords) - len(missing)
+            self.misses += len(missing)
+            generation = self.generation
+        if not missing:
+            return out
+        made = [encode(c, name_map) for c in store.read_many(missing)]
+        with self._lock:
+            if self.generation == generation and self._names is name_map:
+                # 링 범위(최신 capacity개) 안인데 빠져 있던 것만 채워 둠 (오래된 매치가 최신을 밀어내지 않게)
+                floor = self._next - self.capacity
+                for i, d in zip(missing, made):
+                    if floor <= i < self._next:
+                        self._put(i, d)
+        loaded = iter(made)
+        return [d if d is not None else next(loaded) for d in out]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "cached": sum(1 for d in self._data if d is not None),
+                "bytes": sum(len(d) for d in self._data if d is not None),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_global_cache: Optional[HotCache] = None
+_global_lock = threading.Lock()
+
+
+def get_hot_cache() -> HotCache:
+    global _global_cache
+    if _global_cache is None:
+        with _global_lock:
+            if _global_cache is None:
+                _global_cache = HotCache()
+    return _global_cache
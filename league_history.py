@@ -0,0 +1,333 @@
+"""
+플레이어별 LP/티어 이력 (리그 엔트리 스냅샷).
+
+collector가 매 주기 받아 오는 리그 엔트리(tier / leaguePoints / wins / losses)를
+DATA_DIR/history/league.log에 append-only로 쌓는다.
+  - 바뀐 플레이어만 기록하고, 값은 그 플레이어의 직전 기록 대비 차이(delta)로 저장
+      블록 = 헤더 <4sIII(종류, 시각(초), 레코드 수, 바이트 수)> + 레코드들
+      좁은 블록 b"LPd1": <IBhhh (puuid id, tier 코드, ΔLP, Δwins, Δlosses)
+      넓은 블록 b"LPw1": <IBiii (int16에 안 들어가는 차이)
+  - 수집한 티어 목록에서 빠진 플레이어는 tier=_GONE으로 한 번 기록
+  - puuid id 표는 puuids.txt (줄 번호 = id)
+메모리에서는 플레이어마다 array 기반 시계열 + 시간/일 단위 롤업(시가/종가/최저/최고 LP, 판수)을
+유지하므로(일 버킷은 rollups와 같은 KST 자정 기준) 구간 조회는 bisect 두 번 + 구간 길이만큼만 든다.
+여러 프로세스가 같은 파일에 쓰더라도 file_lock 안에서 남이 붙인 블록부터 읽고 나서 쓴다.
+"""
+import bisect
+import heapq
+import struct
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from match_index import TIERS
+from rollups import bucket_start
+from storage import DATA_DIR, file_lock
+
+HISTORY_DIR = DATA_DIR / "history"
+
+_HEAD = struct.Struct("<4sIII")
+_NARROW = struct.Struct("<IBhhh")
+_WIDE = struct.Struct("<IBiii")
+_KIND_NARROW = b"LPd1"
+_KIND_WIDE = b"LPw1"
+
+_TIER_CODE: Dict[str, int] = {t: i for i, t in enumerate(TIERS)}
+_OTHER = 254  # 목록 밖 티어 문자열
+_GONE = 255   # 수집한 티어 목록에서 빠짐
+
+RESOLUTIONS = {"hour": 3600, "day": 86400}
+
+
+def tier_name(code: int) -> Optional[str]:
+    if code == _GONE:
+        return None
+    return TIERS[code] if code < len(TIERS) else "OTHER"
+
+
+def _tier_rank(code: int) -> int:
+    """래더 정렬용 (높을수록 위). UNRANKED/목록 밖은 맨 아래"""
+    if code < len(TIERS) and TIERS[code] != "UNRANKED":
+        return code
+    return -1
+
+
+def _fits16(*vals: int) -> bool:
+    return all(-32768 <= v <= 32767 for v in vals)
+
+
+class _Rollup:
+    """고정 폭(span초, 일 단위는 KST 자정) 버킷: 버킷 안 마지막 티어, LP 시가/종가/최저/최고, 판수(Δwins+Δlosses)"""
+    __slots__ = ("span", "t", "tier", "open", "close", "low", "high", "games")
+
+    def __init__(self, span: int) -> None:
+        self.span = span
+        self.t = array("I")
+        self.tier = array("B")
+        self.open = array("i")
+        self.close = array("i")
+        self.low = array("i")
+        self.high = array("i")
+        self.games = array("I")
+
+    def add(self, t: int, tier: int, lp: int, games: int) -> None:
+        b = bucket_start(t, self.span)
+        if self.t and self.t[-1] == b:
+            self.tier[-1] = tier
+            self.close[-1] = lp
+            self.low[-1] = min(self.low[-1], lp)
+            self.high[-1] = max(self.high[-1], lp)
+            self.games[-1] += games
+        else:
+            self.t.append(b)
+            self.tier.append(tier)
+            for a in (self.open, self.close, self.low, self.high):
+                a.append(lp)
+            self.games.append(games)
+
+    def range(self, start: int, end: int) -> List[Dict[str, Any]]:
+        lo = bisect.bisect_left(self.t, bucket_start(start, self.span))
+        hi = bisect.bisect_right(self.t, end)
+        return [{
+            "t": self.t[k] * 1000,
+            "tier": tier_name(self.tier[k]),
+            "lp_open": self.open[k],
+            "lp_close": self.close[k],
+            "lp_min": self.low[k],
+            "lp_max": self.high[k],
+            "games": self.games[k],
+        } for k in range(lo, hi)]
+
+
+class _Series:
+    """한 플레이어의 변경 시점 목록 (시각 오름차순)"""
+    __slots__ = ("t", "tier", "lp", "wins", "losses", "rollups")
+
+    def __init__(self) -> None:
+        self.t = array("I")
+        self.tier = array("B")
+        self.lp = array("i")
+        self.wins = array("i")
+        self.losses = array("i")
+        self.rollups = {name: _Rollup(span) for name, span in RESOLUTIONS.items()}
+
+    def last(self) -> Tuple[int, int, int, int]:
+        if not self.t:
+            return _GONE, 0, 0, 0
+        return self.tier[-1], self.lp[-1], self.wins[-1], self.losses[-1]
+
+    def append(self, t: int, tier: int, lp: int, wins: int, losses: int) -> None:
+        _, _, w0, l0 = self.last()
+        games = max(0, (wins - w0) + (losses - l0)) if self.t else 0
+        self.t.append(t)
+        self.tier.append(tier)
+        self.lp.append(lp)
+        self.wins.append(wins)
+        self.losses.append(losses)
+        if tier != _GONE:
+            for r in self.rollups.values():
+                r.add(t, tier, lp, games)
+
+    def point(self, k: int) -> Dict[str, Any]:
+        return {
+            "t": self.t[k] * 1000,
+            "tier": tier_name(self.tier[k]),
+            "leaguePoints": self.lp[k],
+            "wins": self.wins[k],
+            "losses": self.losses[k],
+        }
+
+    def index_at(self, t: int) -> int:
+        """t 시점에 유효한 기록 번호 (없으면 -1)"""
+        return bisect.bisect_right(self.t, t) - 1
+
+
+class LeagueHistory:
+    def __init__(self, root: Path = HISTORY_DIR) -> None:
+        self.root = root
+        self._lock = threading.RLock()
+        self._puuids: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._series: List[_Series] = []
+        self.cycles = array("I")  # 기록한 수집 주기 시각 (초)
+        self._pos = 0            # league.log에서 읽은 바이트 위치
+        self._puuids_pos = 0
+
+    @property
+    def _log_path(self) -> Path:
+        return self.root / "league.log"
+
+    @property
+    def _puuids_path(self) -> Path:
+        return self.root / "puuids.txt"
+
+    def _id(self, puuid: str) -> int:
+        pid = self._ids.get(puuid)
+        if pid is None:
+            pid = self._ids[puuid] = len(self._puuids)
+            self._puuids.append(puuid)
+            self._series.append(_Series())
+        return pid
+
+    # --- 파일 → 메모리 ---
+    def _catch_up(self) -> None:
+        """다른 프로세스(또는 재시작 전)가 붙인 puuid / 블록을 읽어 들인다."""
+        if self._puuids_path.exists() and self._puuids_path.stat().st_size > self._puuids_pos:
+            with self._puuids_path.open("rb") as f:
+                f.seek(self._puuids_pos)
+                data = f.read()
+            cut = data.rfind(b"\n") + 1
+            for line in data[:cut].decode("utf-8").splitlines():
+                self._id(line)
+            self._puuids_pos += cut
+        if not self._log_path.exists() or self._log_path.stat().st_size <= self._pos:
+            return
+        with self._log_path.open("rb") as f:
+            f.seek(self._pos)
+            data = f.read()
+        pos = 0
+        while pos + _HEAD.size <= len(data):
+            kind, t, n, nbytes = _HEAD.unpack_from(data, pos)
+            body = data[pos + _HEAD.size:pos + _HEAD.size + nbytes]
+            if len(body) < nbytes:
+                break  # 쓰다 만 블록 → 다음에 (또는 record 때 잘라냄)
+            rec = _NARROW if kind == _KIND_NARROW else _WIDE
+            recs = list(rec.iter_unpack(body))
+            if any(r[0] >= len(self._series) for r in recs):
+                # 락 없이 읽는 쪽: puuids.txt를 읽은 뒤 붙은 블록 → 다음 호출에서 다시
+                break
+            if kind == _KIND_NARROW and (not self.cycles or self.cycles[-1] != t):
+                self.cycles.append(t)
+            for pid, tier, dlp, dw, dl in recs:
+                s = self._series[pid]
+                _, lp0, w0, l0 = s.last()
+                s.append(t, tier, lp0 + dlp, w0 + dw, l0 + dl)
+            pos += _HEAD.size + nbytes
+        self._pos += pos
+
+    def _trim_tail(self) -> None:
+        """중단된 쓰기로 남은 불완전한 블록/줄 제거 (락 보유 상태에서)"""
+        for path, keep in ((self._log_path, self._pos), (self._puuids_path, self._puuids_pos)):
+            if path.exists() and path.stat().st_size > keep:
+                with path.open("r+b") as f:
+                    f.truncate(keep)
+
+    # --- 기록 ---
+    def record(self, entries: Iterable[Tuple[str, Optional[str], Any, Any, Any]],
+               covered_tiers: Iterable[str], t: Optional[int] = None) -> int:
+        """
+        한 주기의 리그 엔트리 (puuid, tier, leaguePoints, wins, losses)를 기록.
+        covered_tiers: 이번에 목록을 받아 온 티어 — 여기 속했는데 안 보이는 플레이어는 빠진 것으로 기록.
+        바뀐 플레이어 수를 반환.
+        """
+        t = int(time.time()) if t is None else int(t)
+        covered = {_TIER_CODE.get(x.upper(), _OTHER) for x in covered_tiers}
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with file_lock(self.root / ".lock"):
+                self._catch_up()
+                self._trim_tail()
+                new_puuids: List[str] = []
+                narrow: List[bytes] = []
+                wide: List[bytes] = []
+                seen = set()
+                changed: List[Tuple[int, int, int, int, int]] = []
+
+                def emit(pid: int, tier: int, lp: int, wins: int, losses: int) -> None:
+                    tier0, lp0, w0, l0 = self._series[pid].last()
+                    d = (lp - lp0, wins - w0, losses - l0)
+                    if tier == tier0 and d == (0, 0, 0):
+                        return
+                    if _fits16(*d):
+                        narrow.append(_NARROW.pack(pid, tier, *d))
+                    else:
+                        wide.append(_WIDE.pack(pid, tier, *d))
+                    changed.append((pid, tier, lp, wins, losses))
+
+                for puuid, tier, lp, wins, losses in entries:
+                    if not puuid or puuid in seen:
+                        continue
+                    seen.add(puuid)
+                    if puuid not in self._ids:
+                        new_puuids.append(puuid)
+                    pid = self._id(puuid)
+                    emit(pid, _TIER_CODE.get((tier or "UNRANKED").upper(), _OTHER),
+                         int(lp or 0), int(wins or 0), int(losses or 0))
+                for pid, s in enumerate(self._series):
+                    if self._puuids[pid] not in seen and s.t and s.tier[-1] in covered:
+                        _, lp0, w0, l0 = s.last()
+                        emit(pid, _GONE, lp0, w0, l0)
+
+                out = b""
+                for kind, recs in ((_KIND_NARROW, narrow), (_KIND_WIDE, wide)):
+                    if recs or kind == _KIND_NARROW:  # 좁은 블록은 빈 것도 남겨 주기 시각을 기록
+                        body = b"".join(recs)
+                        out += _HEAD.pack(kind, t, len(recs), len(body)) + body
+                if new_puuids:
+                    with self._puuids_path.open("ab") as f:
+                        f.write("".join(p + "\n" for p in new_puuids).encode("utf-8"))
+                    self._puuids_pos = self._puuids_path.stat().st_size
+                with self._log_path.open("ab") as f:
+                    f.write(out)
+                self._pos += len(out)
+                self.cycles.append(t)
+                for pid, tier, lp, wins, losses in changed:
+                    self._series[pid].append(t, tier, lp, wins, losses)
+                return len(changed)
+
+    # --- 조회 ---
+    def series(self, puuid: str, start: int, end: int, resolution: str = "raw") -> Optional[Dict[str, Any]]:
+        """[start, end] (초) 구간. raw는 변경 시점 그대로, hour/day는 롤업 버킷"""
+        with self._lock:
+            self._catch_up()
+            pid = self._ids.get(puuid)
+            if pid is None:
+                return None
+            s = self._series[pid]
+            k = s.index_at(start)
+            out: Dict[str, Any] = {"start": s.point(k) if k >= 0 else None}
+            if resolution == "raw":
+                hi = bisect.bisect_right(s.t, end)
+                out["points"] = [s.point(j) for j in range(k + 1, hi)]
+            else:
+                out["points"] = s.rollups[resolution].range(start, end)
+            return out
+
+    def ladder(self, t: int, tier: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """t 시점의 래더 (티어 → LP 내림차순)"""
+        want = _TIER_CODE.get(tier.upper(), _OTHER) if tier else None
+        rows = []
+        with self._lock:
+            self._catch_up()
+            for pid, s in enumerate(self._series):
+                k = s.index_at(t)
+                if k < 0 or s.tier[k] == _GONE or (want is not None and s.tier[k] != want):
+                    continue
+                rows.append((_tier_rank(s.tier[k]), s.lp[k], pid, k))
+            top = heapq.nlargest(limit, rows)
+            return [{"rank": r + 1, "puuid": self._puuids[pid], **self._series[pid].point(k)}
+                    for r, (_, _, pid, k) in enumerate(top)]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "players": len(self._series),
+                "cycles": len(self.cycles),
+                "points": sum(len(s.t) for s in self._series),
+                "log_bytes": self._pos,
+            }
+
+
+_global_history: Optional[LeagueHistory] = None
+_global_lock = threading.Lock()
+
+
+def get_league_history() -> LeagueHistory:
+    global _global_history
+    if _global_history is None:
+        with _global_lock:
+            if _global_history is None:
+                _global_history = LeagueHistory()
+    return _global_history
@@ -0,0 +1,356 @@
+"""
+matches.jsonl 보조 색인.
+
+매치 한 줄마다 (바이트 오프셋, 길이, gameCreation, 티어 비트마스크)를 고정 크기 레코드로
+저장하고, 참가자 puuid → 매치 번호 posting list를 유지한다.
+
+- 티어 필터: 티어별 비트맵(bytearray)을 큰 정수로 바꿔 OR/AND → 켜진 비트만 순회
+- 플레이어 필터: posting list(array('I'))
+- 본문은 선택된 매치만 seek + 디코드
+
+색인은 collector가 append_jsonl 직후 refresh()로 갱신하며, 다른 프로세스가 쓴 줄도
+refresh() 때 파일 끝에서부터 따라잡는다. 색인 파일은 DATA_DIR/index/ 아래에 둔다.
+"""
+import heapq
+import json
+import os
+import struct
+import threading
+import uuid
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import profiling
+import serializer
+from storage import DATA_DIR, MATCHES_JSONL, file_lock
+
+INDEX_VERSION = 1
+INDEX_DIR = DATA_DIR / "index"
+
+TIERS: List[str] = [
+    "IRON", "BRONZE", "SILVER", "GOLD", "PLATINUM", "EMERALD", "DIAMOND",
+    "MASTER", "GRANDMASTER", "CHALLENGER", "UNRANKED",
+]
+TIER_BIT: Dict[str, int] = {t: i for i, t in enumerate(TIERS)}
+OTHER_BIT = 15  # 목록에 없는 티어 문자열 (필터 시 본문으로 재확인)
+
+# 레코드: offset, length, gameCreation, tier mask
+_REC = struct.Struct("<QIqH")
+_REC_SIZE = _REC.size
+_NO_PLAYER = 0xFFFFFFFF
+_PLAYERS_PER_MATCH = 8
+_SCAN_CHUNK = 32 * 1024 * 1024
+
+
+def tier_mask(tiers: Iterable[Optional[str]]) -> int:
+    """참가자 tier 주석들 → 비트마스크 (빈 tier는 어떤 티어와도 일치하지 않음)"""
+    mask = 0
+    for t in tiers:
+        t = (t or "").upper()
+        if t:
+            mask |= 1 << TIER_BIT.get(t, OTHER_BIT)
+    return mask
+
+
+def _iter_bits(x: int) -> Iterator[int]:
+    """켜진 비트 위치를 오름차순으로"""
+    s = bin(x)[:1:-1]
+    i = s.find("1")
+    while i >= 0:
+        yield i
+        i = s.find("1", i + 1)
+
+
+class MatchIndex:
+    def __init__(self, matches_path: Path = MATCHES_JSONL, index_dir: Path = INDEX_DIR) -> None:
+        self.matches_path = matches_path
+        self.index_dir = index_dir
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.offsets = array("Q")
+        self.lengths = array("I")
+        self.created = array("q")
+        self.masks = array("H")
+        self._bitmaps: Dict[int, bytearray] = {}
+        self._players = array("I")  # 매치당 _PLAYERS_PER_MATCH 칸
+        self._puuids: List[str] = []
+        self._puuid_ids: Dict[str, int] = {}
+        self._postings: Optional[Dict[int, array]] = None  # 첫 플레이어 조회 시 구성
+        self.generation: Optional[str] = None
+        self._scanned = 0       # matches.jsonl에서 처리한 바이트 위치
+        self._puuids_pos = 0    # puuids.txt에서 읽은 바이트 위치
+
+    # --- 파일 ---
+    @property
+    def _records_path(self) -> Path:
+        return self.index_dir / "matches.idx"
+
+    @property
+    def _players_path(self) -> Path:
+        return self.index_dir / "players.idx"
+
+    @property
+    def _puuids_path(self) -> Path:
+        return self.index_dir / "puuids.txt"
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.index_dir / "meta.json"
+
+    def _wipe_files(self) -> None:
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        for p in (self._records_path, self._players_path, self._puuids_path):
+            p.write_bytes(b"")
+        # generation: 색인을 처음부터 다시 만들 때마다 바뀜 → 파생 저장소가 재구성 여부 판단
+        self.generation = uuid.uuid4().hex
+        self._meta_path.write_text(json.dumps({"version": INDEX_VERSION, "generation": self.generation}),
+                                   encoding="utf-8")
+
+    def _read_generation(self) -> Optional[str]:
+        try:
+            meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+        except Exception:
+            return None
+        if meta.get("version") != INDEX_VERSION:
+            return None
+        return meta.get("generation")
+
+    def _load_from_files(self) -> None:
+        """다른 프로세스(또는 이전 실행)가 기록한 내용 중 메모리에 없는 것만 읽는다."""
+        # puuid 표는 레코드보다 먼저 기록되므로 항상 끝까지 따라잡아 id를 파일과 맞춘다
+        if self._puuids_path.exists():
+            with self._puuids_path.open("rb") as f:
+                f.seek(self._puuids_pos)
+                tail = f.read()
+            cut = tail.rfind(b"\n") + 1
+            for line in tail[:cut].decode("utf-8").splitlines():
+                self._add_puuid(line)
+            self._puuids_pos += cut
+
+        n = len(self.offsets)
+        rec_bytes = self._records_path.stat().st_size if self._records_path.exists() else 0
+        total = rec_bytes // _REC_SIZE
+        if total <= n:
+            return
+        with self._records_path.open("rb") as f:
+            f.seek(n * _REC_SIZE)
+            raw = f.read((total - n) * _REC_SIZE)
+        players = array("I")
+        with self._players_path.open("rb") as f:
+            f.seek(n * _PLAYERS_PER_MATCH * players.itemsize)
+            players.frombytes(f.read((total - n) * _PLAYERS_PER_MATCH * players.itemsize))
+        for r, (offset, length, created, mask) in enumerate(_REC.iter_unpack(raw)):
+            self._append(offset, length, created, mask,
+                         players[r * _PLAYERS_PER_MATCH:(r + 1) * _PLAYERS_PER_MATCH])
+        self._scanned = max(self._scanned, self.offsets[-1] + self.lengths[-1])
+
+    def _trim_files(self) -> None:
+        """기록 도중 중단되어 레코드보다 앞서 나간 꼬리를 잘라 파일 간 정렬을 맞춘다."""
+        expect = {
+            self._records_path: len(self.offsets) * _REC_SIZE,
+            self._players_path: len(self._players) * self._players.itemsize,
+        }
+        for path, nbytes in expect.items():
+            if path.exists() and path.stat().st_size > nbytes:
+                os.truncate(path, nbytes)
+
+    # --- 메모리 구조 ---
+    def _add_puuid(self, puuid: str) -> int:
+        pid = self._puuid_ids.get(puuid)
+        if pid is None:
+            pid = len(self._puuids)
+            self._puuids.append(puuid)
+            self._puuid_ids[puuid] = pid
+        return pid
+
+    def _append(self, offset: int, length: int, created: int, mask: int, player_ids: Iterable[int]) -> int:
+        i = len(self.offsets)
+        self.offsets.append(offset)
+        self.lengths.append(length)
+        self.created.append(created)
+        self.masks.append(mask)
+        nbytes = (i >> 3) + 1
+        for bit in _iter_bits(mask):
+            bm = self._bitmaps.setdefault(bit, bytearray())
+            if len(bm) < nbytes:
+                bm.extend(bytes(nbytes - len(bm)))
+            bm[i >> 3] |= 1 << (i & 7)
+        self._players.extend(player_ids)
+        if self._postings is not None:
+            for pid in player_ids:
+                if pid != _NO_PLAYER:
+                    self._postings.setdefault(pid, array("I")).append(i)
+        return i
+
+    def _build_postings(self) -> Dict[int, array]:
+        postings: Dict[int, array] = {}
+        players = self._players
+        for k, pid in enumerate(players):
+            if pid != _NO_PLAYER:
+                plist = postings.get(pid)
+                if plist is None:
+                    plist = postings[pid] = array("I")
+                plist.append(k // _PLAYERS_PER_MATCH)
+        return postings
+
+    # --- 갱신 ---
+    def refresh(self) -> int:
+        """matches.jsonl에 새로 붙은 줄을 색인한다. 새로 색인한 매치 수를 반환."""
+        with self._lock:
+            try:
+                size = self.matches_path.stat().st_size
+            except FileNotFoundError:
+                if self.offsets:
+                    self._reset()
+                return 0
+            if size == self._scanned and self._records_path.exists() \
+                    and self._records_path.stat().st_size == len(self.offsets) * _REC_SIZE:
+                return 0
+
+            with file_lock(self.index_dir / ".lock"):
+                gen = self._read_generation()
+                if gen is None:
+                    self._reset()
+                    self._wipe_files()
+                elif gen != self.generation:
+                    # 다른 프로세스가 다시 만들었음 → 파일에서 새로 읽는다
+                    self._reset()
+                    self.generation = gen
+                self._load_from_files()
+                self._trim_files()
+                if size < self._scanned:
+                    # 원본이 잘렸거나 교체됨 → 처음부터 다시
+                    self._reset()
+                    self._wipe_files()
+                return self._scan_tail(size)
+
+    def _scan_tail(self, size: int) -> int:
+        added = 0
+        with self.matches_path.open("rb") as f:
+            while self._scanned < size:
+                f.seek(self._scanned)
+                data = f.read(min(_SCAN_CHUNK, size - self._scanned))
+                cut = data.rfind(b"\n")
+                if cut < 0:
+                    if len(data) < size - self._scanned:
+                        # 청크보다 긴 줄 → 끝까지 읽어 본다
+                        data += f.read(size - self._scanned - len(data))
+                        cut = data.rfind(b"\n")
+                    if cut < 0:
+                        break  # 아직 완성되지 않은 줄
+                added += self._index_lines(data[:cut + 1])
+        return added
+
+    def _index_lines(self, data: bytes) -> int:
+        """완성된 줄들만 담긴 data(파일 위치 self._scanned부터)를 색인하고 파일에 기록"""
+        pos = self._scanned
+        start_n = len(self.offsets)
+        start_puuids = len(self._puuids)
+        line_start = 0
+        while line_start < len(data):
+            line_end = data.index(b"\n", line_start)
+            line = data[line_start:line_end]
+            if line.strip():
+                # 필요한 필드(gameCreation, 참가자 puuid/tier)만 디코드
+                head = serializer.match_head(line)
+                if head is not None:
+                    _, created, parts = head
+                    ids = [self._add_puuid(puuid) for puuid, _ in parts if puuid][:_PLAYERS_PER_MATCH]
+                    ids += [_NO_PLAYER] * (_PLAYERS_PER_MATCH - len(ids))
+                    self._append(pos + line_start, line_end - line_start,
+                                 created if isinstance(created, int) else 0, tier_mask(t for _, t in parts), ids)
+            line_start = line_end + 1
+        self._scanned = pos + len(data)
+
+        added = len(self.offsets) - start_n
+        if added:
+            new_puuids = "".join(p + "\n" for p in self._puuids[start_puuids:]).encode("utf-8")
+            with self._puuids_path.open("ab") as f:
+                f.write(new_puuids)
+            self._puuids_pos += len(new_puuids)
+            with self._players_path.open("ab") as f:
+                f.write(self._players[start_n * _PLAYERS_PER_MATCH:].tobytes())
+            # 레코드 파일을 마지막에 써야 중단돼도 "레코드가 있으면 나머지도 있다"가 유지된다
+            recs = b"".join(_REC.pack(self.offsets[i], self.lengths[i], self.created[i], self.masks[i])
+                            for i in range(start_n, len(self.offsets)))
+            with self._records_path.open("ab") as f:
+                f.write(recs)
+        return added
+
+    # --- 조회 ---
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def ensure_postings(self) -> None:
+        """puuid posting list를 미리 구성 (이후 refresh마다 증분 유지)"""
+        with self._lock:
+            if self._postings is None:
+                self._postings = self._build_postings()
+
+    def _tier_bitset(self, tier: str) -> int:
+        bit = TIER_BIT.get(tier.upper(), OTHER_BIT)
+        bm = self._bitmaps.get(bit)
+        return int.from_bytes(bm, "little") if bm else 0
+
+    def select(self, tier: Optional[str] = None, puuid: Optional[str] = None) -> List[int]:
+        """조건에 맞는 매치 번호 (파일 순서)"""
+        with profiling.phase("filter"), self._lock:
+            if puuid is not None:
+                pid = self._puuid_ids.get(puuid)
+                if pid is None:
+                    return []
+                self.ensure_postings()
+                ords = list(self._postings.get(pid, ()))
+                if tier:
+                    bit = 1 << TIER_BIT.get(tier.upper(), OTHER_BIT)
+                    ords = [i for i in ords if self.masks[i] & bit]
+            elif tier:
+                ords = list(_iter_bits(self._tier_bitset(tier)))
+            else:
+                return list(range(len(self.offsets)))
+            if tier and tier.upper() not in TIER_BIT:
+                # 목록 밖 티어는 OTHER 비트를 공유하므로 본문으로 확인
+                want = tier.upper()
+                ords = [i for i, m in zip(ords, self.read_many(ords))
+                        if any((p.get("tier") or "").upper() == want
+                               for p in (m.get("info", {}) or {}).get("participants", []) or [])]
+            return ords
+
+    def newest(self, ords: Iterable[int], limit: int) -> List[int]:
+        """gameCreation 내림차순 상위 limit개 (동률은 파일 순서)"""
+        with profiling.phase("sort"):
+            return heapq.nlargest(limit, ords, key=self.created.__getitem__)
+
+    def read_many(self, ords: List[int]) -> List[Dict[str, Any]]:
+        """선택된 매치만 읽어서 디코드 (파일 오프셋 순으로 읽고 요청 순서로 반환)"""
+        raw: Dict[int, bytes] = {}
+        with profiling.phase("read"), self.matches_path.open("rb") as f:
+            for i in sorted(set(ords)):
+                f.seek(self.offsets[i])
+                raw[i] = f.read(self.lengths[i])
+        with profiling.phase("decode"):
+            out = {i: serializer.loads(b) for i, b in raw.items()}
+        return [out[i] for i in ords]
+
+    def iter_raw(self, ords: Iterable[int]) -> Iterator[bytes]:
+        """선택된 매치의 원본 JSON 바이트 (디코드 없이 그대로 응답에 붙일 때)"""
+        with self.matches_path.open("rb") as f:
+            for i in ords:
+                f.seek(self.offsets[i])
+                yield f.read(self.lengths[i])
+
+
+_global_index: Optional[MatchIndex] = None
+_global_lock = threading.Lock()
+
+
+def get_match_index() -> MatchIndex:
+    global _global_index
+    if _global_index is None:
+        with _global_lock:
+            if _global_index is None:
+                _global_index = MatchIndex()
+    return _global_index
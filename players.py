@@ -0,0 +1,272 @@
+"""
+플레이어별 집계 (/api/players/<puuid>).
+
+puuid마다 판수 / 등수 합 / top4 / 1등 / 특성·유닛 사용 횟수 / 마지막 티어를 들고,
+collector가 요약을 만든 직후 sync()로 새 매치만 반영한다.
+  - 추적 중인 플레이어(summoners.json)는 ingest 때 항상 갱신하고
+    DATA_DIR/index/players_agg.json에 저장 (재시작 후 이어서)
+  - 그 밖의 puuid는 처음 조회할 때 posting list로 그 플레이어 매치만 읽어 만들고
+    작은 LRU에 보관
+어느 쪽이든 조회 비용은 전체 매치 수가 아니라 그 플레이어의 판수에만 비례한다.
+"""
+import bisect
+import os
+import threading
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import serializer
+from match_index import INDEX_DIR, MatchIndex
+import storage
+from storage import file_lock, load_summoners, write_atomic
+from summaries import SummaryStore
+
+PLAYER_LRU_SIZE = int(os.getenv("PLAYER_LRU_SIZE", "512"))
+_BATCH = 1000
+
+
+class PlayerAgg:
+    __slots__ = ("games", "placement_sum", "placed", "top4", "firsts", "tier", "last_created",
+                 "traits", "units", "upto")
+
+    def __init__(self) -> None:
+        self.games = 0
+        self.placement_sum = 0
+        self.placed = 0
+        self.top4 = 0
+        self.firsts = 0
+        self.tier: Optional[str] = None
+        self.last_created = 0
+        self.traits: Counter = Counter()
+        self.units: Counter = Counter()
+        self.upto = 0  # 이 번호 미만의 매치까지 반영됨
+
+    def add(self, created: int, player: list) -> None:
+        """compact 요약의 참가자 한 명(summaries 레이아웃)을 더한다"""
+        _, tier, placement, _, _, traits, units, _, _ = player
+        self.games += 1
+        if isinstance(placement, int):
+            self.placement_sum += placement
+            self.placed += 1
+            self.top4 += placement <= 4
+            self.firsts += placement == 1
+        if created >= self.last_created:
+            self.last_created = created
+            self.tier = tier
+        self.traits.update(t[0] for t in traits if t[0] and (t[1] or 0) > 0)
+        self.units.update(u[0] for u in units if u[0])
+
+    def to_list(self) -> list:
+        return [self.games, self.placement_sum, self.placed, self.top4, self.firsts, self.tier,
+                self.last_created, dict(self.traits), dict(self.units), self.upto]
+
+    @classmethod
+    def from_list(cls, data: list) -> "PlayerAgg":
+        agg = cls()
+        (agg.games, agg.placement_sum, agg.placed, agg.top4, agg.firsts, agg.tier,
+         agg.last_created, traits, units, agg.upto) = data
+        agg.traits, agg.units = Counter(traits), Counter(units)
+        return agg
+
+    def summary(self, top: int = 5) -> Dict[str, Any]:
+        return {
+            "games": self.games,
+            "avg_placement": round(self.placement_sum / self.placed, 2) if self.placed else None,
+            "top4_rate": round(self.top4 / self.placed, 3) if self.placed else None,
+            "win_rate": round(self.firsts / self.placed, 3) if self.placed else None,
+            "last_tier": self.tier,
+            "last_played": self.last_created or None,
+            "favorite_traits": [{"name": n, "games": c} for n, c in self.traits.most_common(top)],
+            "favorite_units": [{"name": n, "games": c} for n, c in self.units.most_common(top)],
+        }
+
+
+def _created(compact: list) -> int:
+    return compact[1] if isinstance(compact[1], int) else 0
+
+
+class PlayerStats:
+    def __init__(self, index_dir: Path = INDEX_DIR, summoners_path: Optional[Path] = None,
+                 lru_size: int = PLAYER_LRU_SIZE) -> None:
+        self.index_dir = index_dir
+        self._summoners_path = summoners_path
+        self.lru_size = max(1, lru_size)
+        self._lock = threading.RLock()
+        self._reset(None)
+        self._loaded = False
+        self._summoners_key = None
+        self._summoners: Dict[str, Dict[str, Any]] = {}
+        self._by_name: Dict[str, List[str]] = {}
+        self._names: List[str] = []  # 접두어 검색용 정렬 목록
+
+    def _reset(self, generation: Optional[str]) -> None:
+        self.generation = generation
+        self.upto = 0
+        self.tracked: Dict[str, PlayerAgg] = {}
+        self._lru: "OrderedDict[str, PlayerAgg]" = OrderedDict()
+
+    @property
+    def _path(self) -> Path:
+        return self.index_dir / "players_agg.json"
+
+    @property
+    def summoners_path(self) -> Path:
+        # 지정하지 않았으면 호출 시점의 storage.SUMMONERS_JSON (save_summoners와 같은 파일)
+        return self._summoners_path or storage.SUMMONERS_JSON
+
+    # --- 소환사 캐시 (추적 대상 / 이름 검색) ---
+    def _refresh_summoners(self) -> None:
+        try:
+            st = self.summoners_path.stat()
+            key = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            key = None
+        if key is not None and key == self._summoners_key:
+            return
+        by_puuid: Dict[str, Dict[str, Any]] = {}
+        by_name: Dict[str, List[str]] = {}
+        for s in load_summoners(self.summoners_path):
+            if not isinstance(s, dict) or not s.get("puuid"):
+                continue
+            p = s["puuid"]
+            by_puuid[p] = s
+            names = {s.get("name")}
+            if s.get("gameName"):
+                names.add(s["gameName"])
+                if s.get("tagLine"):
+                    names.add(f"{s['gameName']}#{s['tagLine']}")
+            for nm in names:
+                if nm:
+                    by_name.setdefault(str(nm).lower(), []).append(p)
+        self._summoners_key, self._summoners, self._by_name = key, by_puuid, by_name
+        self._names = sorted(by_name)
+
+    def summoner(self, puuid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._refresh_summoners()
+            return self._summoners.get(puuid)
+
+    def find(self, query: str, limit: int = 20) -> List[str]:
+        """이름(name / gameName / gameName#tagLine, 대소문자 무시) → puuid. 정확히 일치 우선, 다음 접두어"""
+        q = query.strip().lower()
+        if not q:
+            return []
+        with self._lock:
+            self._refresh_summoners()
+            out = list(self._by_name.get(q, []))
+            k = bisect.bisect_left(self._names, q)
+            while len(out) < limit and k < len(self._names) and self._names[k].startswith(q):
+                out.extend(p for p in self._by_name[self._names[k]] if p not in out)
+                k += 1
+            return out[:limit]
+
+    # --- 저장 ---
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            data = serializer.loads(self._path.read_bytes())
+            self.generation, self.upto = data["generation"], data["upto"]
+            self.tracked = {p: PlayerAgg.from_list(v) for p, v in data["players"].items()}
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[players] aggregate file ignored: {e}")
+            self._reset(None)
+
+    def _save(self) -> None:
+        data = serializer.dumps({
+            "generation": self.generation,
+            "upto": self.upto,
+            "players": {p: a.to_list() for p, a in self.tracked.items()},
+        })
+        # 색인과 같은 잠금: 여러 프로세스가 동시에 저장해도 파일이 섞이지 않게
+        with file_lock(self.index_dir / ".lock"):
+            write_atomic(self._path, data)
+
+    # --- 갱신 ---
+    def _backfill(self, puuid: str, index: MatchIndex, store: SummaryStore, upto: int) -> PlayerAgg:
+        """posting list로 이 플레이어 매치만 읽어 새 집계를 만든다 (upto 미만까지)"""
+        agg = PlayerAgg()
+        agg.upto = upto
+        if not upto:
+            return agg
+        ords = [i for i in index.select(puuid=puuid) if i < upto]
+        for start in range(0, len(ords), _BATCH):
+            chunk = ords[start:start + _BATCH]
+            for compact in store.read_many(chunk):
+                for p in compact[7]:
+                    if p[0] == puuid:
+                        agg.add(_created(compact), p)
+        return agg
+
+    def sync(self, index: MatchIndex, store: SummaryStore) -> int:
+        """store에 새로 생긴 요약을 추적 대상/LRU 집계에 반영. 반영한 매치 수를 반환"""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            changed = self.generation != store.generation
+            if changed:
+                self._reset(store.generation)
+            self._refresh_summoners()
+            end = len(store)
+            # 새로 추적하게 된 플레이어는 지금까지의 매치로 채움
+            new_tracked = [p for p in self._summoners if p not in self.tracked]
+            for p in new_tracked:
+                agg = self._lru.pop(p, None)
+                if agg is None or agg.upto != self.upto:
+                    agg = self._backfill(p, index, store, self.upto)
+                self.tracked[p] = agg
+                changed = True
+            if end <= self.upto:
+                if changed:
+                    self._save()
+                return 0
+            for start in range(self.upto, end, _BATCH):
+                ords = list(range(start, min(end, start + _BATCH)))
+                for i, compact in zip(ords, store.read_many(ords)):
+                    created = _created(compact)
+                    for p in compact[7]:
+                        agg = self.tracked.get(p[0]) or self._lru.get(p[0])
+                        if agg is not None and agg.upto <= i:
+                            agg.add(created, p)
+                            agg.upto = i + 1
+                            changed = changed or p[0] in self.tracked
+            for agg in self.tracked.values():
+                agg.upto = end
+            for agg in self._lru.values():
+                agg.upto = end
+            made = end - self.upto
+            self.upto = end
+            # 추적 대상 집계가 그대로면 다시 쓰지 않음 (재시작 때 그 구간을 다시 읽어도 결과는 같음)
+            if changed:
+                self._save()
+            return made
+
+    def get(self, puuid: str, index: MatchIndex, store: SummaryStore) -> PlayerAgg:
+        """(sync 이후) 이 puuid의 집계. 추적 대상이 아니면 LRU에서, 없으면 posting list로 생성"""
+        with self._lock:
+            agg = self.tracked.get(puuid)
+            if agg is not None:
+                return agg
+            agg = self._lru.get(puuid)
+            if agg is None or agg.upto != self.upto:
+                agg = self._backfill(puuid, index, store, self.upto)
+            self._lru[puuid] = agg
+            self._lru.move_to_end(puuid)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+            return agg
+
+
+_global_stats: Optional[PlayerStats] = None
+_global_lock = threading.Lock()
+
+
+def get_player_stats() -> PlayerStats:
+    global _global_stats
+    if _global_stats is None:
+        with _global_lock:
+            if _global_stats is None:
+                _global_stats = PlayerStats()
+    return _global_stats
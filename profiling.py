@@ -0,0 +1,266 @@
+"""
+요청 / 수집 프로파일링 (opt-in).
+
+PROFILE_SAMPLE_RATE(0~1, 기본 0=끔) 비율로 Flask 요청과 collector 실행을 골라
+  - 구간별 시간: with phase("read"): ... (read / decode / filter / sort / summarize / serialize ...)
+  - 가장 느린 PROFILE_SLOWEST(기본 20)개 trace를 보관
+  - PROFILE_CPROFILE=1 이면 표본마다 cProfile (느린 trace만 pstats 텍스트로 남김)
+  - PROFILE_STACKS=1 이면 표본 스레드의 스택을 PROFILE_STACK_INTERVAL_MS마다 찍어
+    collapsed-stack(flamegraph.pl 입력 형식)으로 누적
+/api/admin/profile* (X-Admin-Token 헤더 = ADMIN_TOKEN)으로 조회하고 실행 중에 켜고 끌 수 있다.
+꺼져 있을 때 phase()는 스레드 로컬 하나만 보고 공용 nullcontext를 돌려준다.
+"""
+import contextlib
+import cProfile
+import heapq
+import io
+import itertools
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+sample_rate = float(os.getenv("PROFILE_SAMPLE_RATE", "0") or 0)
+use_cprofile = _env_flag("PROFILE_CPROFILE")
+use_stacks = _env_flag("PROFILE_STACKS")
+SLOWEST = int(os.getenv("PROFILE_SLOWEST", "20"))
+STACK_INTERVAL = float(os.getenv("PROFILE_STACK_INTERVAL_MS", "5")) / 1000.0
+MAX_STACKS = 5000  # 서로 다른 collapsed stack 수 상한
+
+_NULL = contextlib.nullcontext()
+_local = threading.local()
+_lock = threading.Lock()
+_ids = itertools.count(1)
+
+_slowest: List[tuple] = []          # (total, id, Trace) 최소 힙
+_phase_totals: Dict[str, List[float]] = {}  # phase → [횟수, 합계(초)]
+_collapsed: Counter = Counter()
+_sampled = 0
+_active: Dict[int, "Trace"] = {}    # thread id → 진행 중 trace (스택 샘플러용)
+_sampler: Optional[threading.Thread] = None
+
+
+class Trace:
+    __slots__ = ("id", "kind", "name", "started", "total", "phases", "meta", "profile", "pstats")
+
+    def __init__(self, kind: str, name: str) -> None:
+        self.id = next(_ids)
+        self.kind = kind
+        self.name = name
+        self.started = time.time()
+        self.total = 0.0
+        self.phases: Dict[str, float] = {}
+        self.meta: Dict[str, Any] = {}
+        self.profile: Optional[cProfile.Profile] = None
+        self.pstats: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "name": self.name,
+            "started": round(self.started * 1000),
+            "total_ms": round(self.total * 1000, 3),
+            "phases_ms": {k: round(v * 1000, 3) for k, v in self.phases.items()},
+            "meta": self.meta,
+            "has_cprofile": self.pstats is not None,
+        }
+
+
+def enabled() -> bool:
+    return sample_rate > 0
+
+
+def configure(rate: Optional[float] = None, cprofile: Optional[bool] = None,
+              stacks: Optional[bool] = None) -> Dict[str, Any]:
+    """실행 중 설정 변경 (admin 엔드포인트용)"""
+    global sample_rate, use_cprofile, use_stacks
+    if rate is not None:
+        sample_rate = max(0.0, min(1.0, float(rate)))
+    if cprofile is not None:
+        use_cprofile = bool(cprofile)
+    if stacks is not None:
+        use_stacks = bool(stacks)
+    return settings()
+
+
+def settings() -> Dict[str, Any]:
+    return {
+        "sample_rate": sample_rate,
+        "cprofile": use_cprofile,
+        "stacks": use_stacks,
+        "slowest": SLOWEST,
+        "stack_interval_ms": STACK_INTERVAL * 1000,
+    }
+
+
+# --- trace 시작/종료 ---
+def start(kind: str, name: str) -> Optional[Trace]:
+    """표본으로 뽑히면 이 스레드의 trace를 시작해 반환, 아니면 None"""
+    global _sampled
+    if sample_rate <= 0 or random.random() >= sample_rate or getattr(_local, "trace", None) is not None:
+        return None
+    tr = Trace(kind, name)
+    _local.trace = tr
+    with _lock:
+        _sampled += 1
+        if use_stacks:
+            _active[threading.get_ident()] = tr
+            _ensure_sampler()
+    if use_cprofile:
+        tr.profile = cProfile.Profile()
+        try:
+            tr.profile.enable()
+        except ValueError:  # 다른 프로파일러가 이미 켜져 있음
+            tr.profile = None
+    tr.total = time.perf_counter()
+    return tr
+
+
+def finish(tr: Optional[Trace], **meta: Any) -> None:
+    if tr is None:
+        return
+    tr.total = time.perf_counter() - tr.total
+    if tr.profile is not None:
+        tr.profile.disable()
+    _local.trace = None
+    tr.meta.update(meta)
+    with _lock:
+        _active.pop(threading.get_ident(), None)
+        for name, secs in tr.phases.items():
+            agg = _phase_totals.setdefault(name, [0, 0.0])
+            agg[0] += 1
+            agg[1] += secs
+        keep = len(_slowest) < SLOWEST or tr.total > _slowest[0][0]
+    if not keep:
+        return
+    if tr.profile is not None:
+        buf = io.StringIO()
+        pstats.Stats(tr.profile, stream=buf).sort_stats("cumulative").print_stats(40)
+        tr.pstats = buf.getvalue()
+    tr.profile = None
+    with _lock:
+        item = (tr.total, tr.id, tr)
+        if len(_slowest) < SLOWEST:
+            heapq.heappush(_slowest, item)
+        elif tr.total > _slowest[0][0]:
+            heapq.heapreplace(_slowest, item)
+
+
+@contextlib.contextmanager
+def _trace_cm(kind: str, name: str) -> Iterator[Optional[Trace]]:
+    tr = start(kind, name)
+    try:
+        yield tr
+    finally:
+        finish(tr)
+
+
+def trace(kind: str, name: str):
+    """with trace("collector", "collect_top_matches"): ... (꺼져 있으면 공용 nullcontext)"""
+    if sample_rate <= 0:
+        return _NULL
+    return _trace_cm(kind, name)
+
+
+@contextlib.contextmanager
+def _phase_cm(tr: Trace, name: str) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        tr.phases[name] = tr.phases.get(name, 0.0) + (time.perf_counter() - t0)
+
+
+def phase(name: str):
+    """진행 중 trace가 있으면 구간 시간을 더하고, 없으면 아무것도 안 함"""
+    tr = getattr(_local, "trace", None)
+    if tr is None:
+        return _NULL
+    return _phase_cm(tr, name)
+
+
+# --- 스택 샘플러 ---
+def _ensure_sampler() -> None:
+    global _sampler
+    if _sampler is None or not _sampler.is_alive():
+        _sampler = threading.Thread(target=_sample_loop, name="profile-sampler", daemon=True)
+        _sampler.start()
+
+
+def _collapse(frame) -> str:
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+def _sample_loop() -> None:
+    while True:
+        time.sleep(STACK_INTERVAL)
+        with _lock:
+            if not _active:
+                if not use_stacks:
+                    return
+                continue
+            targets = dict(_active)
+        frames = sys._current_frames()
+        stacks = []
+        for tid, tr in targets.items():
+            frame = frames.get(tid)
+            if frame is not None:
+                stacks.append(f"{tr.kind}:{tr.name};{_collapse(frame)}")
+        del frames
+        with _lock:
+            for s in stacks:
+                if s in _collapsed or len(_collapsed) < MAX_STACKS:
+                    _collapsed[s] += 1
+
+
+# --- 조회 ---
+def report() -> Dict[str, Any]:
+    with _lock:
+        slowest = sorted(_slowest, reverse=True)
+        phases = {k: {"count": c, "total_ms": round(t * 1000, 3), "avg_ms": round(t * 1000 / c, 3)}
+                  for k, (c, t) in _phase_totals.items()}
+        return {
+            **settings(),
+            "sampled": _sampled,
+            "phases": phases,
+            "traces": [tr.to_dict() for _, _, tr in slowest],
+        }
+
+
+def cprofile_text(trace_id: Optional[int] = None) -> Optional[str]:
+    """trace 하나(없으면 가장 느린 것)의 pstats 텍스트"""
+    with _lock:
+        cands = [tr for _, _, tr in sorted(_slowest, reverse=True) if tr.pstats is not None]
+    for tr in cands:
+        if trace_id is None or tr.id == trace_id:
+            return f"# trace {tr.id} {tr.kind} {tr.name} {tr.total * 1000:.1f}ms\n{tr.pstats}"
+    return None
+
+
+def collapsed_text() -> str:
+    with _lock:
+        return "".join(f"{s} {n}\n" for s, n in _collapsed.most_common())
+
+
+def reset() -> None:
+    global _sampled
+    with _lock:
+        _slowest.clear()
+        _phase_totals.clear()
+        _collapsed.clear()
+        _sampled = 0
@@ -1,64 +1,475 @@
 import os
+import struct
 import time
 import threading
+import zlib
 from collections import deque
-from typing import Deque, Optional
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Optional, Sequence, Tuple
 
+try:
+    import fcntl
+    import mmap
+except ImportError:  # Windows 등: 프로세스 공유 백엔드 사용 불가
+    fcntl = None
+
+
+class _BucketWindow:
+    """
+    고정 크기 버킷 카운터로 근사한 슬라이딩 윈도우.
+
+    span초 윈도우를 n_buckets개로 나누고, 슬롯은 n_buckets + 1개를 링으로 돌린다.
+    요청은 자기 버킷이 링에서 밀려날 때(요청 시각 + span ~ span + 버킷폭) 만료되므로
+    실제 슬라이딩 윈도우보다 항상 보수적이다. 요청 수와 무관하게 메모리/연산이 O(1).
+    """
+
+    __slots__ = ("limit", "span", "width", "slots", "counts", "total", "head")
+
+    def __init__(self, limit: int, span: float, n_buckets: int) -> None:
+        self.limit = limit
+        self.span = span
+        self.width = span / n_buckets
+        self.slots = n_buckets + 1
+        self.counts: List[int] = [0] * self.slots
+        self.total = 0
+        self.head = 0  # 가장 최근 버킷의 절대 번호
+
+    def advance(self, now: float) -> None:
+        b = int(now / self.width)
+        if b < self.head - self.slots:
+            # 시계가 뒤로 감 (재부팅 후 남아있던 공유 파일 등) → 초기화
+            self.counts = [0] * self.slots
+            self.total = 0
+            self.head = b
+            return
+        if b <= self.head:
+            return
+        steps = min(b - self.head, self.slots)
+        for k in range(1, steps + 1):
+            i = (self.head + k) % self.slots
+            self.total -= self.counts[i]
+            self.counts[i] = 0
+        self.head = b
+
+    def add(self, n: int) -> None:
+        self.counts[self.head % self.slots] += n
+        self.total += n
+
+    def wait_for(self, n: int) -> float:
+        """n개를 더 넣을 수 있을 때까지 남은 시간 (advance 이후 호출)"""
+        need = self.total + n - self.limit
+        if need <= 0:
+            return 0.0
+        freed = 0
+        oldest = self.head - self.slots + 1
+        for b in range(oldest, self.head + 1):
+            freed += self.counts[b % self.slots]
+            if freed >= need:
+                # 버킷 b는 head가 b + slots에 도달할 때 비워진다 (부동소수 경계 여유)
+                return (b + self.slots) * self.width + 1e-6
+        return float("inf")
+
+
+class _LimiterState:
+    __slots__ = ("windows", "blocked_until")
+
+    def __init__(self, windows: List[_BucketWindow], blocked_until: float) -> None:
+        self.windows = windows
+        self.blocked_until = blocked_until
+
+
+def _parse_rate_header(value: Optional[str]) -> List[Tuple[int, float]]:
+    """'20:1,100:120' → [(20, 1.0), (100, 120.0)]. 형식이 이상하면 빈 리스트."""
+    out: List[Tuple[int, float]] = []
+    if not value:
+        return out
+    try:
+        for part in value.split(","):
+            n, secs = part.strip().split(":", 1)
+            out.append((int(n), float(secs)))
+    except ValueError:
+        return []
+    return out
+
+
+class BucketedRateLimiter:
+    """
+    여러 윈도우(예: 19/1s, 99/120s)를 동시에 지키는 rate limiter.
+
+    - 윈도우마다 고정 크기 버킷 카운터 → 요청당 O(1) 계정
+    - 대기자는 FIFO 큐로 줄 세우고, 큐의 맨 앞 대기자만 타이머로 깬다.
+      나머지는 앞사람이 슬롯을 받고 넘겨줄 때(handoff)만 깨어나므로
+      스레드가 많아도 thundering herd가 없다.
+    - try_acquire(n): 비차단, acquire(n): 묶음 예약 (n개 슬롯을 한 번에)
+    """
+
+    backend = "local"
+    max_windows: Optional[int] = None  # 학습한 윈도우 수 상한 (공유 파일 크기 등)
+
+    def __init__(self, windows: Sequence[Tuple[int, float]], buckets_per_window: int = 0) -> None:
+        self._lock = threading.Lock()
+        self._windows: List[_BucketWindow] = []
+        self._waiters: Deque[threading.Condition] = deque()
+        self.granted = 0
+        self.wakeups = 0
+        self._buckets_per_window = buckets_per_window
+        self._blocked_until = 0.0
+        self._windows = self._build_windows(windows)
+        self._configured = self.windows  # env 등으로 정한 한도 (학습값은 이보다 올라가지 않음)
+
+    def _build_windows(self, windows: Sequence[Tuple[int, float]]) -> List[_BucketWindow]:
+        built = []
+        for limit, span in windows:
+            if limit < 1 or span <= 0:
+                raise ValueError(f"invalid rate window: {limit}/{span}s")
+            # 기본 버킷 폭: 1초 윈도우는 0.1초, 그 이상은 1초 (최대 120개)
+            n = self._buckets_per_window or max(10, min(120, int(span)))
+            built.append(_BucketWindow(int(limit), float(span), n))
+        return built
+
+    @property
+    def windows(self) -> List[Tuple[int, float]]:
+        return [(w.limit, w.span) for w in self._windows]
+
+    # --- 상태 접근 (SharedRateLimiter가 파일 기반으로 재정의) ---
+    @contextmanager
+    def _state(self) -> Iterator[_LimiterState]:
+        """락 보유 상태에서 호출. 윈도우/차단시각을 읽고, 블록이 끝나면 반영한다."""
+        st = _LimiterState(self._windows, self._blocked_until)
+        yield st
+        self._windows = st.windows
+        self._blocked_until = st.blocked_until
+
+    # --- 내부 (락 보유 상태에서 호출) ---
+    def _try_grant(self, n: int) -> float:
+        """n개를 지금 줄 수 있으면 예약하고 0.0, 아니면 가장 빠른 허용 가능 시각"""
+        with self._state() as st:
+            now = time.monotonic()
+            ready = st.blocked_until if st.blocked_until > now else 0.0
+            for w in st.windows:
+                w.advance(now)
+                ready = max(ready, w.wait_for(n))
+            if ready == 0.0:
+                for w in st.windows:
+                    w.add(n)
+                self.granted += n
+            return ready
+
+    def _validate(self, n: int) -> None:
+        if n < 1:
+            raise ValueError("n must be >= 1")
+        for w in self._windows:
+            if n > w.limit:
+                raise ValueError(f"cannot reserve {n} slots: window limit is {w.limit}/{w.span}s")
+
+    def _notify_head(self) -> None:
+        if self._waiters:
+            self._waiters[0].notify()
+
+    # --- 공개 API ---
+    def try_acquire(self, n: int = 1) -> bool:
+        """대기 없이 n개 슬롯을 얻으면 True. 대기자가 있으면 새치기하지 않는다."""
+        self._validate(n)
+        with self._lock:
+            if self._waiters:
+                return False
+            return self._try_grant(n) == 0.0
+
+    def acquire(self, n: int = 1, max_wait_seconds: Optional[float] = None) -> bool:
+        """
+        n개 슬롯을 한 번에 예약한다 (FIFO 순서).
+        max_wait_seconds 안에 못 얻으면 False, 얻으면 True.
+        """
+        self._validate(n)
+        deadline = None if max_wait_seconds is None else time.monotonic() + max_wait_seconds
+        with self._lock:
+            if not self._waiters and self._try_grant(n) == 0.0:
+                return True
+
+            me = threading.Condition(self._lock)
+            self._waiters.append(me)
+            try:
+                while True:
+                    if self._waiters[0] is me:
+                        ready_at = self._try_grant(n)
+                        if ready_at == 0.0:
+                            return True
+                        if ready_at == float("inf"):
+                            # 기다리는 사이 학습한 한도가 n보다 작아짐 → 영영 못 얻음
+                            self._validate(n)
+                            return False
+                        now = time.monotonic()
+                        timeout = max(0.001, ready_at - now)
+                    else:
+                        now = time.monotonic()
+                        timeout = None  # handoff 될 때까지 잠듦
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0.0:
+                            return False
+                        timeout = remaining if timeout is None else min(timeout, remaining)
+                    me.wait(timeout)
+                    self.wakeups += 1
+            finally:
+                was_head = self._waiters[0] is me
+                self._waiters.remove(me)
+                if was_head:
+                    self._notify_head()
+
+    def penalize(self, seconds: float) -> None:
+        """429(Retry-After) 수신 시: seconds 동안 모든 예약을 막는다."""
+        with self._lock:
+            with self._state() as st:
+                st.blocked_until = max(st.blocked_until, time.monotonic() + seconds)
+            self._notify_head()
+
+    def update_limits(self, windows: Sequence[Tuple[int, float]]) -> bool:
+        """
+        응답 헤더 등에서 알아낸 한도로 갱신. 같은 span의 윈도우는 사용량을 유지한다.
+        변경이 있었으면 True.
+        """
+        with self._lock:
+            with self._state() as st:
+                changed = self._apply_limits(st, windows)
+            if changed:
+                self._notify_head()
+            return changed
+
+    def observe_counts(self, counts: Sequence[Tuple[int, float]]) -> None:
+        """
+        서버가 알려준 윈도우별 사용량(X-App-Rate-Limit-Count)이 우리 계정보다 크면
+        차이만큼 현재 버킷에 더한다 (다른 호스트가 같은 키를 쓰는 경우 대비).
+        """
+        with self._lock:
+            with self._state() as st:
+                self._apply_counts(st, counts)
+
+    def _within_configured(self, windows: Sequence[Tuple[int, float]]) -> List[Tuple[int, float]]:
+        """
+        학습한 윈도우를 같은 span의 설정값 이하로 자르고, 헤더에 없는 설정 윈도우는 그대로 둔다
+        (운영자가 키를 나눠 쓰려고 일부러 낮춘 한도를 Riot 상한으로 되돌리지 않도록).
+        """
+        configured = {span: limit for limit, span in self._configured}
+        out = [(min(int(n), configured.get(float(sec), int(n))), float(sec)) for n, sec in windows]
+        spans = {sec for _, sec in out}
+        out.extend((limit, span) for limit, span in self._configured if span not in spans)
+        return out
+
+    def update_from_headers(self, headers) -> None:
+        """Riot 응답 헤더(X-App-Rate-Limit / X-App-Rate-Limit-Count)에서 한도/사용량 학습"""
+        limits = _parse_rate_header(headers.get("X-App-Rate-Limit"))
+        counts = _parse_rate_header(headers.get("X-App-Rate-Limit-Count"))
+        if not limits and not counts:
+            return
+        margin = int(os.getenv("RIOT_LIMIT_MARGIN", "1"))
+        with self._lock:
+            with self._state() as st:
+                changed = bool(limits) and self._apply_limits(
+                    st, self._within_configured([(max(1, n - margin), sec) for n, sec in limits]))
+                self._apply_counts(st, counts)
+            if changed:
+                self._notify_head()
+
+    def _apply_limits(self, st: _LimiterState, windows: Sequence[Tuple[int, float]]) -> bool:
+        if self.max_windows is not None and len(windows) > self.max_windows:
+            # 초당 허용량이 가장 작은(가장 엄격한) 윈도우만 남김
+            keep = sorted(windows, key=lambda w: w[0] / w[1])[:self.max_windows]
+            dropped = [w for w in windows if w not in keep]
+            print(f"[rate_limiter] too many rate windows, ignoring {dropped}")
+            windows = [w for w in windows if w in keep]
+        if [(w.limit, w.span) for w in st.windows] == [(int(l), float(sec)) for l, sec in windows]:
+            return False
+        new = self._build_windows(windows)
+        old_by_span = {w.span: w for w in st.windows}
+        for i, w in enumerate(new):
+            old = old_by_span.get(w.span)
+            if old is not None and old.slots == w.slots:
+                old.limit = w.limit
+                new[i] = old
+        st.windows = new
+        return True
+
+    @staticmethod
+    def _apply_counts(st: _LimiterState, counts: Sequence[Tuple[int, float]]) -> None:
+        now = time.monotonic()
+        by_span = {w.span: w for w in st.windows}
+        for count, span in counts:
+            w = by_span.get(float(span))
+            if w is None:
+                continue
+            w.advance(now)
+            if count > w.total:
+                w.add(count - w.total)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            with self._state() as st:
+                now = time.monotonic()
+                for w in st.windows:
+                    w.advance(now)
+                return {
+                    "backend": self.backend,
+                    "granted": self.granted,
+                    "wakeups": self.wakeups,
+                    "waiting": len(self._waiters),
+                    "blocked_for": round(max(0.0, st.blocked_until - now), 3),
+                    "windows": [{"limit": w.limit, "span": w.span, "used": w.total} for w in st.windows],
+                }
+
+
+class SlidingWindowRateLimiter(BucketedRateLimiter):
+    """초당/2분당 한도 (Riot 개발 키 기준) — 기존 생성자 시그니처 유지용"""
 
-class SlidingWindowRateLimiter:
     def __init__(self, per_second: int, per_two_minutes: int) -> None:
         self.per_second = per_second
         self.per_two_minutes = per_two_minutes
-        self._lock = threading.Lock()
-        self._cond = threading.Condition(self._lock)
-        self._win1s: Deque[float] = deque()
-        self._win120s: Deque[float] = deque()
-
-    def _purge(self, now: float) -> None:
-        one_sec_ago = now - 1.0
-        two_min_ago = now - 120.0
-        while self._win1s and self._win1s[0] <= one_sec_ago:
-            self._win1s.popleft()
-        while self._win120s and self._win120s[0] <= two_min_ago:
-            self._win120s.popleft()
-
-    def acquire(self, max_wait_seconds: Optional[float] = None) -> None:
-        start_wait = time.monotonic()
-        with self._cond:
-            while True:
-                now = time.monotonic()
-                self._purge(now)
-                if len(self._win1s) < self.per_second and len(self._win120s) < self.per_two_minutes:
-                    # grant
-                    self._win1s.append(now)
-                    self._win120s.append(now)
-                    return
-                # compute sleep needed until next slot opens
-                wait1 = float("inf")
-                if self._win1s:
-                    wait1 = max(0.0, 1.0 - (now - self._win1s[0]))
-                wait2 = float("inf")
-                if self._win120s:
-                    wait2 = max(0.0, 120.0 - (now - self._win120s[0]))
-                sleep_for = min(wait1, wait2)
-                if max_wait_seconds is not None:
-                    elapsed = now - start_wait
-                    if elapsed + sleep_for > max_wait_seconds:
-                        # final wait capped
-                        sleep_for = max(0.0, max_wait_seconds - elapsed)
-                if sleep_for <= 0.0:
-                    # tiny yield
-                    sleep_for = 0.001
-                self._cond.wait(timeout=sleep_for)
-
-
-_global_limiter: Optional[SlidingWindowRateLimiter] = None
-
-
-def get_global_limiter() -> SlidingWindowRateLimiter:
+        super().__init__([(per_second, 1.0), (per_two_minutes, 120.0)])
+
+
+# --- 프로세스 간 공유 백엔드 ---
+# 파일 레이아웃 (little endian):
+#   header: magic, version, 마지막으로 쓴 프로세스의 config 서명, 윈도우 수, blocked_until
+#   window × _MAX_WINDOWS: limit, span, n_buckets, head, total, counts[_MAX_SLOTS]
+_MAGIC = b"RLIM"
+_VERSION = 1
+_MAX_WINDOWS = 4
+_MAX_SLOTS = 128
+_HEADER = struct.Struct("<4sIIId")
+_WINDOW = struct.Struct(f"<IdIqq{_MAX_SLOTS}i")
+_FILE_SIZE = _HEADER.size + _MAX_WINDOWS * _WINDOW.size
+
+
+class SharedRateLimiter(BucketedRateLimiter):
+    """
+    같은 호스트의 여러 프로세스/컨테이너(같은 볼륨)가 하나의 한도를 나눠 쓰는 limiter.
+
+    버킷 카운터를 mmap 파일에 두고 flock으로 직렬화한다. 외부 서비스가 필요 없다.
+    - 한 프로세스가 예약한 슬롯은 즉시 다른 프로세스의 계정에 반영된다.
+    - 헤더에서 학습한 한도/429 차단(penalize)도 파일에 기록되어 모두가 따른다.
+    - 프로세스 내부 대기는 BucketedRateLimiter의 FIFO 큐를 그대로 쓰고,
+      프로세스 간에는 맨 앞 대기자가 계산된 시각에만 다시 확인한다.
+    시간은 time.monotonic()(호스트 공통 CLOCK_MONOTONIC)을 쓴다.
+    """
+
+    backend = "shared"
+    max_windows = _MAX_WINDOWS
+
+    def __init__(self, path: Path, windows: Sequence[Tuple[int, float]], buckets_per_window: int = 0) -> None:
+        if fcntl is None:
+            raise RuntimeError("SharedRateLimiter requires fcntl/mmap (POSIX)")
+        super().__init__(windows, buckets_per_window)
+        if len(self._windows) > _MAX_WINDOWS or any(w.slots > _MAX_SLOTS for w in self._windows):
+            raise ValueError("too many rate windows/buckets for shared limiter")
+        self.path = Path(path)
+        self._signature = zlib.crc32(repr(self._configured).encode("ascii"))
+        self._config_warned = False
+        self._pid = -1
+        self._fd = -1
+        self._map = None
+        self._open()
+
+    def _open(self) -> None:
+        # fork 이후엔 열린 파일 설명자를 공유하면 flock이 서로를 막지 못하므로 다시 연다
+        if self._fd >= 0:
+            try:
+                self._map.close()
+                os.close(self._fd)
+            except OSError:
+                pass
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(fd).st_size < _FILE_SIZE:
+                os.ftruncate(fd, _FILE_SIZE)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        self._fd = fd
+        self._map = mmap.mmap(fd, _FILE_SIZE)
+        self._pid = os.getpid()
+
+    def _read(self) -> _LimiterState:
+        magic, version, signature, n_windows, blocked_until = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION or n_windows > _MAX_WINDOWS:
+            # 새 파일 (또는 다른 버전이 쓴 파일) → 설정값으로 초기화
+            return _LimiterState(self._build_windows(self._configured), 0.0)
+        windows: List[_BucketWindow] = []
+        for i in range(n_windows):
+            limit, span, n_buckets, head, total, *counts = _WINDOW.unpack_from(
+                self._map, _HEADER.size + i * _WINDOW.size)
+            w = _BucketWindow(limit, span, n_buckets)
+            w.head, w.total = head, total
+            w.counts = counts[:w.slots]
+            windows.append(w)
+        if blocked_until - time.monotonic() > 3600:
+            blocked_until = 0.0  # 재부팅 전의 값
+        if signature != self._signature:
+            self._merge_configured(windows)
+        return _LimiterState(windows, blocked_until)
+
+    def _merge_configured(self, windows: List[_BucketWindow]) -> None:
+        """
+        다른 설정(env 한도)으로 같은 파일을 쓰는 프로세스가 있음.
+        초기화해서 서로의 계정을 지우는 대신, span마다 더 엄격한 한도를 쓰고
+        파일에 없는 우리 윈도우는 (자리가 있으면) 더한다 → 모두가 가장 엄격한 설정을 따른다.
+        """
+        by_span = {w.span: w for w in windows}
+        for limit, span in self._configured:
+            w = by_span.get(span)
+            if w is not None:
+                w.limit = min(w.limit, limit)
+            elif len(windows) < _MAX_WINDOWS:
+                windows.extend(self._build_windows([(limit, span)]))
+        if not self._config_warned:
+            self._config_warned = True
+            print(f"[rate_limiter] {self.path} is shared with a different limit config; "
+                  f"using the stricter windows {[(w.limit, w.span) for w in windows]}")
+
+    def _write(self, st: _LimiterState) -> None:
+        _HEADER.pack_into(self._map, 0, _MAGIC, _VERSION, self._signature, len(st.windows), st.blocked_until)
+        for i, w in enumerate(st.windows):
+            counts = w.counts + [0] * (_MAX_SLOTS - w.slots)
+            _WINDOW.pack_into(self._map, _HEADER.size + i * _WINDOW.size,
+                              w.limit, w.span, w.slots - 1, w.head, w.total, *counts)
+
+    @contextmanager
+    def _state(self) -> Iterator[_LimiterState]:
+        if self._pid != os.getpid():
+            self._open()
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            st = self._read()
+            yield st
+            self._write(st)
+            self._windows = st.windows
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+_global_limiter: Optional[BucketedRateLimiter] = None
+_global_lock = threading.Lock()
+
+
+def get_global_limiter() -> BucketedRateLimiter:
+    """
+    RIOT_LIMITER_BACKEND=shared(기본, POSIX) | local
+    shared면 RIOT_LIMITER_PATH(기본 DATA_DIR/riot_ratelimit.bin)를 같은 호스트의
+    모든 워커/컨테이너가 공유한다.
+    """
     global _global_limiter
     if _global_limiter is None:
-        per_sec = int(os.getenv("RIOT_LIMIT_PER_SEC", "19"))
-        per_2min = int(os.getenv("RIOT_LIMIT_PER_2MIN", "99"))
-        _global_limiter = SlidingWindowRateLimiter(per_sec, per_2min)
+        with _global_lock:
+            if _global_limiter is None:
+                per_sec = int(os.getenv("RIOT_LIMIT_PER_SEC", "19"))
+                per_2min = int(os.getenv("RIOT_LIMIT_PER_2MIN", "99"))
+                backend = os.getenv("RIOT_LIMITER_BACKEND", "shared" if fcntl else "local").strip().lower()
+                limiter: Optional[BucketedRateLimiter] = None
+                if backend == "shared":
+                    path = os.getenv("RIOT_LIMITER_PATH") or str(Path(os.getenv("DATA_DIR", "data")) / "riot_ratelimit.bin")
+                    try:
+                        limiter = SharedRateLimiter(Path(path), [(per_sec, 1.0), (per_2min, 120.0)])
+                    except Exception as e:
+                        print(f"[rate_limiter] shared backend unavailable, using local: {e}")
+                _global_limiter = limiter or SlidingWindowRateLimiter(per_sec, per_2min)
     return _global_limiter
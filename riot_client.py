@@ -3,8 +3,11 @@ import time
 from typing import Any, Dict, List, Optional
 
 import requests
+import profiling
 from rate_limiter import get_global_limiter
 
+MAX_RETRY_AFTER = 10  # 초. 429의 Retry-After 상한
+
 
 def _get_api_key() -> str:
     api_key = os.getenv("RIOT_API_KEY", "").strip()
@@ -29,6 +32,21 @@ def get_regional_routing(platform_region: str) -> str:
     return "asia"
 
 
+def _platform_url(platform_region: str, path: str) -> str:
+    """
+    RIOT_API_BASE_URL이 설정되면 (예: 로컬 스텁 서버 http://127.0.0.1:8089)
+    호스트 대신 그 주소로 보냅니다. 벤치마크/테스트용.
+    """
+    base = os.getenv("RIOT_API_BASE_URL", "").strip().rstrip("/")
+    if base:
+        return f"{base}{path}"
+    return f"https://{platform_region}.api.riotgames.com{path}"
+
+
+def _regional_url(platform_region: str, path: str) -> str:
+    return _platform_url(get_regional_routing(platform_region), path)
+
+
 def _headers() -> Dict[str, str]:
     return {"X-Riot-Token": _get_api_key()}
 
@@ -36,6 +54,8 @@ def _headers() -> Dict[str, str]:
 def _limited_get(url: str, **kwargs):
     """
     전역 rate limiter + 429 재시도(간단 백오프).
+    응답 헤더의 한도/사용량은 limiter에 반영하고, 앱 한도 429는 limiter 전체를
+    Retry-After 동안 막아 다른 스레드/프로세스도 함께 기다리게 한다.
     """
     limiter = get_global_limiter()
     attempts = 0
@@ -44,8 +64,12 @@ def _limited_get(url: str, **kwargs):
         attempts += 1
         try:
             if limiter:
-                limiter.acquire()
-            resp = requests.get(url, **kwargs)
+                with profiling.phase("rate_wait"):
+                    limiter.acquire()
+            with profiling.phase("http"):
+                resp = requests.get(url, **kwargs)
+            if limiter:
+                limiter.update_from_headers(resp.headers)
             if resp.status_code != 429:
                 return resp
             # 429 → Retry-After 존중
@@ -54,7 +78,11 @@ def _limited_get(url: str, **kwargs):
                 retry_after = int(resp.headers.get("Retry-After", "1")) or 1
             except Exception:
                 retry_after = 1
-            time.sleep(min(retry_after, 10))
+            retry_after = min(retry_after, MAX_RETRY_AFTER)  # 터무니없는 Retry-After로 모두가 멈추지 않도록
+            if limiter and resp.headers.get("X-Rate-Limit-Type") == "application":
+                limiter.penalize(retry_after)
+            else:
+                time.sleep(retry_after)
             last_resp = resp
         except requests.RequestException as e:
             last_resp = e
@@ -76,7 +104,7 @@ def get_league_entries(platform_region: str, tier: str) -> List[Dict[str, Any]]:
     t = tier.lower().strip()
     if t not in SUPPORTED_LEAGUE_TIERS:
         raise ValueError(f"Unsupported tier: {tier}")
-    url = f"https://{platform_region}.api.riotgames.com/tft/league/v1/{t}"
+    url = _platform_url(platform_region, f"/tft/league/v1/{t}")
     resp = _limited_get(url, headers=_headers(), timeout=15)
     resp.raise_for_status()
     data = resp.json()
@@ -94,7 +122,7 @@ def get_challenger_entries(platform_region: str) -> List[Dict[str, Any]]:
 
 
 def get_summoner_by_id(platform_region: str, encrypted_summoner_id: str) -> Optional[Dict[str, Any]]:
-    url = f"https://{platform_region}.api.riotgames.com/tft/summoner/v1/summoners/{encrypted_summoner_id}"
+    url = _platform_url(platform_region, f"/tft/summoner/v1/summoners/{encrypted_summoner_id}")
     resp = _limited_get(url, headers=_headers(), timeout=15)
     if resp.status_code == 404:
         return None
@@ -106,7 +134,7 @@ def get_summoner_by_puuid(platform_region: str, puuid: str) -> Optional[Dict[str
     """
     TFT 리그 엔트리에서 주는 puuid로 소환사 상세를 조회합니다.
     """
-    url = f"https://{platform_region}.api.riotgames.com/tft/summoner/v1/summoners/by-puuid/{puuid}"
+    url = _platform_url(platform_region, f"/tft/summoner/v1/summoners/by-puuid/{puuid}")
     resp = _limited_get(url, headers=_headers(), timeout=15)
     if resp.status_code == 404:
         return None
@@ -120,8 +148,7 @@ def get_account_by_puuid(platform_region: str, puuid: str) -> Optional[Dict[str,
     """
     실제 Riot ID(= gameName + tagLine)를 얻기 위한 Account API.
     """
-    regional = get_regional_routing(platform_region)
-    url = f"https://{regional}.api.riotgames.com/riot/account/v1/accounts/by-puuid/{puuid}"
+    url = _regional_url(platform_region, f"/riot/account/v1/accounts/by-puuid/{puuid}")
     resp = _limited_get(url, headers=_headers(), timeout=15)
     if resp.status_code == 404:
         return None
@@ -132,16 +159,14 @@ def get_account_by_puuid(platform_region: str, puuid: str) -> Optional[Dict[str,
 # --- Match helpers (regional routing 사용) ---
 
 def get_match_ids(platform_region: str, puuid: str, count: int = 20) -> List[str]:
-    regional = get_regional_routing(platform_region)
-    url = f"https://{regional}.api.riotgames.com/tft/match/v1/matches/by-puuid/{puuid}/ids"
+    url = _regional_url(platform_region, f"/tft/match/v1/matches/by-puuid/{puuid}/ids")
     resp = _limited_get(url, headers=_headers(), params={"count": count}, timeout=15)
     resp.raise_for_status()
     return resp.json()
 
 
 def get_match(platform_region: str, match_id: str) -> Dict[str, Any]:
-    regional = get_regional_routing(platform_region)
-    url = f"https://{regional}.api.riotgames.com/tft/match/v1/matches/{match_id}"
+    url = _regional_url(platform_region, f"/tft/match/v1/matches/{match_id}")
     resp = _limited_get(url, headers=_headers(), timeout=20)
     resp.raise_for_status()
     return resp.json()
@@ -0,0 +1,169 @@
+"""
+매치 수 시간 버킷 롤업 (/api/stats/timeseries).
+
+gameCreation 기준 시간(hour) / 일(day, KST 자정 기준) 버킷마다
+[전체 매치 수, 티어 비트별 매치 수(그 티어 참가자가 있는 매치)]를 array로 들고 있다.
+MatchIndex의 created / masks 배열만 보고 새 매치를 더하므로 원본을 다시 읽지 않으며,
+조회는 구간 안의 버킷만 합친다. 상태는 DATA_DIR/index/rollups.json에 저장.
+"""
+import bisect
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import serializer
+from match_index import INDEX_DIR, OTHER_BIT, TIERS, MatchIndex
+from storage import file_lock, write_atomic
+
+RESOLUTIONS = {"hour": 3600, "day": 86400}
+_KST_OFFSET = 9 * 3600
+_COLUMNS = 1 + OTHER_BIT + 1  # [total, bit 0 .. OTHER_BIT]
+MAX_BUCKETS = 5000
+
+
+def bucket_start(t: int, span: int) -> int:
+    """t(초)가 속한 버킷 시작 (일 단위는 KST 자정)"""
+    return (t + _KST_OFFSET) // span * span - _KST_OFFSET
+
+
+class MatchRollups:
+    def __init__(self, index_dir: Path = INDEX_DIR) -> None:
+        self.index_dir = index_dir
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._reset(None)
+
+    def _reset(self, generation: Optional[str]) -> None:
+        self.generation = generation
+        self.upto = 0
+        self.undated = 0
+        self._rows: Dict[str, Dict[int, array]] = {r: {} for r in RESOLUTIONS}
+        self._keys: Dict[str, List[int]] = {r: [] for r in RESOLUTIONS}
+
+    @property
+    def _path(self) -> Path:
+        return self.index_dir / "rollups.json"
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            data = serializer.loads(self._path.read_bytes())
+            self.generation, self.upto, self.undated = data["generation"], data["upto"], data["undated"]
+            for r in RESOLUTIONS:
+                self._rows[r] = {int(k): array("I", v) for k, v in data[r].items()}
+                self._keys[r] = sorted(self._rows[r])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[rollups] state file ignored: {e}")
+            self._reset(None)
+
+    def _save(self) -> None:
+        data: Dict[str, Any] = {"generation": self.generation, "upto": self.upto, "undated": self.undated}
+        for r in RESOLUTIONS:
+            data[r] = {str(k): v.tolist() for k, v in self._rows[r].items()}
+        with file_lock(self.index_dir / ".lock"):
+            write_atomic(self._path, serializer.dumps(data))
+
+    def _row(self, resolution: str, key: int) -> array:
+        rows = self._rows[resolution]
+        row = rows.get(key)
+        if row is None:
+            row = rows[key] = array("I", bytes(4 * _COLUMNS))
+            bisect.insort(self._keys[resolution], key)
+        return row
+
+    def sync(self, index: MatchIndex) -> int:
+        """색인에 새로 생긴 매치를 버킷에 더한다. 더한 매치 수를 반환"""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if self.generation != index.generation:
+                self._reset(index.generation)
+            end = len(index)
+            if end <= self.upto:
+                return 0
+            created, masks = index.created, index.masks
+            for i in range(self.upto, end):
+                ms = created[i]
+                if ms <= 0:
+                    self.undated += 1
+                    continue
+                m = masks[i]
+                cols = [0] + [1 + b for b in range(OTHER_BIT + 1) if m >> b & 1]
+                for r, span in RESOLUTIONS.items():
+                    row = self._row(r, bucket_start(ms // 1000, span))
+                    for c in cols:
+                        row[c] += 1
+            made = end - self.upto
+            self.upto = end
+            self._save()
+            return made
+
+    def _sum(self, resolution: str, start: int, end: int) -> array:
+        """[start, end) 안에 시작하는 버킷 합"""
+        keys, rows = self._keys[resolution], self._rows[resolution]
+        acc = array("I", bytes(4 * _COLUMNS))
+        for k in keys[bisect.bisect_left(keys, start):bisect.bisect_left(keys, end)]:
+            row = rows[k]
+            for c in range(_COLUMNS):
+                acc[c] += row[c]
+        return acc
+
+    def total(self, start: int, end: int) -> array:
+        """[start, end) 합: 가운데는 일 버킷, 양 끝은 시간 버킷 (start/end는 정시)"""
+        day = RESOLUTIONS["day"]
+        d0 = bucket_start(start + day - 1, day)
+        d1 = bucket_start(end, day)
+        if d0 >= d1:
+            return self._sum("hour", start, end)
+        acc = self._sum("day", d0, d1)
+        for lo, hi in ((start, d0), (d1, end)):
+            part = self._sum("hour", lo, hi)
+            for c in range(_COLUMNS):
+                acc[c] += part[c]
+        return acc
+
+    def series(self, start: int, end: int, resolution: str = "hour", step: int = 1) -> List[Dict[str, Any]]:
+        """[start, end) 구간을 resolution × step 폭으로 나눈 버킷들 (빈 버킷은 0)"""
+        span = RESOLUTIONS[resolution] * max(1, step)
+        base = RESOLUTIONS[resolution]
+        first = bucket_start(start, base)
+        if (end - first) // span > MAX_BUCKETS:
+            raise ValueError(f"too many buckets (max {MAX_BUCKETS})")
+        out = []
+        with self._lock:
+            t = first
+            while t < end:
+                out.append((t, self._sum(resolution, t, t + span)))
+                t += span
+        return [{"t": t * 1000, **_to_dict(acc)} for t, acc in out]
+
+    def window(self, start: int, end: int) -> Dict[str, Any]:
+        """임의 구간 합계 (시간 단위로 바깥쪽으로 맞춤)"""
+        hour = RESOLUTIONS["hour"]
+        with self._lock:
+            return _to_dict(self.total(bucket_start(start, hour), bucket_start(end + hour - 1, hour)))
+
+
+def _to_dict(acc: array) -> Dict[str, Any]:
+    by_tier = {}
+    for b in range(OTHER_BIT + 1):
+        n = acc[1 + b]
+        if n:
+            by_tier[TIERS[b] if b < len(TIERS) else "OTHER"] = n
+    return {"matches": acc[0], "by_tier": by_tier}
+
+
+_global_rollups: Optional[MatchRollups] = None
+_global_lock = threading.Lock()
+
+
+def get_match_rollups() -> MatchRollups:
+    global _global_rollups
+    if _global_rollups is None:
+        with _global_lock:
+            if _global_rollups is None:
+                _global_rollups = MatchRollups()
+    return _global_rollups
@@ -1,19 +1,210 @@
+import json
 import os
 import threading
 import time
-from typing import Optional, List
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, List
 
 from collector import collect_top_matches, DEFAULT_TIERS
+from rate_limiter import get_global_limiter
+
+KST = timezone(timedelta(hours=9))
+
+
+def _clamp(v: float, lo: float, hi: float) -> float:
+    return max(lo, min(hi, v))
+
+
+def _two_minute_budget(limiter_stats: Dict[str, Any]) -> int:
+    """limiter 윈도우들을 2분 기준으로 환산했을 때 가장 빡빡한 한도"""
+    budgets = [w["limit"] * 120.0 / w["span"] for w in limiter_stats.get("windows", []) if w.get("span")]
+    return int(min(budgets)) if budgets else 100
+
+
+class AdaptiveSchedule:
+    """
+    수집 간격 / players / per_player 자동 조정.
+      - 신선도(fresh) = 새 매치 수 / 받아 본 match_id 수
+        · 거의 다 새 것 → 밀려 있음: 간격↓, per_player↑
+        · 새 것 없음   → 간격↑, per_player↓
+      - 시간대별(KST) 분당 새 매치 수를 EWMA로 학습 → 붐비는 시간엔 간격↓, 한산하면 간격↑
+      - players는 신선할 때만 늘리고 새 것이 없으면 줄인다. 어느 쪽이든 한 번의 수집이
+        2분 한도(limiter 윈도우 환산) × COLLECT_BUDGET_SHARE 안에 들어가도록
+        예상 호출 수(신규 플레이어 보강 호출 EWMA 포함)로 상한을 둔다
+    결정 내역은 decisions(최근 history개)와 snapshot()으로 확인할 수 있고,
+    시간대 학습값은 state_path(JSON)에 저장해 재시작 후에도 이어 쓴다.
+    """
+
+    TARGET_FRESH = 0.5
+    EWMA_ALPHA = 0.3
+
+    def __init__(self, base_interval: int, players: int, per_player: int,
+                 min_interval: Optional[int] = None, max_interval: Optional[int] = None,
+                 max_players: Optional[int] = None, max_per_player: int = 20,
+                 budget_share: float = 0.8, state_path: Optional[Path] = None, history: int = 48) -> None:
+        self.base_interval = base_interval
+        self.min_interval = min_interval or max(60, base_interval // 4)
+        self.max_interval = max(self.min_interval, max_interval or base_interval * 4)
+        self.players = players
+        self.per_player = per_player
+        self.max_players = max_players or max(players * 4, 50)
+        self.max_per_player = max_per_player
+        self.budget_share = budget_share
+        self.state_path = state_path
+        self.scale = 1.0  # 신선도로 조정되는 간격 배율
+        self.enrich_calls = 0.0  # 수집 1회당 신규 플레이어 보강 호출 수 EWMA (summoner + account)
+        self.hourly_rate: List[Optional[float]] = [None] * 24  # KST 시각별 분당 새 매치 수
+        self.decisions: deque = deque(maxlen=history)
+        self._last_run: Optional[float] = None
+        self._lock = threading.Lock()
+        self._load_state()
+
+    def _load_state(self) -> None:
+        if not self.state_path:
+            return
+        try:
+            rates = json.loads(self.state_path.read_text(encoding="utf-8")).get("hourly_rate")
+            if isinstance(rates, list) and len(rates) == 24:
+                self.hourly_rate = [float(r) if isinstance(r, (int, float)) else None for r in rates]
+        except Exception:
+            pass
+
+    def _save_state(self) -> None:
+        if not self.state_path:
+            return
+        try:
+            self.state_path.write_text(json.dumps({"hourly_rate": self.hourly_rate}), encoding="utf-8")
+        except Exception as e:
+            print(f"[scheduler] state save error: {e}")
+
+    def hour_factor(self, hour: int) -> float:
+        """전체 평균 대비 이 시간대가 붐빌수록 < 1 (간격을 줄임)"""
+        known = [r for r in self.hourly_rate if r is not None]
+        cur = self.hourly_rate[hour]
+        if not known or cur is None:
+            return 1.0
+        avg = sum(known) / len(known)
+        if avg <= 0:
+            return 1.0
+        return _clamp(avg / cur, 0.5, 2.0) if cur > 0 else 2.0
+
+    def interval(self, now: Optional[datetime] = None) -> int:
+        now = now or datetime.now(KST)
+        return int(_clamp(self.base_interval * self.scale * self.hour_factor(now.hour),
+                          self.min_interval, self.max_interval))
+
+    def record(self, result: Dict[str, Any], limiter_stats: Dict[str, Any], tiers: int,
+               now: Optional[datetime] = None) -> Dict[str, Any]:
+        """한 번의 수집 결과로 다음 간격/규모를 정하고 그 결정을 반환"""
+        now = now or datetime.now(KST)
+        mono = time.monotonic()
+        with self._lock:
+            new = int(result.get("matches_fetched") or 0)
+            checked = int(result.get("match_ids_checked") or 0)
+            calls = int(result.get("api_calls") or 0)
+            added = int(result.get("players_added") or 0)
+            fresh = new / checked if checked else 0.0
+            reasons: List[str] = []
+
+            # 1) 시간대별 도착률 학습 (직전 수집 이후 분당 새 매치)
+            rate = None
+            if self._last_run is not None:
+                minutes = max((mono - self._last_run) / 60.0, 1e-3)
+                rate = new / minutes
+                prev = self.hourly_rate[now.hour]
+                self.hourly_rate[now.hour] = rate if prev is None else prev + self.EWMA_ALPHA * (rate - prev)
+                self._save_state()
+            self._last_run = mono
+
+            # 2) 신선도 → 간격 배율 / per_player
+            if checked:
+                step = _clamp(fresh / self.TARGET_FRESH, 0.5, 2.0) if fresh else 0.5
+                self.scale = _clamp(self.scale / step, self.min_interval / self.base_interval,
+                                    self.max_interval / self.base_interval)
+                if fresh >= 0.8 and self.per_player < self.max_per_player:
+                    self.per_player = min(self.max_per_player, self.per_player + max(1, self.per_player // 2))
+                    reasons.append("saturated")
+                elif fresh < 0.2 and self.per_player > 1:
+                    self.per_player -= 1
+                    reasons.append("stale")
+                if not new:
+                    reasons.append("idle")
+
+            # 3) players: 신선하면 늘리고 밀린 게 없으면 줄임 (빈 수집에 호출을 더 쓰지 않도록).
+            #    상한은 2분 예산 역산 (리그 목록 tiers회 + 신규 플레이어 보강 + 플레이어당 ids 1회 + 새 매치 예상분)
+            self.enrich_calls += self.EWMA_ALPHA * (2 * added - self.enrich_calls)
+            budget = _two_minute_budget(limiter_stats)
+            per_player_calls = 1 + self.per_player * max(fresh, 0.1)
+            if checked:
+                cap = int(_clamp((budget * self.budget_share - tiers - self.enrich_calls) / per_player_calls,
+                                 1, self.max_players))
+                if fresh >= self.TARGET_FRESH:
+                    players = max(self.players + 1, self.players * 3 // 2)
+                elif fresh < 0.2:
+                    players = max(1, self.players * 3 // 4)
+                else:
+                    players = self.players
+                players = min(players, cap)
+                if players != self.players:
+                    reasons.append("players-up" if players > self.players else "players-down")
+                self.players = players
+
+            hf = self.hour_factor(now.hour)
+            if hf < 1.0:
+                reasons.append("peak-hour")
+            elif hf > 1.0:
+                reasons.append("off-peak")
+            next_interval = self.interval(now)
+
+            decision = {
+                "at": now.isoformat(timespec="seconds"),
+                "hour": now.hour,
+                "new_matches": new,
+                "match_ids_checked": checked,
+                "fresh_ratio": round(fresh, 3),
+                "api_calls": calls,
+                "budget_2min": budget,
+                "budget_used": round(calls / budget, 3) if budget else None,
+                "fresh_per_call": round(new / calls, 3) if calls else None,
+                "expected_calls": round(tiers + self.enrich_calls + self.players * per_player_calls, 1),
+                "arrival_per_min": round(rate, 3) if rate is not None else None,
+                "hour_factor": round(hf, 3),
+                "scale": round(self.scale, 3),
+                "next_interval_sec": next_interval,
+                "players": self.players,
+                "per_player": self.per_player,
+                "reasons": reasons,
+            }
+            self.decisions.append(decision)
+            return decision
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "base_interval_sec": self.base_interval,
+                "min_interval_sec": self.min_interval,
+                "max_interval_sec": self.max_interval,
+                "players": self.players,
+                "per_player": self.per_player,
+                "scale": round(self.scale, 3),
+                "hourly_rate": [round(r, 3) if r is not None else None for r in self.hourly_rate],
+                "decisions": list(self.decisions),
+            }
+
 
 class CollectorThread(threading.Thread):
     def __init__(self, interval_seconds: int, region: str = "kr",
-                 players: int = 50, per_player: int = 10, tiers: List[str] = None):
+                 players: int = 50, per_player: int = 10, tiers: List[str] = None,
+                 adaptive: Optional[AdaptiveSchedule] = None):
         super().__init__(daemon=True)
         self.interval_seconds = interval_seconds
         self.region = region
         self.players = players
         self.per_player = per_player
         self.tiers = tiers or DEFAULT_TIERS
+        self.adaptive = adaptive
         self._stop_event = threading.Event()
 
     def stop(self) -> None:
@@ -21,18 +212,23 @@ class CollectorThread(threading.Thread):
 
     def run(self) -> None:
         while not self._stop_event.is_set():
+            interval = self.interval_seconds
             try:
                 res = collect_top_matches(self.region, self.players, self.per_player, self.tiers)
                 # 간단 로그 (stdout)
                 print(f"[collector] matches={res['matches_fetched']} players={res['players_collected']} "
                       f"dur={res['duration_sec']}s tiers={','.join(self.tiers)}")
+                if self.adaptive:
+                    d = self.adaptive.record(res, get_global_limiter().stats(), len(self.tiers))
+                    self.players, self.per_player = d["players"], d["per_player"]
+                    interval = d["next_interval_sec"]
+                    print(f"[scheduler] next={interval}s players={self.players} per_player={self.per_player} "
+                          f"fresh={d['fresh_ratio']} calls={d['api_calls']}/{d['budget_2min']} "
+                          f"reasons={','.join(d['reasons']) or '-'}")
             except Exception as e:
                 print(f"[collector] error: {e}")
             # stop-aware sleep
-            for _ in range(self.interval_seconds):
-                if self._stop_event.is_set():
-                    break
-                time.sleep(1)
+            self._stop_event.wait(interval)
 
 def start_scheduler_from_env() -> Optional[CollectorThread]:
     interval_env = os.getenv("COLLECT_INTERVAL_SEC", "").strip()
@@ -52,6 +248,22 @@ def start_scheduler_from_env() -> Optional[CollectorThread]:
     else:
         tiers = DEFAULT_TIERS
 
-    t = CollectorThread(interval, region, players, per_player, tiers)
+    # COLLECT_ADAPTIVE=0 이면 기존처럼 고정 간격/규모
+    adaptive = None
+    if os.getenv("COLLECT_ADAPTIVE", "1").strip().lower() not in ("0", "false", "no", "off"):
+        def _int_env(name: str) -> Optional[int]:
+            v = os.getenv(name, "").strip()
+            return int(v) if v.isdigit() else None
+        adaptive = AdaptiveSchedule(
+            interval, players, per_player,
+            min_interval=_int_env("COLLECT_MIN_INTERVAL_SEC"),
+            max_interval=_int_env("COLLECT_MAX_INTERVAL_SEC"),
+            max_players=_int_env("COLLECT_MAX_PLAYERS"),
+            max_per_player=_int_env("COLLECT_MAX_PER_PLAYER") or 20,
+            budget_share=float(os.getenv("COLLECT_BUDGET_SHARE", "0.8")),
+            state_path=Path(os.getenv("DATA_DIR", "data")) / "collect_schedule.json",
+        )
+
+    t = CollectorThread(interval, region, players, per_player, tiers, adaptive)
     t.start()
     return t
@@ -0,0 +1,114 @@
+"""
+JSON 직렬화 계층.
+
+storage / match_index / Flask 응답이 모두 이 모듈을 거친다.
+  - orjson이 설치되어 있으면 인코딩/전체 디코딩에 사용
+  - msgspec이 설치되어 있으면 필요한 필드만 타입 지정 구조체로 디코딩
+    (나머지 참가자 트리는 만들지 않고 건너뜀)
+  - 둘 다 없으면 표준 json으로 폴백
+SERIALIZER_BACKEND=json 으로 강제로 표준 json을 쓸 수 있다.
+"""
+import json
+import os
+from typing import Any, Callable, List, Optional, Tuple
+
+_FORCE_STDLIB = os.getenv("SERIALIZER_BACKEND", "").strip().lower() == "json"
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+if _FORCE_STDLIB:
+    orjson = None
+    msgspec = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+PARTIAL_BACKEND = "msgspec" if msgspec is not None else BACKEND
+
+
+# --- 인코딩 ---
+def dumps(obj: Any, *, sort_keys: bool = False, indent: bool = False,
+          default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """obj → UTF-8 JSON 바이트 (비 ASCII 문자는 이스케이프하지 않음)"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=default, option=option)
+        except TypeError:
+            pass  # 64비트 초과 정수 등 → 표준 json
+    return json.dumps(obj, ensure_ascii=False, sort_keys=sort_keys, indent=2 if indent else None,
+                      separators=(",", ": ") if indent else (",", ":"), default=default).encode("utf-8")
+
+
+def dumps_lines(records) -> bytes:
+    """JSONL 블록 (레코드마다 한 줄)"""
+    return b"".join(dumps(r) + b"\n" for r in records)
+
+
+# --- 디코딩 ---
+def loads(data) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+if msgspec is not None:
+    class _Participant(msgspec.Struct):
+        puuid: Optional[str] = None
+        tier: Optional[str] = None
+
+    class _Info(msgspec.Struct):
+        gameCreation: Any = None
+        participants: List[_Participant] = msgspec.field(default_factory=list)
+
+    class _Metadata(msgspec.Struct):
+        match_id: Optional[str] = None
+
+    class _MatchHead(msgspec.Struct):
+        metadata: Optional[_Metadata] = None
+        info: Optional[_Info] = None
+
+    _head_decoder = msgspec.json.Decoder(_MatchHead)
+
+
+def _decode_head(data):
+    """필요 필드만 담은 _MatchHead, 또는 (폴백/실패 시) None"""
+    try:
+        return _head_decoder.decode(data)
+    except (msgspec.ValidationError, msgspec.DecodeError):
+        return None
+
+
+def match_head(data) -> Optional[Tuple[Optional[str], Any, List[Tuple[Optional[str], Optional[str]]]]]:
+    """
+    매치 한 줄에서 (metadata.match_id, info.gameCreation, [(puuid, tier), ...])만 뽑는다.
+    JSON 객체가 아니면 None.
+    """
+    if msgspec is not None:
+        head = _decode_head(data)
+        if head is not None:
+            meta, info = head.metadata, head.info
+            if info is None:
+                return (meta.match_id if meta else None), None, []
+            return ((meta.match_id if meta else None), info.gameCreation,
+                    [(p.puuid, p.tier) for p in info.participants])
+        # 타입이 예상과 다른 줄 → 아래 전체 디코딩으로 처리
+    try:
+        m = loads(data)
+    except Exception:
+        return None
+    if not isinstance(m, dict):
+        return None
+    meta = m.get("metadata", {}) or {}
+    info = m.get("info", {}) or {}
+    parts = info.get("participants", []) or []
+    return meta.get("match_id"), info.get("gameCreation"), [(p.get("puuid"), p.get("tier")) for p in parts]
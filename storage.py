@@ -1,7 +1,16 @@
 import json
 import os
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Set
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+import serializer
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 동작
+    fcntl = None
 
 DATA_DIR = Path(os.getenv("DATA_DIR", "data"))
 DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -9,17 +18,46 @@ DATA_DIR.mkdir(parents=True, exist_ok=True)
 MATCHES_JSONL = DATA_DIR / "matches.jsonl"
 SUMMONERS_JSON = DATA_DIR / "summoners.json"
 
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """path(잠금 전용 파일)에 대한 프로세스 간 배타 잠금 (POSIX flock)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
 def append_jsonl(filepath: Path, records: Iterable[Dict[str, Any]]) -> None:
     filepath.parent.mkdir(parents=True, exist_ok=True)
-    with filepath.open("a", encoding="utf-8") as f:
-        for record in records:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    # 한 번에 write → 다른 프로세스(색인 등)가 줄 중간을 볼 가능성을 줄임
+    with filepath.open("ab") as f:
+        f.write(serializer.dumps_lines(records))
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """같은 디렉터리의 고유한 임시 파일에 쓴 뒤 교체 (읽는 쪽은 이전/새 내용 중 하나만 봄)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    f = tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False)
+    try:
+        with f:
+            f.write(data)
+        os.replace(f.name, path)
+    except BaseException:
+        try:
+            os.unlink(f.name)
+        except OSError:
+            pass
+        raise
 
-def load_summoners() -> List[Dict[str, Any]]:
-    if not SUMMONERS_JSON.exists():
+def load_summoners(path: Optional[Path] = None) -> List[Dict[str, Any]]:
+    path = path or SUMMONERS_JSON
+    if not path.exists():
         return []
-    with SUMMONERS_JSON.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    with path.open("rb") as f:
+        return serializer.loads(f.read())
 
 def save_summoners(items: List[Dict[str, Any]]) -> None:
     SUMMONERS_JSON.parent.mkdir(parents=True, exist_ok=True)
@@ -32,13 +70,13 @@ def load_existing_match_ids(filepath: Path) -> Set[str]:
     if not filepath.exists():
         return ids
     try:
-        with filepath.open("r", encoding="utf-8") as f:
+        with filepath.open("rb") as f:
             for line in f:
                 if not line.strip():
                     continue
                 try:
-                    obj = json.loads(line)
-                    mid = obj.get("metadata", {}).get("match_id")
+                    head = serializer.match_head(line)  # match_id만 필요
+                    mid = head[0] if head else None
                     if mid:
                         ids.add(mid)
                 except Exception:
@@ -0,0 +1,276 @@
+"""
+매치 요약 물질화(materialization).
+
+collector가 매치를 저장하고 색인을 갱신한 직후 sync()를 호출하면, 새 매치마다
+/api/matches/summary 응답에 필요한 요약을 미리 계산해 compact 형태(중첩 리스트)로
+DATA_DIR/index/summaries.jsonl에 붙인다. 줄 번호는 MatchIndex의 매치 번호와 같다.
+
+소환사 이름은 바뀔 수 있으므로(backfill) 저장하지 않고 expand() 때 name_map으로 채운다.
+"""
+import json
+import os
+import threading
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import profiling
+import serializer
+from match_index import INDEX_DIR, MatchIndex
+import storage
+from storage import file_lock, load_summoners
+
+KST = timezone(timedelta(hours=9))
+UNKNOWN = "알 수 없음"
+
+_SYNC_BATCH = 1000
+# 요청 처리 중에 새로 만들 수 있는 요약 수 상한 (물질화는 collector 몫, 요청은 밀린 것만 조금씩)
+REQUEST_SYNC_LIMIT = int(os.getenv("SUMMARY_REQUEST_SYNC_LIMIT", "200"))
+
+# compact 레이아웃 (리스트 인덱스)
+# match : [match_id, gameCreation, iso_kst, plain_kst, tier_summary, src_puuid, src_tier, players]
+# player: [puuid, tier, placement, augments, is_source, traits, units, top_trait_idx, core_unit_idx]
+# trait : [name, tier_current, num_units, style]
+# unit  : [character_id, star, items]
+
+
+def summarize(match: dict) -> list:
+    """원본 매치 → 이름이 빠진 compact 요약"""
+    meta = match.get("metadata", {}) or {}
+    info = match.get("info", {}) or {}
+    t_ms = info.get("gameCreation") or 0
+    parts = info.get("participants", []) or []
+
+    # ★ 수집 원본(누구의 매치인지)
+    collected = info.get("_collected_for") or {}
+    src_puuid = collected.get("puuid")
+    src_tier = (collected.get("tier") or "UNRANKED") if src_puuid else None
+
+    # 티어 집계
+    tiers = [(p.get("tier") or "UNRANKED").upper() for p in parts]
+    c = Counter(t for t in tiers if t != "UNRANKED")
+    tier_summary = ", ".join(f"{k}×{v}" for k, v in c.most_common()) or "티어 정보 없음"
+
+    players = []
+    for p, tier in zip(parts, tiers):
+        traits = [[tr.get("name"), tr.get("tier_current"), tr.get("num_units"), tr.get("style")]
+                  for tr in (p.get("traits") or [])]
+        units = [[u.get("character_id"), u.get("tier"), u.get("itemNames") or []]
+                 for u in (p.get("units") or [])]
+        top_traits = sorted(range(len(traits)), key=lambda i: (traits[i][1] or 0, traits[i][2] or 0),
+                            reverse=True)[:3]
+        core_units = sorted(range(len(units)), key=lambda i: (units[i][1] or 0), reverse=True)[:3]
+        players.append([p.get("puuid", ""), tier, p.get("placement"), p.get("augments") or [],
+                        bool(p.get("is_source")), traits, units, top_traits, core_units])
+
+    # 시간 문자열 (KST + 깔끔형)
+    if isinstance(t_ms, int) and t_ms > 0:
+        dt = datetime.fromtimestamp(t_ms / 1000, tz=KST)
+        iso_kst = dt.isoformat(timespec="seconds")
+        plain_kst = dt.strftime("%Y-%m-%d %H:%M:%S")
+    else:
+        iso_kst = plain_kst = UNKNOWN
+
+    return [meta.get("match_id"), t_ms, iso_kst, plain_kst, tier_summary, src_puuid, src_tier, players]
+
+
+def _short(puuid: str) -> str:
+    return puuid[:8] + "…"
+
+
+def expand(compact: list, name_map: Dict[str, str]) -> dict:
+    """compact 요약 → API 응답 형태 (이름은 지금의 name_map으로)"""
+    mid, t_ms, iso_kst, plain_kst, tier_summary, src_puuid, src_tier, players = compact
+    out_players = []
+    for puuid, tier, placement, augments, is_source, traits, units, top_idx, core_idx in players:
+        all_traits = [{"name": n, "tier_current": tc, "num_units": nu, "style": st}
+                      for n, tc, nu, st in traits]
+        all_units = [{"name": n, "star": star, "items": items} for n, star, items in units]
+        out_players.append({
+            "name": name_map.get(puuid, _short(puuid)) if puuid else UNKNOWN,
+            "tier": tier,
+            "placement": placement,
+            "augments": augments,
+            "is_source": is_source,  # ← 수집원 참가자 표시
+            "top_traits": [all_traits[i] for i in top_idx],
+            "core_units": [all_units[i] for i in core_idx],
+            "traits": all_traits,
+            "units": all_units,
+        })
+    return {
+        "match_id": mid,
+        "gameCreation": t_ms,
+        "gameTimeKST": iso_kst,
+        "gameTimeKSTPlain": plain_kst,
+        "tier_summary": tier_summary,
+        # ★ 프론트에서 바로 쓰기 쉽게 수집 원본 정보 포함
+        "collected_for": {
+            "puuid": src_puuid,
+            "name": name_map.get(src_puuid, _short(src_puuid) if src_puuid else None),
+            "tier": (src_tier or "UNRANKED") if src_puuid else None,
+        },
+        "players": out_players,
+    }
+
+
+_name_map_cache: Dict[str, Any] = {"key": None, "map": {}}
+
+
+def load_name_map() -> Dict[str, str]:
+    """puuid -> 표시용 이름 맵 (없으면 puuid 축약). summoners.json이 그대로면 캐시 사용"""
+    try:
+        path = storage.SUMMONERS_JSON
+        st = path.stat()
+        key = (str(path), st.st_mtime_ns, st.st_size)
+    except OSError:
+        key = None
+    if key is not None and _name_map_cache["key"] == key:
+        return _name_map_cache["map"]
+    name_map: Dict[str, str] = {}
+    try:
+        for s in load_summoners():
+            if not isinstance(s, dict):
+                continue
+            p = s.get("puuid")
+            nm = s.get("name")
+            if not nm:
+                g = s.get("gameName")
+                t = s.get("tagLine")
+                if g and t:
+                    nm = f"{g}#{t}"
+            if p:
+                name_map[p] = nm or (str(p)[:8] + "…")
+    except Exception:
+        pass
+    _name_map_cache["key"], _name_map_cache["map"] = key, name_map
+    return name_map
+
+
+class SummaryStore:
+    """
+    summaries.jsonl(요약 한 줄씩) + summaries.off(줄별 offset/length, <QI).
+    MatchIndex.generation이 바뀌면(색인 재구성) 처음부터 다시 만든다.
+    """
+
+    def __init__(self, index_dir: Path = INDEX_DIR) -> None:
+        self.index_dir = index_dir
+        self._lock = threading.RLock()
+        self._reset(None)
+
+    def _reset(self, generation: Optional[str]) -> None:
+        self.generation = generation
+        self.offsets = array("Q")
+        self.lengths = array("I")
+
+    @property
+    def _data_path(self) -> Path:
+        return self.index_dir / "summaries.jsonl"
+
+    @property
+    def _off_path(self) -> Path:
+        return self.index_dir / "summaries.off"
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.index_dir / "summaries.meta.json"
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def _file_generation(self) -> Optional[str]:
+        try:
+            return json.loads(self._meta_path.read_text(encoding="utf-8")).get("generation")
+        except Exception:
+            return None
+
+    def _wipe(self, generation: Optional[str]) -> None:
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self._data_path.write_bytes(b"")
+        self._off_path.write_bytes(b"")
+        self._meta_path.write_text(json.dumps({"generation": generation}), encoding="utf-8")
+        self._reset(generation)
+
+    def _load(self) -> None:
+        """파일에 있는데 메모리에 없는 offset만 읽고, 중단된 꼬리는 잘라낸다."""
+        rec = array("Q").itemsize + array("I").itemsize
+        n = len(self.offsets)
+        total = self._off_path.stat().st_size // rec if self._off_path.exists() else 0
+        if total > n:
+            with self._off_path.open("rb") as f:
+                f.seek(n * rec)
+                raw = f.read((total - n) * rec)
+            for k in range(total - n):
+                self.offsets.frombytes(raw[k * rec:k * rec + 8])
+                self.lengths.frombytes(raw[k * rec + 8:(k + 1) * rec])
+        end = self.offsets[-1] + self.lengths[-1] if self.offsets else 0
+        for path, nbytes in ((self._off_path, len(self.offsets) * rec), (self._data_path, end)):
+            if path.exists() and path.stat().st_size > nbytes:
+                with path.open("r+b") as f:
+                    f.truncate(nbytes)
+
+    def sync(self, index: MatchIndex, limit: Optional[int] = None) -> int:
+        """
+        색인에는 있고 요약이 없는 매치를 요약해 붙인다. 새로 만든 수를 반환.
+        limit: 이번에 새로 만들 최대 개수 (요청 경로용, 0이면 다른 프로세스가 만든 것만 읽어 옴)
+        """
+        with self._lock:
+            if self.generation == index.generation and len(self) >= len(index):
+                return 0
+            with file_lock(self.index_dir / ".summaries.lock"):
+                if self._file_generation() != index.generation:
+                    self._wipe(index.generation)
+                elif self.generation != index.generation:
+                    self._reset(index.generation)
+                self._load()
+                made = 0
+                target = len(index) if limit is None else min(len(index), len(self) + max(0, limit))
+                while len(self) < target:
+                    ords = list(range(len(self), min(target, len(self) + _SYNC_BATCH)))
+                    matches = index.read_many(ords)
+                    with profiling.phase("summarize"):
+                        compacts = [summarize(m) for m in matches]
+                    self._append(compacts)
+                    made += len(ords)
+                return made
+
+    def _append(self, compacts: List[list]) -> None:
+        lines = [serializer.dumps(c) + b"\n" for c in compacts]
+        pos = self._data_path.stat().st_size if self._data_path.exists() else 0
+        offs = array("Q")
+        lens = array("I")
+        for line in lines:
+            offs.append(pos)
+            lens.append(len(line))
+            pos += len(line)
+        with self._data_path.open("ab") as f:
+            f.write(b"".join(lines))
+        recs = b"".join(offs[k:k + 1].tobytes() + lens[k:k + 1].tobytes() for k in range(len(lines)))
+        with self._off_path.open("ab") as f:
+            f.write(recs)
+        self.offsets.extend(offs)
+        self.lengths.extend(lens)
+
+    def read_many(self, ords: List[int]) -> List[list]:
+        raw: Dict[int, bytes] = {}
+        with profiling.phase("read"), self._data_path.open("rb") as f:
+            for i in sorted(set(ords)):
+                f.seek(self.offsets[i])
+                raw[i] = f.read(self.lengths[i])
+        with profiling.phase("decode"):
+            out = {i: serializer.loads(b) for i, b in raw.items()}
+        return [out[i] for i in ords]
+
+
+_global_store: Optional[SummaryStore] = None
+_global_lock = threading.Lock()
+
+
+def get_summary_store() -> SummaryStore:
+    global _global_store
+    if _global_store is None:
+        with _global_lock:
+            if _global_store is None:
+                _global_store = SummaryStore()
+    return _global_store
@@ -6,6 +6,39 @@ import json
 def client():
     return app.test_client()
 
+@pytest.fixture
+def isolated_collector(tmp_path, monkeypatch):
+    # 수집 파이프라인의 싱글턴(색인/요약/집계/롤업/LP 이력/limiter)을 tmp_path로 돌려
+    # 테스트가 실제 DATA_DIR에 쓰지 않게 한다
+    import collector
+    import rate_limiter
+    import storage
+    from feed import MatchFeed
+    from hot_cache import HotCache
+    from league_history import LeagueHistory
+    from match_index import MatchIndex
+    from players import PlayerStats
+    from rollups import MatchRollups
+    from summaries import SummaryStore
+
+    matches = tmp_path / "matches.jsonl"
+    index_dir = tmp_path / "index"
+    singletons = {
+        "get_match_index": MatchIndex(matches, index_dir),
+        "get_summary_store": SummaryStore(index_dir),
+        "get_player_stats": PlayerStats(index_dir),
+        "get_match_rollups": MatchRollups(index_dir),
+        "get_league_history": LeagueHistory(tmp_path / "history"),
+        "get_hot_cache": HotCache(),
+        "get_feed": MatchFeed(),
+    }
+    for name, obj in singletons.items():
+        monkeypatch.setattr(collector, name, lambda obj=obj: obj)
+    monkeypatch.setattr(collector, "MATCHES_JSONL", matches)
+    monkeypatch.setattr(storage, "SUMMONERS_JSON", tmp_path / "summoners.json")
+    monkeypatch.setattr(rate_limiter, "_global_limiter", rate_limiter.SlidingWindowRateLimiter(1000, 10000))
+    return tmp_path
+
 def test_root_returns_html(client):
     resp = client.get('/')
     assert resp.status_code == 200
@@ -37,7 +70,7 @@ def test_api_matches(client):
     assert isinstance(data['matches'], list)
     assert isinstance(data['total'], int)
 
-def test_collect_endpoint(client):
+def test_collect_endpoint(client, isolated_collector):
     resp = client.post('/collect?region=kr&players=1&per_player=1')
     assert resp.status_code in [200, 500]
 
@@ -47,4 +80,27 @@ def test_html_static_files(client):
     assert resp.content_type.startswith('text/html')
     assert b'TFT Top Tracker' in resp.data
 
-  
\ No newline at end of file
+  
+def test_collect_against_riot_stub(isolated_collector, monkeypatch):
+    # 실제 Riot API 대신 로컬 스텁 서버로 수집 파이프라인 전체를 검증
+    import collector
+    from bench.riot_stub import RiotStub
+    from bench.synthetic import SyntheticWorld
+
+    tmp_path = isolated_collector
+    world = SyntheticWorld(seed=1, tracked_players=20, other_players=200, n_matches=200)
+    monkeypatch.setenv("RIOT_API_KEY", "stub")
+    with RiotStub(world, latency_ms=0, jitter_ms=0) as stub:
+        monkeypatch.setenv("RIOT_API_BASE_URL", stub.base_url)
+        res = collector.collect_top_matches("kr", 2, 1, ["challenger"])
+
+    assert res["players_collected"] == 2
+    assert res["matches_fetched"] == 2
+    lines = (tmp_path / "matches.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+    info = json.loads(lines[0])["info"]
+    assert info["_collected_for"]["tier"] == "CHALLENGER"
+    assert any(p.get("is_source") for p in info["participants"])
+    # 파생 데이터도 tmp_path 아래에만 생김
+    assert (tmp_path / "history" / "league.log").exists()
+    assert (tmp_path / "index" / "summaries.jsonl").exists()
@@ -0,0 +1,87 @@
+import json
+
+from bench.synthetic import SyntheticWorld
+from feed import MatchFeed
+from hot_cache import HotCache
+from match_index import MatchIndex
+from summaries import SummaryStore
+
+
+def _write(path, matches, mode="w"):
+    with path.open(mode, encoding="utf-8") as f:
+        for m in matches:
+            f.write(json.dumps(m, ensure_ascii=False) + "\n")
+
+
+def _events(chunk: bytes):
+    out = []
+    for block in chunk.decode("utf-8").split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if ": " in line and not line.startswith(":"))
+        if "event" in fields:
+            out.append((fields["event"], fields.get("id"), json.loads(fields["data"])))
+    return out
+
+
+def _feed(tmp_path, matches, backlog=8):
+    path = tmp_path / "matches.jsonl"
+    _write(path, matches)
+    idx = MatchIndex(path, tmp_path / "index")
+    store = SummaryStore(tmp_path / "index")
+    return path, MatchFeed(backlog=backlog, heartbeat=0.05, index=idx, store=store, cache=HotCache(16))
+
+
+def test_stream_pushes_new_matches_and_resumes(tmp_path):
+    world = SyntheticWorld(seed=13, tracked_players=20, other_players=100, n_matches=40)
+    matches = [world.make_match(i, annotate=True) for i in range(40)]
+    path, feed = _feed(tmp_path, matches[:20])
+
+    client = feed.stream()
+    (kind, hello_id, data), = _events(next(client))
+    assert kind == "hello" and data["total_matches"] == 20
+    assert next(client) == b": ping\n\n"  # 새 매치 없음
+
+    _write(path, matches[20:23], mode="a")
+    feed.catch_up(force=True)
+    evs = _events(next(client))
+    assert [e[0] for e in evs] == ["match", "match", "match", "stats"]
+    assert [e[2]["match_id"] for e in evs[:3]] == [m["metadata"]["match_id"] for m in matches[20:23]]
+    assert evs[3][2]["new_matches"] == 3 and evs[3][2]["total_matches"] == 23
+    first_id = evs[0][1]
+    client.close()
+    assert feed.stats()["clients"] == 0
+
+    # 끊겼다가 첫 매치 id부터 이어받기 → 나머지 2개 재전송
+    resumed = feed.stream(first_id)
+    assert next(resumed) == b"retry: 5000\n\n"
+    evs = _events(next(resumed))
+    assert [e[1] for e in evs[:2]] == [hello_id.split(":")[0] + ":22", hello_id.split(":")[0] + ":23"]
+
+    # 링(8개)보다 많이 밀린 id → reset
+    _write(path, matches[23:40], mode="a")
+    feed.catch_up(force=True)
+    (kind, _, data), = _events(next(feed.stream(first_id)))
+    assert kind == "reset" and data["total_matches"] == 40
+
+
+def test_since_replays_matches_added_after_first_load_and_streams_are_capped(tmp_path):
+    world = SyntheticWorld(seed=19, tracked_players=20, other_players=100, n_matches=30)
+    matches = [world.make_match(i, annotate=True) for i in range(30)]
+    path, feed = _feed(tmp_path, matches[:20])
+    feed.max_streams = 1
+    feed.catch_up(force=True)  # 첫 로드 시점: 20개
+
+    # 화면을 불러온 뒤 구독하기 전에 3개가 더 들어와 발행됨 (since 없이 붙으면 hello=23으로 유실)
+    _write(path, matches[20:23], mode="a")
+    feed.catch_up(force=True)
+    client = feed.stream(since=20)
+    assert next(client) == b"retry: 5000\n\n"
+    evs = _events(next(client))
+    assert [e[2]["match_id"] for e in evs if e[0] == "match"] == \
+           [m["metadata"]["match_id"] for m in matches[20:23]]
+    assert feed.full()
+
+    client.close()
+    assert not feed.full()
+    # 본 적 없는 위치(앞선 since)는 reset
+    (kind, _, data), = _events(next(feed.stream(since=99)))
+    assert kind == "reset" and data["total_matches"] == 23
@@ -0,0 +1,71 @@
+from league_history import LeagueHistory
+
+T0 = 1_700_000_000  # 초
+
+
+def test_history_records_changes_rollups_and_reloads(tmp_path):
+    h = LeagueHistory(tmp_path / "history")
+    covered = ["CHALLENGER", "GRANDMASTER"]
+    assert h.record([("a", "CHALLENGER", 1200, 100, 80), ("b", "GRANDMASTER", 700, 50, 50)], covered, T0) == 2
+    assert h.record([("a", "CHALLENGER", 1200, 100, 80), ("b", "GRANDMASTER", 700, 50, 50)], covered, T0 + 900) == 0
+    # LP 큰 점프(int16 초과)는 넓은 블록으로
+    assert h.record([("a", "CHALLENGER", 1240, 101, 80), ("b", "CHALLENGER", 40000, 52, 51)], covered, T0 + 1800) == 2
+    # b가 목록에서 빠짐
+    assert h.record([("a", "CHALLENGER", 1220, 101, 81)], covered, T0 + 4000) == 2
+
+    raw = h.series("a", T0 - 10, T0 + 5000)
+    assert raw["start"] is None
+    assert [(p["leaguePoints"], p["wins"], p["losses"]) for p in raw["points"]] == \
+           [(1200, 100, 80), (1240, 101, 80), (1220, 101, 81)]
+    assert h.series("a", T0 + 2000, T0 + 5000)["start"]["leaguePoints"] == 1240
+
+    hour = h.series("a", T0 - 3600, T0 + 5000, "hour")["points"]
+    assert sum(p["games"] for p in hour) == 2
+    assert max(p["lp_max"] for p in hour) == 1240
+
+    assert [r["puuid"] for r in h.ladder(T0 + 2000)] == ["b", "a"]
+    assert [r["puuid"] for r in h.ladder(T0 + 5000)] == ["a"]
+    assert [r["puuid"] for r in h.ladder(T0 + 100, tier="GRANDMASTER")] == ["b"]
+
+    # 다른 인스턴스(재시작/다른 프로세스)는 로그에서 똑같이 복원
+    again = LeagueHistory(tmp_path / "history")
+    assert again.series("b", T0, T0 + 5000) == h.series("b", T0, T0 + 5000)
+    assert again.stats() == h.stats()
+    assert again.record([("a", "CHALLENGER", 1220, 101, 81)], covered, T0 + 5000) == 0
+
+
+def test_reader_waits_for_puuids_of_newer_blocks(tmp_path):
+    w = LeagueHistory(tmp_path / "w")
+    w.record([("a", "CHALLENGER", 1200, 100, 80)], ["CHALLENGER"], T0)
+    w.record([("a", "CHALLENGER", 1210, 101, 80), ("c", "CHALLENGER", 900, 10, 10)], ["CHALLENGER"], T0 + 900)
+
+    # 락 없이 읽는 쪽이 puuids.txt를 먼저 읽고 그 뒤에 붙은 블록을 본 상황
+    r_dir = tmp_path / "r"
+    r_dir.mkdir()
+    (r_dir / "league.log").write_bytes((tmp_path / "w" / "league.log").read_bytes())
+    (r_dir / "puuids.txt").write_text("a\n", encoding="utf-8")
+    r = LeagueHistory(r_dir)
+    assert len(r.series("a", T0 - 10, T0 + 5000)["points"]) == 1
+    assert r.series("c", T0 - 10, T0 + 5000) is None
+
+    (r_dir / "puuids.txt").write_text("a\nc\n", encoding="utf-8")
+    assert len(r.series("a", T0 - 10, T0 + 5000)["points"]) == 2
+    assert r.series("c", T0 - 10, T0 + 5000)["points"][0]["leaguePoints"] == 900
+
+
+def test_day_rollups_split_at_kst_midnight(tmp_path):
+    from rollups import bucket_start
+
+    h = LeagueHistory(tmp_path / "history")
+    midnight = bucket_start(T0, 86400) + 86400  # 다음 KST 자정 (UTC 15시)
+    assert midnight % 86400 == 15 * 3600
+    covered = ["CHALLENGER"]
+    h.record([("a", "CHALLENGER", 1000, 10, 10)], covered, midnight - 60)
+    h.record([("a", "CHALLENGER", 1030, 11, 10)], covered, midnight + 60)
+    h.record([("a", "CHALLENGER", 1010, 11, 11)], covered, midnight + 3600)
+
+    days = h.series("a", midnight - 60, midnight + 7200, "day")["points"]
+    assert [p["t"] for p in days] == [(midnight - 86400) * 1000, midnight * 1000]
+    assert [(p["lp_open"], p["lp_close"], p["games"]) for p in days] == [(1000, 1000, 0), (1030, 1010, 2)]
+    # 구간 시작이 KST 하루 중간이어도 그날 버킷부터
+    assert len(h.series("a", midnight + 10, midnight + 7200, "day")["points"]) == 1
@@ -0,0 +1,83 @@
+import json
+
+from bench.synthetic import SyntheticWorld
+from match_index import MatchIndex
+
+
+def _write(path, matches, mode="w"):
+    with path.open(mode, encoding="utf-8") as f:
+        for m in matches:
+            f.write(json.dumps(m, ensure_ascii=False) + "\n")
+
+
+def _brute_force(matches, tier=None, puuid=None):
+    out = []
+    for i, m in enumerate(matches):
+        parts = m["info"]["participants"]
+        if tier and not any((p.get("tier") or "").upper() == tier for p in parts):
+            continue
+        if puuid and not any(p.get("puuid") == puuid for p in parts):
+            continue
+        out.append(i)
+    return out
+
+
+def test_index_matches_full_scan_and_persists(tmp_path):
+    world = SyntheticWorld(seed=3, tracked_players=30, other_players=300, n_matches=120)
+    matches = [world.make_match(i) for i in range(120)]
+    path = tmp_path / "matches.jsonl"
+    _write(path, matches[:80])
+    (tmp_path / "matches.jsonl").open("a").write("not json\n\n")
+
+    idx = MatchIndex(path, tmp_path / "index")
+    assert idx.refresh() == 80
+    _write(path, matches[80:], mode="a")
+    assert idx.refresh() == 40
+    assert idx.refresh() == 0
+
+    # 비정상 줄은 건너뛰므로 색인 번호 == matches 목록 번호
+    for tier in ("CHALLENGER", "GRANDMASTER", "MASTER", "UNRANKED", "DIAMOND"):
+        assert idx.select(tier=tier) == _brute_force(matches, tier=tier)
+    puuid = world.tracked[0]["puuid"]
+    assert idx.select(puuid=puuid) == _brute_force(matches, puuid=puuid)
+    assert idx.select(tier="CHALLENGER", puuid=puuid) == _brute_force(matches, "CHALLENGER", puuid)
+
+    newest = idx.newest(idx.select(tier="MASTER"), 5)
+    expect = sorted(_brute_force(matches, tier="MASTER"),
+                    key=lambda i: matches[i]["info"]["gameCreation"], reverse=True)[:5]
+    assert newest == expect
+    assert [m["metadata"]["match_id"] for m in idx.read_many(newest)] == \
+           [matches[i]["metadata"]["match_id"] for i in expect]
+
+    # 다른 인스턴스(=다른 프로세스/재시작)는 파일에서 그대로 불러온다
+    again = MatchIndex(path, tmp_path / "index")
+    assert again.refresh() == 0
+    assert len(again) == 120
+    assert again.select(puuid=puuid) == idx.select(puuid=puuid)
+
+
+def test_index_rebuilds_when_source_truncated(tmp_path):
+    world = SyntheticWorld(seed=5, tracked_players=10, other_players=50, n_matches=20)
+    path = tmp_path / "matches.jsonl"
+    _write(path, [world.make_match(i) for i in range(20)])
+    idx = MatchIndex(path, tmp_path / "index")
+    idx.refresh()
+    _write(path, [world.make_match(i) for i in range(5)])
+    idx.refresh()
+    assert len(idx) == 5
+
+
+def test_match_head_decodes_only_needed_fields():
+    import serializer
+
+    line = serializer.dumps({
+        "metadata": {"match_id": "KR_1", "participants": ["a", "b"]},
+        "info": {"gameCreation": 123, "participants": [
+            {"puuid": "a", "tier": "MASTER", "units": [{"character_id": "TFT14_Jinx"}]},
+            {"puuid": "b"},
+        ]},
+    })
+    assert serializer.match_head(line) == ("KR_1", 123, [("a", "MASTER"), ("b", None)])
+    assert serializer.match_head(b"[1, 2]") is None
+    assert serializer.match_head(b"not json") is None
+    assert serializer.loads(serializer.dumps({"이름": "합성"})) == {"이름": "합성"}
@@ -0,0 +1,80 @@
+import copy
+import json
+from collections import Counter
+
+from bench.synthetic import SyntheticWorld
+from match_index import MatchIndex
+from players import PlayerStats
+from summaries import SummaryStore
+
+
+def _write(path, matches, mode="w"):
+    with path.open(mode, encoding="utf-8") as f:
+        for m in matches:
+            f.write(json.dumps(m, ensure_ascii=False) + "\n")
+
+
+def _brute(matches, puuid):
+    games, placements, traits = 0, [], Counter()
+    for m in matches:
+        for p in m["info"]["participants"]:
+            if p.get("puuid") == puuid:
+                games += 1
+                placements.append(p["placement"])
+                traits.update(t["name"] for t in p["traits"] if (t.get("tier_current") or 0) > 0)
+    return games, placements, traits
+
+
+def test_player_aggregates_are_incremental_and_match_full_scan(tmp_path):
+    world = SyntheticWorld(seed=17, tracked_players=10, other_players=60, n_matches=80)
+    matches = [world.make_match(i, annotate=True) for i in range(80)]
+    summoners = tmp_path / "summoners.json"
+    summoners.write_text(json.dumps(world.summoners()[:5]), encoding="utf-8")
+    tracked = world.summoners()[0]["puuid"]
+    other = world.tracked[7]["puuid"]
+
+    path = tmp_path / "matches.jsonl"
+    _write(path, matches[:50])
+    idx = MatchIndex(path, tmp_path / "index")
+    store = SummaryStore(tmp_path / "index")
+    stats = PlayerStats(tmp_path / "index", summoners)
+    idx.refresh()
+    store.sync(idx)
+    assert stats.sync(idx, store) == 50
+    untracked = stats.get(other, idx, store)  # posting list로 생성 → LRU
+
+    _write(path, matches[50:], mode="a")
+    idx.refresh()
+    store.sync(idx)
+    assert stats.sync(idx, store) == 30
+
+    for puuid, agg in ((tracked, stats.get(tracked, idx, store)), (other, untracked)):
+        games, placements, traits = _brute(matches, puuid)
+        s = agg.summary()
+        assert s["games"] == games
+        assert s["avg_placement"] == round(sum(placements) / len(placements), 2)
+        assert s["top4_rate"] == round(sum(p <= 4 for p in placements) / len(placements), 3)
+        assert dict(agg.traits) == dict(traits)
+    assert tracked in stats.tracked and other not in stats.tracked
+
+    # 추적 대상이 없는 매치만 붙으면 집계 파일을 다시 쓰지 않음
+    saved = stats._path.read_bytes()
+    stranger = copy.deepcopy(matches[0])
+    stranger["metadata"]["match_id"] = "KR_stranger"
+    for k, p in enumerate(stranger["info"]["participants"]):
+        p["puuid"] = f"stranger-{k}"
+    _write(path, [stranger], mode="a")
+    idx.refresh()
+    store.sync(idx)
+    assert stats.sync(idx, store) == 1
+    assert stats._path.read_bytes() == saved
+    assert not list((tmp_path / "index").glob("*.tmp"))
+
+    # 재시작 후 파일에서 이어서 (저장 안 한 구간은 다시 읽음)
+    again = PlayerStats(tmp_path / "index", summoners)
+    assert again.sync(idx, store) == 1
+    assert again.get(tracked, idx, store).summary() == stats.get(tracked, idx, store).summary()
+
+    name = world.summoners()[0]
+    query = name.get("gameName") or name.get("name")
+    assert tracked in again.find(query.upper())
@@ -0,0 +1,50 @@
+import time
+
+import app as app_module
+import profiling
+
+
+def test_sampled_requests_keep_slowest_traces_with_phases(monkeypatch):
+    profiling.reset()
+    # 꺼져 있으면 아무것도 남기지 않음
+    assert profiling.phase("read") is profiling.phase("decode")
+    assert profiling.start("request", "x") is None
+
+    monkeypatch.setattr(profiling, "SLOWEST", 3)
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", "secret")
+    profiling.configure(rate=1.0, cprofile=True, stacks=False)
+    try:
+        for k in range(5):
+            with profiling.trace("collector", f"run{k}"):
+                with profiling.phase("read"):
+                    time.sleep(0.002 * (k + 1))
+                with profiling.phase("decode"):
+                    pass
+
+        client = app_module.app.test_client()
+        assert client.get("/api/admin/profile").status_code == 403
+        assert client.get("/api/stats").status_code == 200
+
+        resp = client.get("/api/admin/profile", headers={"X-Admin-Token": "secret"})
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data["sampled"] >= 6
+        assert data["phases"]["read"]["count"] == 5
+        assert len(data["traces"]) == 3
+        totals = [t["total_ms"] for t in data["traces"]]
+        assert totals == sorted(totals, reverse=True)
+        assert data["traces"][0]["name"] == "run4"
+        assert data["phases"]["serialize"]["count"] >= 1  # /api/stats 응답
+
+        assert client.get("/api/admin/profile/cprofile?token=secret").status_code == 403
+        text = client.get("/api/admin/profile/cprofile", headers={"X-Admin-Token": "secret"})
+        assert text.status_code == 200
+        assert b"run4" in text.data and b"cumulative" in text.data
+
+        resp = client.post("/api/admin/profile", json={"sample_rate": 0, "reset": True},
+                           headers={"X-Admin-Token": "secret"})
+        assert resp.get_json()["sample_rate"] == 0
+        assert profiling.report()["traces"] == []
+    finally:
+        profiling.configure(rate=0, cprofile=False, stacks=False)
+        profiling.reset()
@@ -0,0 +1,128 @@
+import multiprocessing
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from rate_limiter import BucketedRateLimiter, SharedRateLimiter, SlidingWindowRateLimiter
+
+
+def test_try_acquire_respects_every_window():
+    lim = BucketedRateLimiter([(3, 0.2), (5, 1.0)], buckets_per_window=4)
+    assert all(lim.try_acquire() for _ in range(3))
+    assert not lim.try_acquire()
+    time.sleep(0.3)
+    assert lim.try_acquire(2)
+    # 1초 윈도우(5개)가 꽉 참
+    assert not lim.try_acquire()
+
+
+def test_batch_acquire_and_validation():
+    lim = BucketedRateLimiter([(4, 0.2)], buckets_per_window=4)
+    assert lim.acquire(4)
+    assert not lim.acquire(1, max_wait_seconds=0.05)
+    assert lim.acquire(2, max_wait_seconds=1.0)
+    with pytest.raises(ValueError):
+        lim.acquire(5)
+
+
+    # 기다리는 사이 한도가 n보다 작아지면 무한 대기(OverflowError) 대신 ValueError
+    errors = []
+
+    def wait_for_three():
+        try:
+            lim.acquire(3)
+        except ValueError as e:
+            errors.append(e)
+
+    t = threading.Thread(target=wait_for_three)
+    t.start()
+    time.sleep(0.02)
+    lim.update_limits([(2, 0.2)])
+    t.join(2.0)
+    assert not t.is_alive() and len(errors) == 1
+
+
+def test_waiters_are_served_fifo():
+    lim = BucketedRateLimiter([(1, 0.1)], buckets_per_window=2)
+    assert lim.acquire()
+    order = []
+
+    def worker(i):
+        lim.acquire()
+        order.append(i)
+
+    threads = []
+    for i in range(4):
+        t = threading.Thread(target=worker, args=(i,))
+        t.start()
+        threads.append(t)
+        time.sleep(0.02)  # 큐 진입 순서 고정
+    for t in threads:
+        t.join(5)
+    assert order == [0, 1, 2, 3]
+    # 맨 앞 대기자만 타이머로 깨어나므로 wakeup 수는 대기자 수에 비례하지 않는다
+    assert lim.stats()["wakeups"] < 20
+
+
+def test_sliding_window_limiter_keeps_constructor():
+    lim = SlidingWindowRateLimiter(19, 99)
+    assert lim.windows == [(19, 1.0), (99, 120.0)]
+    assert lim.acquire() is True
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX only")
+def test_shared_limiter_accounts_across_instances(tmp_path):
+    # 같은 파일을 여는 두 인스턴스 = 두 프로세스(각자 별도 파일 설명자)
+    path = tmp_path / "rl.bin"
+    a = SharedRateLimiter(path, [(3, 0.5)], buckets_per_window=5)
+    b = SharedRateLimiter(path, [(3, 0.5)], buckets_per_window=5)
+    assert a.try_acquire(2)
+    assert b.try_acquire()
+    assert not a.try_acquire()
+    assert not b.try_acquire()
+
+    # 학습한 한도와 429 차단도 공유된다 (설정한 0.5초 윈도우는 그대로 유지)
+    a.update_from_headers({"X-App-Rate-Limit": "11:1", "X-App-Rate-Limit-Count": "4:1"})
+    assert b.stats()["windows"] == [{"limit": 10, "span": 1.0, "used": 4}, {"limit": 3, "span": 0.5, "used": 3}]
+    b.penalize(0.3)
+    assert not a.try_acquire()
+    assert a.acquire(max_wait_seconds=2.0)
+
+    # 파일에 담을 수 있는 수보다 많은 윈도우는 가장 엄격한 것만 남김
+    a.update_from_headers({"X-App-Rate-Limit": "21:1,101:120,5001:600,9001:3600,30001:86400"})
+    assert [w["span"] for w in b.stats()["windows"]] == [120.0, 3600.0, 86400.0, 0.5]
+
+
+def test_learned_limits_never_exceed_configured(tmp_path):
+    lim = BucketedRateLimiter([(5, 1.0), (50, 120.0)])
+    lim.update_from_headers({"X-App-Rate-Limit": "20:1,100:120,1000:600"})
+    assert lim.windows == [(5, 1.0), (50, 120.0), (999, 600.0)]
+    lim.update_from_headers({"X-App-Rate-Limit": "3:1,100:120"})
+    assert lim.windows == [(2, 1.0), (50, 120.0)]
+
+    # 설정이 다른 두 프로세스: 서로의 계정을 지우지 않고 더 엄격한 쪽을 따른다
+    if sys.platform != "win32":
+        a = SharedRateLimiter(tmp_path / "rl.bin", [(5, 1.0)])
+        b = SharedRateLimiter(tmp_path / "rl.bin", [(3, 1.0), (50, 120.0)])
+        assert a.try_acquire(2)
+        assert b.stats()["windows"] == [{"limit": 3, "span": 1.0, "used": 2},
+                                        {"limit": 50, "span": 120.0, "used": 0}]
+        assert a.try_acquire()
+        assert not a.try_acquire()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX only")
+def test_shared_limiter_across_processes(tmp_path):
+    path = tmp_path / "rl.bin"
+    SharedRateLimiter(path, [(5, 60.0)])
+    ctx = multiprocessing.get_context("fork")
+    with ctx.Pool(4) as pool:
+        granted = pool.map(_try_once, [str(path)] * 12)
+    assert sum(granted) == 5
+
+
+def _try_once(path):
+    return SharedRateLimiter(Path(path), [(5, 60.0)]).try_acquire()
@@ -0,0 +1,55 @@
+import json
+
+from bench.synthetic import SyntheticWorld
+from match_index import MatchIndex
+from rollups import MatchRollups, bucket_start
+
+
+def _write(path, matches, mode="w"):
+    with path.open(mode, encoding="utf-8") as f:
+        for m in matches:
+            f.write(json.dumps(m, ensure_ascii=False) + "\n")
+
+
+def _brute(matches, start, end, tier=None):
+    n = 0
+    for m in matches:
+        t = m["info"]["gameCreation"] // 1000
+        if start <= t < end and (tier is None or any(p.get("tier") == tier for p in m["info"]["participants"])):
+            n += 1
+    return n
+
+
+def test_rollups_match_full_scan_for_arbitrary_windows(tmp_path):
+    world = SyntheticWorld(seed=23, tracked_players=20, other_players=100, n_matches=300)
+    matches = [world.make_match(i, annotate=True) for i in range(300)]
+    path = tmp_path / "matches.jsonl"
+    _write(path, matches[:200])
+    idx = MatchIndex(path, tmp_path / "index")
+    rollups = MatchRollups(tmp_path / "index")
+    idx.refresh()
+    assert rollups.sync(idx) == 200
+    _write(path, matches[200:], mode="a")
+    idx.refresh()
+    assert rollups.sync(idx) == 100
+
+    times = [m["info"]["gameCreation"] // 1000 for m in matches]
+    lo, hi = min(times), max(times) + 1
+    # 시간 경계에 맞춘 임의 구간 (일 버킷 + 양끝 시간 버킷으로 합산)
+    start = bucket_start(lo + (hi - lo) // 5, 3600)
+    end = bucket_start(hi - (hi - lo) // 7, 3600)
+    w = rollups.window(start, end)
+    assert w["matches"] == _brute(matches, start, end)
+    assert w["by_tier"].get("CHALLENGER", 0) == _brute(matches, start, end, "CHALLENGER")
+
+    day = rollups.series(lo, hi, "day")
+    assert sum(b["matches"] for b in day) == 300
+    six = rollups.series(lo, hi, "hour", step=6)
+    assert sum(b["matches"] for b in six) == 300
+    assert all(b["t"] % (3600 * 1000) == 0 for b in six)
+
+    # 재시작 후 파일에서 이어서 (저장용 임시 파일은 남지 않음)
+    assert not list((tmp_path / "index").glob("*.tmp"))
+    again = MatchRollups(tmp_path / "index")
+    assert again.sync(idx) == 0
+    assert again.window(start, end) == w
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from scheduler import KST, AdaptiveSchedule
+
+LIMITS = {"windows": [{"limit": 20, "span": 1.0}, {"limit": 100, "span": 120.0}]}
+
+
+def _run(new, checked, calls=40, added=0):
+    return {"matches_fetched": new, "match_ids_checked": checked, "api_calls": calls,
+            "players_collected": 15, "players_added": added}
+
+
+def test_adaptive_schedule_reacts_to_freshness_and_budget(tmp_path):
+    s = AdaptiveSchedule(900, players=15, per_player=3, state_path=tmp_path / "s.json")
+    at = datetime(2025, 1, 1, 21, tzinfo=KST)
+
+    # 받은 id가 전부 새 것 → 밀려 있음: 간격↓, per_player↑, 2분 예산(100×0.8) 안에서 players 역산
+    d = s.record(_run(45, 45, added=10), LIMITS, tiers=3, now=at)
+    assert d["next_interval_sec"] < 900 and d["per_player"] == 4
+    assert "saturated" in d["reasons"] and d["budget_2min"] == 100
+    assert d["expected_calls"] <= 100 * 0.8 and s.enrich_calls > 0
+    assert s.decisions[-1] is d
+
+    # 새 것이 없으면 간격↑, per_player↓, players도 줄임 (예산이 남아도 늘리지 않음)
+    players = s.players
+    for _ in range(3):
+        d = s.record(_run(0, 60), LIMITS, tiers=3, now=at)
+    assert d["next_interval_sec"] > 900 and d["per_player"] < 4 and "idle" in d["reasons"]
+    assert d["players"] < players and "players-down" in d["reasons"]
+    assert d["next_interval_sec"] <= s.max_interval
+
+    # 시간대 학습: 붐비는 시간대는 평균보다 짧게
+    s.hourly_rate = [1.0] * 24
+    s.hourly_rate[21] = 4.0
+    s.scale = 1.0
+    assert s.interval(at) == 450
+    assert AdaptiveSchedule(900, 15, 3, state_path=tmp_path / "s.json").hourly_rate[21] is not None
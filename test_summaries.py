@@ -0,0 +1,83 @@
+import json
+
+from bench.synthetic import SyntheticWorld
+from match_index import MatchIndex
+from hot_cache import HotCache, encode
+from summaries import SummaryStore, expand, summarize
+
+
+def _write(path, matches, mode="w"):
+    with path.open(mode, encoding="utf-8") as f:
+        for m in matches:
+            f.write(json.dumps(m, ensure_ascii=False) + "\n")
+
+
+def test_summaries_follow_index_and_names_resolve_late(tmp_path):
+    world = SyntheticWorld(seed=7, tracked_players=20, other_players=100, n_matches=60)
+    matches = [world.make_match(i, annotate=True) for i in range(60)]
+    path = tmp_path / "matches.jsonl"
+    _write(path, matches[:40])
+
+    idx = MatchIndex(path, tmp_path / "index")
+    store = SummaryStore(tmp_path / "index")
+    idx.refresh()
+    assert store.sync(idx) == 40
+    _write(path, matches[40:], mode="a")
+    idx.refresh()
+    # 요청 경로에서는 limit만큼만 만든다
+    assert store.sync(idx, limit=0) == 0 and len(store) == 40
+    assert store.sync(idx, limit=15) == 15 and len(store) == 55
+    assert store.sync(idx) == 5
+    assert store.sync(idx) == 0
+
+    # 다른 인스턴스는 파일에서 불러오고 다시 만들지 않는다
+    again = SummaryStore(tmp_path / "index")
+    assert again.sync(idx) == 0
+    assert again.read_many([59, 3]) == [summarize(matches[59]), summarize(matches[3])]
+
+    puuid = matches[3]["info"]["participants"][0]["puuid"]
+    out = expand(again.read_many([3])[0], {})
+    assert out["match_id"] == matches[3]["metadata"]["match_id"]
+    assert out["players"][0]["name"] == puuid[:8] + "…"
+    assert len(out["players"][0]["units"]) == len(matches[3]["info"]["participants"][0]["units"])
+    assert expand(again.read_many([3])[0], {puuid: "새이름#KR1"})["players"][0]["name"] == "새이름#KR1"
+
+    # 원본이 잘려 색인이 다시 만들어지면 요약도 처음부터
+    _write(path, matches[:10])
+    idx.refresh()
+    assert store.sync(idx) == 10
+    assert len(store) == 10
+
+
+def test_hot_cache_roundtrips_recent_and_falls_back_to_store(tmp_path):
+    world = SyntheticWorld(seed=11, tracked_players=20, other_players=100, n_matches=50)
+    matches = [world.make_match(i, annotate=True) for i in range(50)]
+    path = tmp_path / "matches.jsonl"
+    _write(path, matches)
+    idx = MatchIndex(path, tmp_path / "index")
+    idx.refresh()
+    store = SummaryStore(tmp_path / "index")
+    store.sync(idx)
+
+    cache = HotCache(capacity=16)
+    assert cache.sync(store, {}) == 16
+    assert cache.sync(store, {}) == 0
+    ords = [49, 0, 34, 40, 12]
+    assert cache.get_many(ords, store, {}) == [encode(c, {}) for c in store.read_many(ords)]
+    assert json.loads(cache.get_many([49], store, {})[0]) == expand(store.read_many([49])[0], {})
+    assert cache.stats()["hits"] == 4 and cache.stats()["misses"] == 2
+
+    # 새 매치는 링에서 가장 오래된 것을 밀어냄
+    extra = [world.make_match(50 + i, annotate=True) for i in range(4)]
+    _write(path, extra, mode="a")
+    idx.refresh()
+    store.sync(idx)
+    assert cache.sync(store, {}) == 4
+    assert cache.get_many([53, 34], store, {}) == [encode(c, {}) for c in store.read_many([53, 34])]
+    assert cache.stats()["hits"] == 5 and cache.stats()["cached"] == 16
+
+    # 이름이 바뀌면 링을 다시 채움 (예전 이름이 박힌 바이트를 내보내지 않음)
+    puuid = matches[49]["info"]["participants"][0]["puuid"]
+    renamed = {puuid: "새이름#KR1"}
+    assert cache.sync(store, renamed) == 16
+    assert json.loads(cache.get_many([49], store, renamed)[0])["players"][0]["name"] == "새이름#KR1"